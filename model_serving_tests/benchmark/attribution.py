@@ -0,0 +1,107 @@
+import logging
+import statistics
+from typing import Optional
+
+from model_serving_tests.benchmark.load import percentile
+from model_serving_tests.benchmark.metrics import (E2E_HISTOGRAM, TTFT_HISTOGRAM, MetricsScraper, histogram_delta,
+                                                   histogram_mean, histogram_quantile)
+
+LOGGER = logging.getLogger(__name__)
+
+# What sits between the load generator and the vLLM server, per deployment type
+OVERHEAD_SOURCES = {
+    "rawdeployment": "network, API server and the in-process websocket port-forward relay (tests/port_forward.py)",
+    "serverless": "network, ingress gateway, Istio sidecar and Knative activator/queue-proxy",
+}
+# What the in-request overhead lumps together, these parts are not measured separately
+IN_REQUEST_COMPONENTS = "transport along the overhead source and HTTP handling in the vLLM API server"
+# Client latency attribute and the server histogram measuring the same interval
+LATENCY_HISTOGRAMS = {"ttft": TTFT_HISTOGRAM, "e2e": E2E_HISTOGRAM}
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _client_stats(latencies: list) -> dict:
+    stats = {f"p{int(q * 100)}": percentile(latencies, q * 100) for q in QUANTILES}
+    stats["mean"] = statistics.fmean(latencies) if latencies else None
+    return stats
+
+
+def _server_stats(scraper: MetricsScraper, name: str, **labels: str) -> dict:
+    window = scraper.window()
+    if window is None:
+        return {}
+    first, last = window
+    buckets = histogram_delta(first.histogram(name, **labels), last.histogram(name, **labels))
+    stats = {f"p{int(q * 100)}": histogram_quantile(buckets, q) for q in QUANTILES}
+    stats["mean"] = histogram_mean(first, last, name, **labels)
+    return stats
+
+
+def _difference(client: Optional[float], server: Optional[float]) -> Optional[float]:
+    return client - server if client is not None and server is not None else None
+
+
+def _breakdown(mean_overhead: Optional[float], setup_per_request: Optional[float]) -> Optional[dict]:
+    if mean_overhead is None or setup_per_request is None:
+        return None
+    return {"connection_setup": setup_per_request, "in_request": mean_overhead - setup_per_request}
+
+
+def attribute_latency(records: list, scraper: MetricsScraper, deployment_type: str,
+                      connection_setup: Optional[dict] = None, connections: int = 1, **labels: str) -> dict:
+    """Reconcile client-measured latencies with vLLM's own histograms over the same run.
+
+    The server histograms are differenced between the first and last scrape, which bracket the load, so they hold
+    exactly the requests of the run when nothing else talks to the predictor. Whatever the client measured on top
+    of the server is time spent outside the engine: the path given by OVERHEAD_SOURCES, plus HTTP handling in
+    the vLLM API server. The mean overhead is exact, the percentile overheads compare two distributions and are
+    only indicative, and the bucket interpolation of the server side limits them to the histogram resolution.
+
+    Given the connection_setup_cost of the endpoint, the mean overhead is split into the connection setup, paid
+    once per connection of the load generator and spread over the requests, and the in-request overhead, the
+    rest. The in-request overhead is not split further: IN_REQUEST_COMPONENTS lists what it holds.
+
+    Args:
+        records (list): RequestRecord objects of the load generator.
+        scraper (MetricsScraper): The scraper that ran during the load, already stopped.
+        deployment_type (str): The deployment type, RawDeployment or Serverless.
+        connection_setup (Optional[dict], optional): The connection_setup_cost of the endpoint, None to leave the
+            overhead whole. Defaults to None.
+        connections (int, optional): Connections the load generator opened, its concurrency. Defaults to 1.
+        **labels (str): Label values the server series must have, e.g. model_name.
+
+    Returns:
+        dict: For ttft and e2e, the client and server statistics, the overhead per statistic in seconds and the
+            share of the mean client latency it represents, and the split of the mean overhead into connection
+            setup and in-request overhead when connection_setup is given; plus the request counts seen by each
+            side, where the overhead comes from and what its components are.
+    """
+    succeeded = [record for record in records if record.ok]
+    setup_per_request = None
+    if connection_setup is not None and succeeded:
+        setup_per_request = connection_setup["setup"] * min(connections, len(succeeded)) / len(succeeded)
+    if setup_per_request is None:
+        components = f"not separated: connection setup, {IN_REQUEST_COMPONENTS}"
+    else:
+        components = f"connection setup apart, the in-request overhead holds {IN_REQUEST_COMPONENTS}, not separated"
+    attribution = {"overhead_source": OVERHEAD_SOURCES.get(deployment_type.lower(), "unknown"),
+                   "components": components}
+    for attribute, histogram in LATENCY_HISTOGRAMS.items():
+        client = _client_stats([value for record in succeeded if (value := getattr(record, attribute)) is not None])
+        server = _server_stats(scraper, histogram, **labels)
+        overhead = {stat: _difference(client[stat], server.get(stat)) for stat in client}
+        share = overhead["mean"] / client["mean"] if overhead["mean"] is not None and client["mean"] else None
+        attribution[attribute] = {"client": client, "server": server, "overhead": overhead, "overhead_share": share,
+                                  "breakdown": _breakdown(overhead["mean"], setup_per_request)}
+
+    window = scraper.window()
+    server_requests = None
+    if window is not None:
+        first, last = window
+        server_requests = ((last.get(f"{E2E_HISTOGRAM}_count", **labels) or 0.0)
+                           - (first.get(f"{E2E_HISTOGRAM}_count", **labels) or 0.0))
+    attribution["requests"] = {"client": len(succeeded), "server": server_requests}
+    if server_requests is not None and server_requests != len(succeeded):
+        LOGGER.warning(f"The server finished {server_requests:.0f} requests during the run but the client "
+                       f"{len(succeeded)}, the attribution includes other traffic")
+    return attribution
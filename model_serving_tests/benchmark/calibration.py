@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import platform
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# Next to the API discovery cache, see tests/kube_cache.py
+CALIBRATION_FILE = Path(os.environ.get("MODEL_SERVING_TESTS_CACHE_DIR",
+                                       Path.home() / ".cache" / "model-serving-tests")) / "calibration.json"
+# A run is flagged once it reaches this share of the rate its client reached against the stand-in
+HEADROOM_SHARE = 0.7
+# The load generators and the stand-in they are measured against
+CLIENTS = {"async_http": "http", "threaded_http": "http", "grpc": "grpc"}
+
+
+def _run_client(client: str, address: str, num_requests: int, concurrency: int, max_tokens: int) -> dict:
+    from model_serving_tests.benchmark.load import run_load
+    from model_serving_tests.benchmark.protocols import grpc_load, http_load
+
+    prompts = ["calibration"]
+    cpu_started, started = time.process_time(), time.monotonic()
+    if client == "async_http":
+        records = run_load(address, "stand-in", prompts, num_requests=num_requests, concurrency=concurrency,
+                           max_tokens=max_tokens, headroom_check=False)
+        errors = sum(not record.ok for record in records)
+        tokens = sum(record.output_tokens for record in records if record.ok)
+    else:
+        load = grpc_load if client == "grpc" else http_load
+        summary = load(address, "stand-in", prompts, num_requests=num_requests, concurrency=concurrency,
+                       max_tokens=max_tokens, headroom_check=False)
+        errors = summary["errors"]
+        tokens = summary["output_tokens_per_second"] * summary["duration_seconds"]
+    wall, cpu = time.monotonic() - started, time.process_time() - cpu_started
+    return {
+        "errors": errors,
+        "requests_per_second": num_requests / wall,
+        "tokens_per_second": tokens / wall,
+        "cpu_utilization": cpu / wall,
+        "requests_per_core_second": num_requests / cpu if cpu else None,
+        "tokens_per_core_second": tokens / cpu if cpu else None,
+    }
+
+
+def calibrate(clients: tuple = tuple(CLIENTS), num_requests: int = 2000, concurrency: int = 32,
+              max_tokens: int = 64) -> dict:
+    """Measure how many requests and tokens per second the load generators can produce on one core.
+
+    Each client drives a zero-latency StandInServer in another process, after a short warm-up, and its own CPU
+    time is measured. Every request is answered at once, so the rate reached is the ceiling of the client: a real
+    run getting close to it measures the harness, not the server.
+
+    Args:
+        clients (tuple, optional): Keys of CLIENTS to measure. Defaults to all of them.
+        num_requests (int, optional): Requests sent per client. Defaults to 2000.
+        concurrency (int, optional): Requests in flight. Defaults to 32.
+        max_tokens (int, optional): Tokens streamed per request. Defaults to 64.
+
+    Returns:
+        dict: The settings, host and CPU count, and per client the achieved request and token rates, the client
+            CPU utilization and the rates per CPU second, the per-core ceilings.
+    """
+    from model_serving_tests.benchmark.standin import StandInServer
+
+    results = {}
+    for client in clients:
+        with StandInServer(CLIENTS[client]) as address:
+            _run_client(client, address, min(num_requests, 4 * concurrency), concurrency, max_tokens)
+            results[client] = _run_client(client, address, num_requests, concurrency, max_tokens)
+        LOGGER.info(f"CALIBRATED {client}: {results[client]}")
+    return {
+        "created": time.time(),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "num_requests": num_requests,
+        "concurrency": concurrency,
+        "max_tokens": max_tokens,
+        "clients": results,
+    }
+
+
+def save_calibration(calibration: dict, path: Path = CALIBRATION_FILE) -> None:
+    """Write a calibration where check_headroom finds it.
+
+    Args:
+        calibration (dict): The calibrate() output.
+        path (Path, optional): The file. Defaults to CALIBRATION_FILE.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(calibration, indent=2))
+    load_calibration.cache_clear()
+    LOGGER.info(f"Calibration written to {path}")
+
+
+@lru_cache(maxsize=None)
+def load_calibration(path: Path = CALIBRATION_FILE) -> Optional[dict]:
+    """Read the last calibration of this host.
+
+    Args:
+        path (Path, optional): The file. Defaults to CALIBRATION_FILE.
+
+    Returns:
+        Optional[dict]: The calibration, None if the harness was never calibrated or on another host.
+    """
+    if not path.exists():
+        return None
+    calibration = json.loads(path.read_text())
+    if calibration.get("host") != platform.node():
+        LOGGER.info(f"Ignoring the calibration of {calibration.get('host')} in {path}")
+        return None
+    return calibration
+
+
+def check_headroom(client: str, requests_per_second: float, tokens_per_second: float,
+                   path: Path = CALIBRATION_FILE) -> Optional[str]:
+    """Warn when a run drives or offers load close to what its client reached against the stand-in server.
+
+    The load generators are single-threaded asyncio or GIL-bound threads: the calibrated rate is what one core
+    sustains next to the stand-in, and a run near it is limited by the client whatever the server does.
+
+    Args:
+        client (str): A key of CLIENTS.
+        requests_per_second (float): The rate reached or offered.
+        tokens_per_second (float): The output tokens per second reached or offered.
+        path (Path, optional): The calibration file. Defaults to CALIBRATION_FILE.
+
+    Returns:
+        Optional[str]: The warning, None if there is headroom or no calibration.
+    """
+    calibration = load_calibration(path)
+    ceiling = (calibration or {}).get("clients", {}).get(client)
+    if not ceiling or not ceiling["requests_per_second"]:
+        return None
+    request_share = requests_per_second / ceiling["requests_per_second"]
+    token_share = tokens_per_second / ceiling["tokens_per_second"] if ceiling["tokens_per_second"] else 0.0
+    if max(request_share, token_share) < HEADROOM_SHARE:
+        return None
+    message = (f"THE {client} LOAD GENERATOR RUNS AT {request_share:.0%} OF ITS CALIBRATED REQUEST RATE AND "
+               f"{token_share:.0%} OF ITS TOKEN RATE, RESULTS MAY MEASURE THE CLIENT RATHER THAN THE SERVER")
+    LOGGER.warning(message)
+    return message
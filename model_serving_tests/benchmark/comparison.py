@@ -0,0 +1,206 @@
+import functools
+import logging
+import statistics
+import time
+from typing import Any
+
+from model_serving_tests.benchmark.load import run_load, summarize
+from model_serving_tests.benchmark.stats import block_bootstrap_change, compare_samples
+
+LOGGER = logging.getLogger(__name__)
+
+# A concurrency level is saturated once doubling it gains less than this share of throughput
+SATURATION_GAIN = 0.05
+LATENCY_STATS = ("p50", "p90", "p99")
+
+
+@functools.lru_cache(maxsize=None)
+def _requests() -> Any:
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+    return requests
+
+
+def connection_setup_cost(url: str, samples: int = 10, timeout: float = 30.0) -> dict:
+    """Measure what opening a connection adds to a request, by timing /health on fresh and reused connections.
+
+    Args:
+        url (str): The base URL of the model server.
+        samples (int, optional): Requests per kind. Defaults to 10.
+        timeout (float, optional): Timeout of one request in seconds. Defaults to 30.0.
+
+    Returns:
+        dict: Median seconds of a request on a new connection, on a kept-alive one, and their difference.
+    """
+    requests = _requests()
+    fresh = []
+    for _ in range(samples):
+        with requests.Session() as session:
+            started = time.perf_counter()
+            session.get(f"{url}/health", timeout=timeout, verify=False).raise_for_status()
+            fresh.append(time.perf_counter() - started)
+    reused = []
+    with requests.Session() as session:
+        session.get(f"{url}/health", timeout=timeout, verify=False).raise_for_status()
+        for _ in range(samples):
+            started = time.perf_counter()
+            session.get(f"{url}/health", timeout=timeout, verify=False).raise_for_status()
+            reused.append(time.perf_counter() - started)
+    fresh_median, reused_median = statistics.median(fresh), statistics.median(reused)
+    return {"new_connection": fresh_median, "reused_connection": reused_median,
+            "setup": fresh_median - reused_median}
+
+
+def saturation_sweep(url: str,
+                     model_name: str,
+                     prompts: list,
+                     max_concurrency: int,
+                     requests_per_slot: int = 4,
+                     max_tokens: int = 128) -> dict:
+    """Double the concurrency until throughput stops growing or requests fail.
+
+    Args:
+        url (str): The base URL of the OpenAI compatible endpoint.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        max_concurrency (int): The highest concurrency to try.
+        requests_per_slot (int, optional): Requests sent per concurrent slot at each level. Defaults to 4.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+
+    Returns:
+        dict: The summary of every level tried keyed by concurrency, and the highest error-free throughput in
+            output tokens per second with the concurrency that reached it.
+    """
+    levels = {}
+    best = {"concurrency": None, "output_tokens_per_second": 0.0}
+    concurrency = 1
+    while concurrency <= max_concurrency:
+        summary = summarize(run_load(url, model_name, prompts, num_requests=requests_per_slot * concurrency,
+                                     concurrency=concurrency, max_tokens=max_tokens))
+        levels[concurrency] = summary
+        if summary["errors"]:
+            LOGGER.info(f"{summary['errors']} REQUESTS FAILED AT CONCURRENCY {concurrency}, STOPPING THE SWEEP")
+            break
+        throughput = summary["output_tokens_per_second"]
+        saturated = throughput < best["output_tokens_per_second"] * (1 + SATURATION_GAIN)
+        if throughput > best["output_tokens_per_second"]:
+            best = {"concurrency": concurrency, "output_tokens_per_second": throughput}
+        if saturated:
+            break
+        concurrency *= 2
+    return {"levels": levels, "max_sustainable": best}
+
+
+def compare_latencies(baseline: dict, candidate: dict) -> dict:
+    """Compare the latency distributions of two load runs.
+
+    Args:
+        baseline (dict): The summarize() output of the reference run.
+        candidate (dict): The summarize() output of the compared run.
+
+    Returns:
+        dict: For ttft and e2e, the candidate minus baseline difference in seconds and the candidate to
+            baseline ratio of each percentile, None where either side has no value.
+    """
+    comparison = {}
+    for attribute in ("ttft", "e2e"):
+        comparison[attribute] = {}
+        for stat in LATENCY_STATS:
+            before, after = baseline[attribute][stat], candidate[attribute][stat]
+            comparison[attribute][stat] = {
+                "delta": after - before if before is not None and after is not None else None,
+                "ratio": after / before if before and after is not None else None,
+            }
+    return comparison
+
+
+def interleaved_records(targets: dict, model_name: str, prompts: list, rounds: int = 2, **load_options: int) -> dict:
+    """Run the same workload against several endpoints, alternating their order each round.
+
+    Alternating cancels out drift of the cluster over time, e.g. a neighbour's load, between the endpoints.
+
+    Args:
+        targets (dict): Base URLs keyed by a label, e.g. the deployment type.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through in the same order on every run.
+        rounds (int, optional): How many runs each endpoint gets. Defaults to 2.
+        **load_options (int): num_requests, concurrency and max_tokens, see run_load.
+
+    Returns:
+        dict: The RequestRecord lists of the runs of each endpoint keyed by label, one list per round.
+    """
+    runs = {label: [] for label in targets}
+    order = list(targets)
+    for round_index in range(rounds):
+        for label in order if round_index % 2 == 0 else reversed(order):
+            runs[label].append(run_load(targets[label], model_name, prompts, **load_options))
+    return runs
+
+
+def interleaved_runs(targets: dict, model_name: str, prompts: list, rounds: int = 2, **load_options: int) -> dict:
+    """Run the same workload against several endpoints, alternating their order each round, and summarize it.
+
+    Args:
+        targets (dict): Base URLs keyed by a label, e.g. the deployment type.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        rounds (int, optional): How many runs each endpoint gets. Defaults to 2.
+        **load_options (int): num_requests, concurrency and max_tokens, see run_load.
+
+    Returns:
+        dict: The summary of all the requests sent to each endpoint keyed by label, with the throughput averaged
+            over its runs since the runs of the other endpoints sit in between.
+    """
+    summaries = {}
+    for label, runs in interleaved_records(targets, model_name, prompts, rounds, **load_options).items():
+        summaries[label] = summarize([record for run in runs for record in run])
+        summaries[label]["output_tokens_per_second"] = statistics.fmean(
+            summarize(run)["output_tokens_per_second"] for run in runs)
+        del summaries[label]["duration_seconds"]
+    return summaries
+
+
+def compare_runs(baseline: list, candidate: list, seed: int = 0) -> dict:
+    """Test the latency and throughput differences between the runs of two endpoints.
+
+    The runs, not the requests, are the independent samples: requests of one run share its conditions, and
+    pooling them into one test yields p-values far too small. Each latency is therefore compared two ways, with a
+    Mann-Whitney test and bootstrap over the per-run medians, and with a block bootstrap of the median over all the
+    requests that resamples whole runs. A change is only called when both agree on its direction. Throughput is
+    one value per run and is compared over the runs. Fewer than four runs per endpoint give insufficient data.
+
+    Args:
+        baseline (list): The RequestRecord lists of the reference runs.
+        candidate (list): The RequestRecord lists of the compared runs.
+        seed (int, optional): Seed of the bootstraps. Defaults to 0.
+
+    Returns:
+        dict: For ttft, tpot and e2e the compare_samples output over the per-run medians, its verdict as
+            per_run_verdict, the block bootstrap interval of the pooled median change as block_ci and the combined
+            verdict; for output_tokens_per_second the compare_samples output over the runs; and the metrics that
+            regressed.
+    """
+    def _run_values(runs: list, attribute: str) -> list:
+        return [[getattr(record, attribute) for record in run if record.ok and getattr(record, attribute) is not None]
+                for run in runs]
+
+    comparison = {}
+    for attribute in ("ttft", "tpot", "e2e"):
+        before, after = _run_values(baseline, attribute), _run_values(candidate, attribute)
+        per_run = compare_samples([statistics.median(values) for values in before if values],
+                                  [statistics.median(values) for values in after if values], seed=seed)
+        interval = block_bootstrap_change(before, after, seed=seed)
+        verdict = per_run["verdict"]
+        if verdict in ("regression", "improvement"):
+            # The block interval must exclude zero on the side of the per-run change
+            agrees = interval is not None and (interval[0] > 0 if per_run["change"] > 0 else interval[1] < 0)
+            verdict = verdict if agrees else "unchanged"
+        comparison[attribute] = {**per_run, "per_run_verdict": per_run["verdict"],
+                                 "block_ci": list(interval) if interval else None, "verdict": verdict}
+    comparison["output_tokens_per_second"] = compare_samples(
+        [summarize(run)["output_tokens_per_second"] for run in baseline],
+        [summarize(run)["output_tokens_per_second"] for run in candidate], higher_is_better=True, seed=seed)
+    comparison["regressions"] = [metric for metric, result in comparison.items() if result["verdict"] == "regression"]
+    return comparison
@@ -0,0 +1,117 @@
+import logging
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_PROBES = 12
+
+
+@dataclass(frozen=True)
+class Slo:
+    """Latency objectives a request must meet to count towards goodput. A None threshold is not checked.
+
+    Attributes:
+        ttft (Optional[float]): Maximum seconds to the first token.
+        tpot (Optional[float]): Maximum mean seconds per output token after the first.
+        e2e (Optional[float]): Maximum seconds for the whole request.
+    """
+
+    ttft: Optional[float] = None
+    tpot: Optional[float] = None
+    e2e: Optional[float] = None
+
+    def met(self, record) -> bool:
+        """Tell whether a request succeeded within every objective.
+
+        Args:
+            record (RequestRecord): The request.
+
+        Returns:
+            bool: Whether the request counts towards goodput.
+        """
+        if not record.ok:
+            return False
+        for objective in ("ttft", "tpot", "e2e"):
+            limit = getattr(self, objective)
+            if limit is None:
+                continue
+            value = getattr(record, objective)
+            # A request without a second token has no TPOT and cannot miss that objective
+            if value is None and objective == "tpot":
+                continue
+            if value is None or value > limit:
+                return False
+        return True
+
+    def goodput(self, records: list) -> dict:
+        """Measure the requests and tokens per second that met the objectives.
+
+        Args:
+            records (list): The RequestRecord objects of a run.
+
+        Returns:
+            dict: The objectives, how many requests met them and their share, and goodput in requests and output
+                tokens per second over the duration of the run.
+        """
+        good = [record for record in records if self.met(record)]
+        duration = (max(record.started + record.e2e for record in records) - min(record.started for record in records)
+                    if records else 0.0)
+        return {
+            "slo": asdict(self),
+            "met": len(good),
+            "share": len(good) / len(records) if records else 0.0,
+            "requests_per_second": len(good) / duration if duration else 0.0,
+            "output_tokens_per_second": sum(record.output_tokens for record in good) / duration if duration else 0.0,
+        }
+
+
+def max_rate_for_goodput(probe: Callable[[float], list],
+                         slo: Slo,
+                         target: float = 0.9,
+                         initial_rate: float = 1.0,
+                         precision: float = 0.05,
+                         max_probes: int = MAX_PROBES) -> dict:
+    """Search the highest arrival rate at which the share of requests meeting the SLO stays above a target.
+
+    The rate doubles until a probe misses the target, or halves until one meets it, then the bracket is bisected
+    until it is narrower than the precision. Goodput is assumed to fall as the rate grows.
+
+    Args:
+        probe (Callable[[float], list]): Runs a load at the given rate in requests per second and returns its
+            RequestRecord objects, e.g. a run_open_loop partial.
+        slo (Slo): The objectives.
+        target (float, optional): The share of requests that must meet the objectives. Defaults to 0.9.
+        initial_rate (float, optional): The first rate probed. Defaults to 1.0.
+        precision (float, optional): Relative width of the final bracket. Defaults to 0.05.
+        max_probes (int, optional): Probes to run at most. Defaults to MAX_PROBES.
+
+    Returns:
+        dict: The highest rate that met the target (None if none did), its goodput, and every probe.
+    """
+    probes = []
+
+    def _meets(rate: float) -> bool:
+        goodput = slo.goodput(probe(rate))
+        probes.append({"rate": rate, **goodput})
+        LOGGER.info(f"RATE {rate:.2f}/s: {goodput['share']:.1%} OF REQUESTS MET THE SLO")
+        return goodput["share"] >= target
+
+    low, high = None, None
+    rate = initial_rate
+    while len(probes) < max_probes and (low is None or high is None):
+        if _meets(rate):
+            low = rate
+            rate *= 2
+        else:
+            high = rate
+            rate /= 2
+    while low is not None and high is not None and high - low > precision * high and len(probes) < max_probes:
+        middle = (low + high) / 2
+        if _meets(middle):
+            low = middle
+        else:
+            high = middle
+
+    best = max((entry for entry in probes if entry["rate"] == low), key=lambda entry: entry["share"], default=None)
+    return {"target": target, "max_rate": low, "goodput": best, "probes": probes}
@@ -0,0 +1,365 @@
+import asyncio
+import json
+import logging
+import math
+import operator
+import random
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import accumulate, repeat
+from typing import Any, Callable, Iterator, Optional
+
+from model_serving_tests.benchmark.calibration import check_headroom
+
+LOGGER = logging.getLogger(__name__)
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_US = 1000
+# Token arrival offsets are microseconds from the request start, an unsigned 32-bit item holds over an hour
+MAX_OFFSET_US = 2 ** 32 - 1
+# Inter-token gaps are counted in fixed-width buckets, so their percentiles cost the same for any run length
+GAP_BUCKET_US = 100
+
+
+@dataclass(slots=True)
+class RequestRecord:
+    """Client-side timings of one streamed completion request.
+
+    Times are integer nanoseconds of time.monotonic_ns() and the arrival of every streamed chunk carrying text is
+    an unsigned 32-bit microsecond offset, so a record of a few hundred tokens takes about a kilobyte.
+
+    Attributes:
+        started_ns (int): time.monotonic_ns() when the request was sent.
+        ttft_ns (Optional[int]): Nanoseconds until the first token arrived, None if none did.
+        e2e_ns (int): Nanoseconds until the response was complete.
+        output_tokens (int): Tokens generated, from the usage chunk or counted from the stream.
+        error (Optional[str]): The failure reason, None for a successful request.
+        token_offsets (array): Microseconds from the start to the arrival of each chunk carrying text.
+    """
+
+    started_ns: int
+    ttft_ns: Optional[int]
+    e2e_ns: int
+    output_tokens: int
+    error: Optional[str] = None
+    token_offsets: array = field(default_factory=lambda: array("I"))
+
+    @property
+    def started(self) -> float:
+        """float: time.monotonic() seconds when the request was sent."""
+        return self.started_ns / NS_PER_SECOND
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Optional[float]: Seconds until the first token arrived, None if none did."""
+        return self.ttft_ns / NS_PER_SECOND if self.ttft_ns is not None else None
+
+    @property
+    def e2e(self) -> float:
+        """float: Seconds until the response was complete."""
+        return self.e2e_ns / NS_PER_SECOND
+
+    @property
+    def ok(self) -> bool:
+        """bool: Whether the request succeeded."""
+        return self.error is None
+
+    @property
+    def tpot(self) -> Optional[float]:
+        """Optional[float]: Mean seconds per output token after the first, None with fewer than two tokens."""
+        if self.ttft_ns is None or self.output_tokens < 2:
+            return None
+        return (self.e2e_ns - self.ttft_ns) / (self.output_tokens - 1) / NS_PER_SECOND
+
+    def token_gaps_us(self) -> Iterator[int]:
+        """Return an iterator over the microseconds between consecutive chunk arrivals, computed in C."""
+        offsets = self.token_offsets
+        return map(operator.sub, offsets[1:], offsets[:-1])
+
+
+def elapsed_us(started_ns: int) -> int:
+    """Return the microseconds since a time.monotonic_ns() value, capped to fit a token_offsets item.
+
+    Args:
+        started_ns (int): The start.
+
+    Returns:
+        int: The offset.
+    """
+    return min((time.monotonic_ns() - started_ns) // NS_PER_US, MAX_OFFSET_US)
+
+
+def gap_percentiles(records: list, quantiles: tuple = (50, 90, 99)) -> dict:
+    """Compute inter-token latency percentiles over the streamed chunks of a whole run.
+
+    Gaps are counted per GAP_BUCKET_US wide bucket by C-level map and Counter passes instead of being collected,
+    so a run of 100k requests of 256 tokens needs a few thousand counters, not 25 million floats.
+
+    Args:
+        records (list): The RequestRecord objects; failed requests are skipped.
+        quantiles (tuple, optional): The percentiles. Defaults to (50, 90, 99).
+
+    Returns:
+        dict: Each percentile in seconds, at the upper edge of its bucket, None if no request streamed two chunks.
+    """
+    counts = Counter()
+    for record in records:
+        if record.ok:
+            count_gaps(counts, record)
+    return bucket_percentiles(counts, GAP_BUCKET_US * NS_PER_US / NS_PER_SECOND, quantiles)
+
+
+def count_gaps(counts: Counter, record: RequestRecord) -> None:
+    """Add the inter-token gaps of a request to a Counter of GAP_BUCKET_US wide buckets.
+
+    Args:
+        counts (Counter): The bucket counts, updated in place.
+        record (RequestRecord): The request.
+    """
+    counts.update(map(operator.floordiv, record.token_gaps_us(), repeat(GAP_BUCKET_US)))
+
+
+def bucket_percentiles(counts: Counter, bucket_seconds: float, quantiles: tuple = (50, 90, 99)) -> dict:
+    """Compute percentiles from the counts of fixed-width buckets.
+
+    Args:
+        counts (Counter): The number of observations in each bucket, keyed by bucket index.
+        bucket_seconds (float): The width of a bucket.
+        quantiles (tuple, optional): The percentiles. Defaults to (50, 90, 99).
+
+    Returns:
+        dict: Each percentile in seconds, at the upper edge of its bucket, None without observations.
+    """
+    result = {f"p{q}": None for q in quantiles}
+    if not counts:
+        return result
+    buckets = sorted(counts)
+    cumulative = list(accumulate(counts[bucket] for bucket in buckets))
+    for q in quantiles:
+        rank = max(1, math.ceil(q * cumulative[-1] / 100))
+        result[f"p{q}"] = (buckets[bisect_left(cumulative, rank)] + 1) * bucket_seconds
+    return result
+
+
+def percentile(values: list, q: float) -> Optional[float]:
+    """Return a percentile with linear interpolation between the closest ranks.
+
+    Args:
+        values (list): The observations.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        Optional[float]: The percentile, or None if there are no observations.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def _stream_completion(session, url: str, model_name: str, prompt: str, max_tokens: int) -> RequestRecord:
+    import aiohttp
+
+    payload = {"model": model_name, "prompt": prompt, "max_tokens": max_tokens, "temperature": 0, "stream": True,
+               "stream_options": {"include_usage": True}}
+    started = time.monotonic_ns()
+    ttft = None
+    offsets = array("I")
+    usage_tokens = None
+    try:
+        async with session.post(f"{url}/v1/completions", json=payload, ssl=False) as response:
+            if response.status != 200:
+                return RequestRecord(started_ns=started, ttft_ns=None, e2e_ns=time.monotonic_ns() - started,
+                                     output_tokens=0, error=f"Status code {response.status}")
+            async for line in response.content:
+                if not line.startswith(b"data: ") or line.startswith(b"data: [DONE]"):
+                    continue
+                chunk = json.loads(line[6:])
+                if chunk.get("usage"):
+                    usage_tokens = chunk["usage"].get("completion_tokens")
+                if any(choice.get("text") for choice in chunk.get("choices", [])):
+                    offsets.append(elapsed_us(started))
+                    if ttft is None:
+                        ttft = time.monotonic_ns() - started
+    except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
+        return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                             output_tokens=len(offsets), error=repr(err), token_offsets=offsets)
+    return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                         output_tokens=usage_tokens if usage_tokens is not None else len(offsets),
+                         token_offsets=offsets)
+
+
+async def _run_load(url: str, model_name: str, prompts: list, num_requests: int, concurrency: int,
+                    max_tokens: int, sink: Optional[Callable[[RequestRecord], None]]) -> list:
+    import aiohttp
+
+    records = [] if sink else [None] * num_requests
+    indexes = iter(range(num_requests))
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # A fixed pool of workers instead of a task per request, so nothing but the records grows with the run
+        async def _worker() -> None:
+            for index in indexes:
+                record = await _stream_completion(session, url, model_name, prompts[index % len(prompts)], max_tokens)
+                if sink:
+                    sink(record)
+                else:
+                    records[index] = record
+
+        await asyncio.gather(*(_worker() for _ in range(min(concurrency, num_requests))))
+    return records
+
+
+async def _run_open_loop(url: str, model_name: str, prompts: list, rate: float, num_requests: int, max_tokens: int,
+                         seed: int, sink: Optional[Callable[[RequestRecord], None]]) -> list:
+    import aiohttp
+
+    async def _one(session: Any, prompt: str) -> RequestRecord:
+        record = await _stream_completion(session, url, model_name, prompt, max_tokens)
+        if sink:
+            sink(record)
+        return record
+
+    arrivals = random.Random(seed)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = []
+        in_flight = set()
+        for index in range(num_requests):
+            task = asyncio.create_task(_one(session, prompts[index % len(prompts)]))
+            if sink:
+                # Completed requests were handed to the sink, only the ones in flight are referenced
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            else:
+                tasks.append(task)
+            await asyncio.sleep(arrivals.expovariate(rate))
+        await asyncio.gather(*in_flight)
+        return list(await asyncio.gather(*tasks))
+
+
+class _CountingSink:
+    """Hand records on to a sink while counting the output tokens of the successful ones."""
+
+    def __init__(self, sink: Callable[[RequestRecord], None]) -> None:
+        """
+        Initialize the _CountingSink.
+
+        Args:
+            sink (Callable[[RequestRecord], None]): The sink receiving the records.
+        """
+        self.sink = sink
+        self.output_tokens = 0
+
+    def __call__(self, record: RequestRecord) -> None:
+        if record.ok:
+            self.output_tokens += record.output_tokens
+        self.sink(record)
+
+
+def run_load(url: str,
+             model_name: str,
+             prompts: list,
+             num_requests: int = 64,
+             concurrency: int = 8,
+             max_tokens: int = 128,
+             sink: Optional[Callable[[RequestRecord], None]] = None,
+             headroom_check: bool = True) -> list:
+    """Send streamed completion requests with a fixed number in flight and time each of them.
+
+    Args:
+        url (str): The base URL of the OpenAI compatible endpoint.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        num_requests (int, optional): How many requests to send. Defaults to 64.
+        concurrency (int, optional): How many requests are in flight at once. Defaults to 8.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+        sink (Optional[Callable[[RequestRecord], None]], optional): Receives each record as its request
+            completes instead of it being kept, e.g. JsonlSink.write, so client memory does not grow with the run.
+            Defaults to None.
+        headroom_check (bool, optional): Warn when the rate nears the calibrated ceiling of the client, off while
+            calibrating it. Defaults to True.
+
+    Returns:
+        list: The RequestRecord of every request, in submission order, empty with a sink.
+    """
+    LOGGER.info(f"SENDING {num_requests} REQUESTS TO {model_name} WITH CONCURRENCY {concurrency}")
+    started = time.monotonic()
+    # With a sink the records are not kept, their tokens are counted on the way for the headroom check
+    counting = _CountingSink(sink) if sink else None
+    records = asyncio.run(_run_load(url, model_name, prompts, num_requests, concurrency, max_tokens, counting))
+    duration = time.monotonic() - started
+    tokens = counting.output_tokens if counting else sum(record.output_tokens for record in records if record.ok)
+    if headroom_check:
+        check_headroom("async_http", num_requests / duration, tokens / duration)
+    return records
+
+
+def run_open_loop(url: str,
+                  model_name: str,
+                  prompts: list,
+                  rate: float,
+                  num_requests: int = 64,
+                  max_tokens: int = 128,
+                  seed: int = 0,
+                  sink: Optional[Callable[[RequestRecord], None]] = None) -> list:
+    """Send streamed completion requests arriving as a Poisson process, however many are already in flight.
+
+    Unlike run_load, the load does not slow down when the server does, so queueing shows up in the latencies
+    the way it does with independent users.
+
+    Args:
+        url (str): The base URL of the OpenAI compatible endpoint.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        rate (float): The mean arrival rate in requests per second.
+        num_requests (int, optional): How many requests to send. Defaults to 64.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+        seed (int, optional): Seed of the inter-arrival times, so runs at different rates share a pattern.
+            Defaults to 0.
+        sink (Optional[Callable[[RequestRecord], None]], optional): Receives each record as its request
+            completes instead of it being kept. Defaults to None.
+
+    Returns:
+        list: The RequestRecord of every request, in submission order, empty with a sink.
+    """
+    LOGGER.info(f"SENDING {num_requests} REQUESTS TO {model_name} AT {rate:.2f} REQUESTS PER SECOND")
+    check_headroom("async_http", rate, rate * max_tokens)
+    return asyncio.run(_run_open_loop(url, model_name, prompts, rate, num_requests, max_tokens, seed, sink))
+
+
+def summarize(records: list, slo: Any = None) -> dict:
+    """Summarize client-side latencies and throughput of a load run.
+
+    Args:
+        records (list): The RequestRecord objects.
+        slo (Any, optional): A goodput.Slo, adding the goodput of the run to the summary. Defaults to None.
+
+    Returns:
+        dict: Request and error counts, TTFT, end-to-end and inter-token percentiles in seconds, output tokens per
+            second and, with an SLO, the goodput.
+    """
+    succeeded = [record for record in records if record.ok]
+    ttfts = [record.ttft for record in succeeded if record.ttft is not None]
+    e2es = [record.e2e for record in succeeded]
+    duration = (max(record.started_ns + record.e2e_ns for record in records)
+                - min(record.started_ns for record in records)) / NS_PER_SECOND if records else 0.0
+    tokens = sum(record.output_tokens for record in succeeded)
+    summary = {
+        "requests": len(records),
+        "errors": len(records) - len(succeeded),
+        "ttft": {f"p{q}": percentile(ttfts, q) for q in (50, 90, 99)},
+        "e2e": {f"p{q}": percentile(e2es, q) for q in (50, 90, 99)},
+        "itl": gap_percentiles(succeeded),
+        "output_tokens_per_second": tokens / duration if duration else 0.0,
+        "duration_seconds": duration,
+    }
+    if slo is not None:
+        summary["goodput"] = slo.goodput(records)
+    return summary
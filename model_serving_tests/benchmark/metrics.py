@@ -0,0 +1,358 @@
+import bisect
+import functools
+import logging
+import math
+import re
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# Only vLLM's own metrics are kept, the process and Python collector metrics are skipped before parsing
+VLLM_METRIC_PREFIXES = ("vllm:",)
+RUNNING_REQUESTS = "vllm:num_requests_running"
+WAITING_REQUESTS = "vllm:num_requests_waiting"
+KV_CACHE_USAGE = "vllm:gpu_cache_usage_perc"
+PREEMPTIONS = "vllm:num_preemptions_total"
+TTFT_HISTOGRAM = "vllm:time_to_first_token_seconds"
+E2E_HISTOGRAM = "vllm:e2e_request_latency_seconds"
+TPOT_HISTOGRAM = "vllm:time_per_output_token_seconds"
+GAUGES = (RUNNING_REQUESTS, WAITING_REQUESTS, KV_CACHE_USAGE)
+
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text: str, prefixes: tuple = VLLM_METRIC_PREFIXES) -> dict:
+    """Parse the Prometheus text exposition format.
+
+    Lines are filtered on their metric name prefix before anything else, and labels are only parsed for the
+    lines that are kept, so the cost is dominated by the handful of metrics of interest.
+
+    Args:
+        text (str): The /metrics response body.
+        prefixes (tuple, optional): Metric name prefixes to keep, empty to keep everything. Defaults to vLLM's.
+
+    Returns:
+        dict: Sample values keyed by (metric name, sorted label pairs).
+    """
+    samples = {}
+    for line in text.splitlines():
+        if not line or line[0] == "#" or (prefixes and not line.startswith(prefixes)):
+            continue
+        brace = line.find("{")
+        if brace == -1:
+            name, _, rest = line.partition(" ")
+            labels = ()
+        else:
+            end = line.rfind("}")
+            name = line[:brace]
+            labels = tuple(sorted(_LABEL_RE.findall(line, brace + 1, end)))
+            rest = line[end + 1:]
+        try:
+            # An optional timestamp may follow the value
+            samples[(name, labels)] = float(rest.split()[0])
+        except (IndexError, ValueError):
+            LOGGER.debug(f"Skipping malformed metrics line: {line}")
+    return samples
+
+
+def histogram_quantile(buckets: list, quantile: float) -> Optional[float]:
+    """Estimate a quantile from cumulative histogram buckets, interpolating linearly like Prometheus does.
+
+    Args:
+        buckets (list): (upper bound, cumulative count) pairs sorted by upper bound, ending with +Inf.
+        quantile (float): The quantile, between 0 and 1.
+
+    Returns:
+        Optional[float]: The estimate, or None if the histogram is empty.
+    """
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = quantile * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if math.isinf(upper_bound):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            return lower_bound + (upper_bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = upper_bound, count
+    return buckets[-1][0]
+
+
+@dataclass
+class MetricsSample:
+    """One scrape of the metrics endpoint.
+
+    Attributes:
+        timestamp (float): time.monotonic() when the response was received.
+        values (dict): The parsed samples, see parse_metrics.
+    """
+
+    timestamp: float
+    values: dict
+
+    def get(self, name: str, **labels: str) -> Optional[float]:
+        """Return a metric value, summed over the series matching the given labels.
+
+        Args:
+            name (str): The metric name.
+            **labels (str): Label values the series must have.
+
+        Returns:
+            Optional[float]: The value, or None if no series matches.
+        """
+        wanted = set(labels.items())
+        matches = [value for (metric, series_labels), value in self.values.items()
+                   if metric == name and wanted.issubset(series_labels)]
+        return sum(matches) if matches else None
+
+    def histogram(self, name: str, **labels: str) -> list:
+        """Return the cumulative buckets of a histogram, summed over the series matching the given labels.
+
+        Args:
+            name (str): The histogram name, without the _bucket suffix.
+            **labels (str): Label values the series must have.
+
+        Returns:
+            list: (upper bound, cumulative count) pairs sorted by upper bound.
+        """
+        wanted = set(labels.items())
+        buckets = {}
+        for (metric, series_labels), value in self.values.items():
+            if metric == f"{name}_bucket" and wanted.issubset(series_labels):
+                upper_bound = float(dict(series_labels)["le"])
+                buckets[upper_bound] = buckets.get(upper_bound, 0.0) + value
+        return sorted(buckets.items())
+
+
+@functools.lru_cache(maxsize=None)
+def _requests() -> Any:
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+    return requests
+
+
+class MetricsScraper:
+    """Poll a Prometheus metrics endpoint on a background thread and keep the samples as time series.
+
+    Scrapes run at a fixed rate over one keep-alive session. Timestamps come from time.monotonic(), the clock the
+    load generator uses, so client-observed latencies can be lined up with the server state at the same moment.
+    """
+
+    def __init__(self,
+                 url: str,
+                 interval: float = 1.0,
+                 prefixes: tuple = VLLM_METRIC_PREFIXES,
+                 timeout: float = 5.0,
+                 keep_samples: bool = True) -> None:
+        """
+        Initialize the MetricsScraper.
+
+        Args:
+            url (str): The metrics endpoint, e.g. http://localhost:8080/metrics.
+            interval (float, optional): Seconds between scrapes. Defaults to 1.0.
+            prefixes (tuple, optional): Metric name prefixes to keep. Defaults to vLLM's.
+            timeout (float, optional): Timeout of one scrape in seconds. Defaults to 5.0.
+            keep_samples (bool, optional): Whether to keep the samples as a time series. Turn it off for one-off
+                scrapes over long runs. Defaults to True.
+        """
+        self.url = url
+        self.interval = interval
+        self.prefixes = prefixes
+        self.timeout = timeout
+        self.keep_samples = keep_samples
+        self.samples = []
+        self.errors = 0
+        self.parse_seconds = 0.0
+        self._timestamps = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MetricsScraper":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "MetricsScraper":
+        """Take a first sample and start the scraping thread."""
+        self._thread = threading.Thread(target=self._run, name="metrics-scraper", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Take a last sample and stop the scraping thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + self.interval)
+
+    def scrape(self, session: Any = None) -> Optional[MetricsSample]:
+        """Scrape the endpoint once and record the sample.
+
+        Args:
+            session (Any, optional): The requests session to use. Defaults to a one-off request.
+
+        Returns:
+            Optional[MetricsSample]: The sample, or None if the scrape failed.
+        """
+        requests = _requests()
+        try:
+            response = (session or requests).get(self.url, timeout=self.timeout, verify=False)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            self.errors += 1
+            LOGGER.debug(f"Scraping {self.url} failed: {err}")
+            return None
+        timestamp = time.monotonic()
+        started = time.perf_counter()
+        sample = MetricsSample(timestamp=timestamp, values=parse_metrics(response.text, self.prefixes))
+        self.parse_seconds += time.perf_counter() - started
+        if self.keep_samples:
+            with self._lock:
+                self.samples.append(sample)
+                self._timestamps.append(timestamp)
+        return sample
+
+    def at(self, timestamp: float) -> Optional[MetricsSample]:
+        """Return the latest sample taken at or before a moment.
+
+        Args:
+            timestamp (float): A time.monotonic() value.
+
+        Returns:
+            Optional[MetricsSample]: The sample, or None if there is none that early.
+        """
+        with self._lock:
+            index = bisect.bisect_right(self._timestamps, timestamp)
+            return self.samples[index - 1] if index else None
+
+    def series(self, name: str, **labels: str) -> list:
+        """Return the time series of a metric.
+
+        Args:
+            name (str): The metric name.
+            **labels (str): Label values the series must have.
+
+        Returns:
+            list: (timestamp, value) pairs of the samples where the metric is present.
+        """
+        with self._lock:
+            samples = list(self.samples)
+        return [(sample.timestamp, value) for sample in samples
+                if (value := sample.get(name, **labels)) is not None]
+
+    def window(self) -> Optional[tuple]:
+        """Return the first and last samples, bracketing everything the server observed during the run.
+
+        Returns:
+            Optional[tuple]: The (first, last) MetricsSample pair, or None if fewer than two samples were taken.
+        """
+        with self._lock:
+            if len(self.samples) < 2:
+                return None
+            return self.samples[0], self.samples[-1]
+
+    def summary(self) -> dict:
+        """Summarize the run: gauge statistics, counter increases and server-side latency quantiles.
+
+        Returns:
+            dict: The summary, empty if fewer than two samples were taken.
+        """
+        window = self.window()
+        if window is None:
+            return {}
+        first, last = window
+        summary = {"samples": len(self.samples), "errors": self.errors,
+                   "mean_parse_ms": 1000 * self.parse_seconds / len(self.samples)}
+        for name in GAUGES:
+            values = [value for _, value in self.series(name)]
+            if values:
+                summary[name] = {"min": min(values), "mean": statistics.fmean(values), "max": max(values)}
+        if last.get(PREEMPTIONS) is not None:
+            summary[PREEMPTIONS] = last.get(PREEMPTIONS) - (first.get(PREEMPTIONS) or 0.0)
+        for name in (TTFT_HISTOGRAM, E2E_HISTOGRAM, TPOT_HISTOGRAM):
+            buckets = histogram_delta(first.histogram(name), last.histogram(name))
+            if buckets:
+                summary[name] = {f"p{int(q * 100)}": histogram_quantile(buckets, q) for q in (0.5, 0.9, 0.99)}
+        return summary
+
+    def _run(self) -> None:
+        session = _requests().Session()
+        next_tick = time.monotonic()
+        try:
+            while True:
+                self.scrape(session)
+                next_tick += self.interval
+                if self._stop.wait(max(0.0, next_tick - time.monotonic())):
+                    self.scrape(session)
+                    return
+        finally:
+            session.close()
+
+
+def histogram_delta(before: list, after: list) -> list:
+    """Subtract two cumulative histograms, giving the histogram of the observations made in between.
+
+    Args:
+        before (list): (upper bound, cumulative count) pairs of the earlier sample.
+        after (list): (upper bound, cumulative count) pairs of the later sample.
+
+    Returns:
+        list: The bucket-wise difference, empty if the later histogram is empty.
+    """
+    earlier = dict(before)
+    return [(upper_bound, count - earlier.get(upper_bound, 0.0)) for upper_bound, count in after]
+
+
+def histogram_mean(before: MetricsSample, after: MetricsSample, name: str, **labels: str) -> Optional[float]:
+    """Return the mean of the observations a histogram recorded between two samples, from its _sum and _count.
+
+    Args:
+        before (MetricsSample): The earlier sample.
+        after (MetricsSample): The later sample.
+        name (str): The histogram name, without the _sum or _count suffix.
+        **labels (str): Label values the series must have.
+
+    Returns:
+        Optional[float]: The mean, or None if nothing was observed in between.
+    """
+    total = (after.get(f"{name}_sum", **labels) or 0.0) - (before.get(f"{name}_sum", **labels) or 0.0)
+    count = (after.get(f"{name}_count", **labels) or 0.0) - (before.get(f"{name}_count", **labels) or 0.0)
+    return total / count if count > 0 else None
+
+
+def correlate(scraper: MetricsScraper, records: list, name: str, attribute: str = "e2e", **labels: str) -> dict:
+    """Pair each request with the server state when it started and measure how strongly they correlate.
+
+    Args:
+        scraper (MetricsScraper): The scraper that ran during the load.
+        records (list): RequestRecord objects of the load generator.
+        name (str): The gauge to correlate with, e.g. vllm:num_requests_waiting.
+        attribute (str, optional): The request latency attribute, "e2e" or "ttft". Defaults to "e2e".
+        **labels (str): Label values the gauge series must have.
+
+    Returns:
+        dict: The (server value, latency) pairs and their Pearson correlation, None if it is undefined.
+    """
+    pairs = []
+    for record in records:
+        sample = scraper.at(record.started)
+        latency = getattr(record, attribute)
+        if sample is None or latency is None:
+            continue
+        value = sample.get(name, **labels)
+        if value is not None:
+            pairs.append((value, latency))
+    try:
+        pearson = statistics.correlation([value for value, _ in pairs], [latency for _, latency in pairs])
+    except statistics.StatisticsError:
+        pearson = None
+    return {"pairs": pairs, "pearson": pearson}
@@ -0,0 +1,77 @@
+import itertools
+import logging
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+THROUGHPUT = "output_tokens_per_second"
+TAIL_LATENCY = "p99_e2e"
+
+
+def expand_grid(grid: dict) -> list:
+    """Expand a grid of engine arguments into the vLLM argument list of every combination.
+
+    A True value adds the bare flag, e.g. --enable-chunked-prefill, and a False value leaves it out so the server
+    default applies. Any other value is passed as --flag=value.
+
+    Args:
+        grid (dict): Candidate values keyed by argument, e.g. {"--max-num-seqs": [64, 256]}.
+
+    Returns:
+        list: The argument lists, one per combination, in grid order.
+    """
+    names = list(grid)
+    combinations = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        args = []
+        for name, value in zip(names, values):
+            if value is True:
+                args.append(name)
+            elif value is not False and value is not None:
+                args.append(f"{name}={value}")
+        combinations.append(args)
+    return combinations
+
+
+def _dominates(left: dict, right: dict) -> bool:
+    return (left[THROUGHPUT] >= right[THROUGHPUT] and left[TAIL_LATENCY] <= right[TAIL_LATENCY]
+            and (left[THROUGHPUT] > right[THROUGHPUT] or left[TAIL_LATENCY] < right[TAIL_LATENCY]))
+
+
+def pareto_front(results: list) -> list:
+    """Keep the configurations that no other one beats on both throughput and p99 latency.
+
+    Args:
+        results (list): Dicts with at least the output_tokens_per_second and p99_e2e keys. Results with errors
+            or without a p99 are left out.
+
+    Returns:
+        list: The Pareto-optimal results, highest throughput first.
+    """
+    valid = [result for result in results if not result.get("errors") and result.get(TAIL_LATENCY) is not None]
+    front = [result for result in valid if not any(_dominates(other, result) for other in valid)]
+    return sorted(front, key=lambda result: result[THROUGHPUT], reverse=True)
+
+
+def format_table(results: list, title: Optional[str] = None) -> str:
+    """Render results as a fixed-width table, Pareto-optimal rows marked with a star.
+
+    Args:
+        results (list): The sweep results, see pareto_front.
+        title (Optional[str], optional): A line printed above the table. Defaults to None.
+
+    Returns:
+        str: The table, ranked by throughput.
+    """
+    front = {id(result) for result in pareto_front(results)}
+    lines = [title] if title else []
+    lines.append(f"{'rank':>4} {'pareto':>6} {'tokens/s':>10} {'p99 e2e s':>10} {'p99 ttft s':>10} {'errors':>6}  args")
+    ranked = sorted(results, key=lambda result: result[THROUGHPUT], reverse=True)
+    for rank, result in enumerate(ranked, start=1):
+        p99_ttft = result.get("p99_ttft")
+        p99_e2e = result.get(TAIL_LATENCY)
+        lines.append(f"{rank:>4} {'*' if id(result) in front else '':>6} {result[THROUGHPUT]:>10.1f} "
+                     f"{p99_e2e if p99_e2e is not None else float('nan'):>10.3f} "
+                     f"{p99_ttft if p99_ttft is not None else float('nan'):>10.3f} {result.get('errors', 0):>6}  "
+                     f"{' '.join(result.get('args', [])) or '(defaults)'}")
+    return "\n".join(lines)
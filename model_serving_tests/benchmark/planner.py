@@ -0,0 +1,114 @@
+import logging
+import math
+from typing import Optional
+
+import yaml
+
+LOGGER = logging.getLogger(__name__)
+
+SECONDS_PER_HOUR = 3600
+# Throughput sources for the cost per token, preferred first: capacity at the SLO, then closed-loop goodput and
+# raw throughput of the serving benchmark
+THROUGHPUT_SOURCES = (
+    ("goodput_capacity", "goodput_output_tokens_per_second"),
+    ("serving", "goodput_output_tokens_per_second"),
+    ("serving", "output_tokens_per_second"),
+)
+
+
+def load_costs(path: str) -> dict:
+    """Read the hourly cost of one GPU per accelerator.
+
+    Args:
+        path (str): A YAML file mapping accelerator names, as recorded in the results, to a cost per GPU-hour.
+
+    Returns:
+        dict: The cost of each accelerator.
+
+    Raises:
+        ValueError: If the file does not map names to numbers.
+    """
+    with open(path) as file:
+        costs = yaml.safe_load(file)
+    if not isinstance(costs, dict) or not all(isinstance(cost, (int, float)) for cost in costs.values()):
+        raise ValueError(f"{path} must map each accelerator to its hourly cost per GPU")
+    return costs
+
+
+def _latest(results: list) -> dict:
+    latest = {}
+    for result in sorted(results, key=lambda result: result.get("created", 0)):
+        key = (result["model"], result["deployment_type"], result["accelerator"], result["gpu_count"], result["kind"])
+        latest[key] = result
+    return latest
+
+
+def plan_capacity(results: list, costs: dict, target_rps: float) -> list:
+    """Size and price every model deployment measured, from the latest result of each benchmark.
+
+    Replicas are needed to sustain the target rate at the highest arrival rate that met the SLO target. The cost
+    per million output tokens assumes a replica kept busy at the goodput of that rate, or at the serving benchmark
+    throughput when no capacity was searched.
+
+    Args:
+        results (list): The results stored with --benchmark-results.
+        costs (dict): The hourly cost per GPU of each accelerator, see load_costs.
+        target_rps (float): The request rate to serve.
+
+    Returns:
+        list: One plan per model, deployment type, accelerator and GPU count, cheapest per token first. Fields
+            that cannot be computed, e.g. the cost of an accelerator without a price, are None.
+    """
+    latest = _latest(results)
+    groups = {key[:4] for key in latest}
+    plans = []
+    for model, deployment_type, accelerator, gpu_count in groups:
+        capacity = latest.get((model, deployment_type, accelerator, gpu_count, "goodput_capacity"), {})
+        tokens_per_second = next(
+            (latest[(model, deployment_type, accelerator, gpu_count, kind)][field] for kind, field in THROUGHPUT_SOURCES
+             if latest.get((model, deployment_type, accelerator, gpu_count, kind), {}).get(field)), None)
+        gpu_cost = costs.get(accelerator)
+        max_rate = capacity.get("max_rate")
+        replicas = math.ceil(target_rps / max_rate) if max_rate else None
+        plans.append({
+            "model": model,
+            "deployment_type": deployment_type,
+            "accelerator": accelerator,
+            "gpu_count": gpu_count,
+            "max_rate": max_rate,
+            "output_tokens_per_second": tokens_per_second,
+            "replicas": replicas,
+            "gpus": replicas * gpu_count if replicas else None,
+            "hourly_cost": replicas * gpu_count * gpu_cost if replicas and gpu_cost is not None else None,
+            "cost_per_million_tokens": (gpu_count * gpu_cost / (tokens_per_second * SECONDS_PER_HOUR) * 1e6
+                                        if tokens_per_second and gpu_cost is not None else None),
+        })
+    return sorted(plans, key=lambda plan: (plan["cost_per_million_tokens"] is None,
+                                           plan["cost_per_million_tokens"] or 0.0, plan["model"]))
+
+
+def _cell(value: Optional[float], width: int, precision: int) -> str:
+    return f"{value:>{width}.{precision}f}" if value is not None else f"{'-':>{width}}"
+
+
+def format_plan(plans: list, target_rps: float) -> str:
+    """Render capacity plans as a fixed-width table.
+
+    Args:
+        plans (list): The plans, see plan_capacity.
+        target_rps (float): The request rate they were sized for.
+
+    Returns:
+        str: The table.
+    """
+    lines = [f"Capacity plan for {target_rps:g} requests/s",
+             f"{'model':<32} {'type':<18} {'accelerator':<16} {'gpus':>4} {'max req/s':>9} {'tokens/s':>9} "
+             f"{'replicas':>8} {'$/hour':>9} {'$/M tokens':>10}"]
+    for plan in plans:
+        lines.append(f"{plan['model']:<32} {plan['deployment_type']:<18} {plan['accelerator']:<16} "
+                     f"{plan['gpu_count']:>4} {_cell(plan['max_rate'], 9, 2)} "
+                     f"{_cell(plan['output_tokens_per_second'], 9, 1)} "
+                     f"{plan['replicas'] if plan['replicas'] is not None else '-':>8} "
+                     f"{_cell(plan['hourly_cost'], 9, 2)} {_cell(plan['cost_per_million_tokens'], 10, 3)}")
+    return "\n".join(lines)
+
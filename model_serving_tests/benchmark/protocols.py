@@ -0,0 +1,171 @@
+import functools
+import json
+import logging
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from model_serving_tests.benchmark.calibration import check_headroom
+from model_serving_tests.benchmark.load import RequestRecord, elapsed_us, summarize
+
+LOGGER = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _requests() -> Any:
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+    return requests
+
+
+def _grpc_request(stub: Any, pb2: Any, model_name: str, prompt: str, max_tokens: int) -> RequestRecord:
+    import grpc
+
+    request = pb2.SingleGenerationRequest(
+        model_id=model_name,
+        request=pb2.GenerationRequest(text=prompt),
+        # Both protocols generate exactly max_tokens greedy tokens, so they do the same work on the server
+        params=pb2.Parameters(
+            method=pb2.GREEDY,
+            stopping=pb2.StoppingCriteria(max_new_tokens=max_tokens, min_new_tokens=max_tokens),
+        ),
+    )
+    started = time.monotonic_ns()
+    ttft = None
+    offsets = array("I")
+    output_tokens = 0
+    try:
+        for response in stub.GenerateStream(request=request):
+            if response.text:
+                offsets.append(elapsed_us(started))
+                if ttft is None:
+                    ttft = time.monotonic_ns() - started
+            output_tokens = max(output_tokens, response.generated_token_count)
+    except grpc.RpcError as err:
+        return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                             output_tokens=output_tokens, error=err.details(), token_offsets=offsets)
+    return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                         output_tokens=output_tokens, token_offsets=offsets)
+
+
+def _http_request(session: Any, url: str, model_name: str, prompt: str, max_tokens: int) -> RequestRecord:
+    requests = _requests()
+    payload = {"model": model_name, "prompt": prompt, "max_tokens": max_tokens, "min_tokens": max_tokens,
+               "temperature": 0, "stream": True, "stream_options": {"include_usage": True}}
+    started = time.monotonic_ns()
+    ttft = None
+    offsets = array("I")
+    output_tokens = 0
+    try:
+        with session.post(f"{url}/v1/completions", json=payload, stream=True, verify=False) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b"data: ") or line == b"data: [DONE]":
+                    continue
+                chunk = json.loads(line[6:])
+                if chunk.get("usage"):
+                    output_tokens = chunk["usage"]["completion_tokens"]
+                if any(choice.get("text") for choice in chunk.get("choices", [])):
+                    offsets.append(elapsed_us(started))
+                    if ttft is None:
+                        ttft = time.monotonic_ns() - started
+    except (requests.exceptions.RequestException, json.JSONDecodeError) as err:
+        return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                             output_tokens=output_tokens, error=repr(err), token_offsets=offsets)
+    return RequestRecord(started_ns=started, ttft_ns=ttft, e2e_ns=time.monotonic_ns() - started,
+                         output_tokens=output_tokens, token_offsets=offsets)
+
+
+def _measure(client: str, send: Callable[[str], RequestRecord], prompts: list, num_requests: int,
+             concurrency: int, headroom_check: bool) -> dict:
+    cpu_started, started = time.process_time(), time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        records = list(executor.map(send, (prompts[index % len(prompts)] for index in range(num_requests))))
+    duration = time.monotonic() - started
+    summary = summarize(records)
+    summary["client_cpu_ms_per_request"] = 1000 * (time.process_time() - cpu_started) / num_requests
+    if headroom_check:
+        check_headroom(client, num_requests / duration, summary["output_tokens_per_second"])
+    return summary
+
+
+def grpc_load(host: str, model_name: str, prompts: list, num_requests: int = 64, concurrency: int = 8,
+              max_tokens: int = 128, headroom_check: bool = True) -> dict:
+    """Send streamed TGIS GenerateStream requests over one gRPC channel from a thread pool.
+
+    Args:
+        host (str): The gRPC server host:port.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        num_requests (int, optional): How many requests to send. Defaults to 64.
+        concurrency (int, optional): How many requests are in flight at once. Defaults to 8.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+        headroom_check (bool, optional): Warn when the rate nears the calibrated ceiling of the client, off while
+            calibrating it. Defaults to True.
+
+    Returns:
+        dict: The summarize() output plus the client CPU milliseconds per request.
+    """
+    import grpc
+    from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+
+    pb2 = generation_pb2_grpc.generation__pb2
+    with grpc.insecure_channel(host) as channel:
+        stub = generation_pb2_grpc.GenerationServiceStub(channel)
+        return _measure("grpc", lambda prompt: _grpc_request(stub, pb2, model_name, prompt, max_tokens),
+                        prompts, num_requests, concurrency, headroom_check)
+
+
+def http_load(url: str, model_name: str, prompts: list, num_requests: int = 64, concurrency: int = 8,
+              max_tokens: int = 128, headroom_check: bool = True) -> dict:
+    """Send streamed OpenAI completion requests from a thread pool, one kept-alive session per thread.
+
+    Uses the same threading model as grpc_load so the client CPU figures are comparable.
+
+    Args:
+        url (str): The base URL of the OpenAI compatible endpoint.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        num_requests (int, optional): How many requests to send. Defaults to 64.
+        concurrency (int, optional): How many requests are in flight at once. Defaults to 8.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+        headroom_check (bool, optional): Warn when the rate nears the calibrated ceiling of the client, off while
+            calibrating it. Defaults to True.
+
+    Returns:
+        dict: The summarize() output plus the client CPU milliseconds per request.
+    """
+    requests = _requests()
+    local = threading.local()
+    sessions = []
+
+    def _send(prompt: str) -> RequestRecord:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            sessions.append(local.session)
+        return _http_request(local.session, url, model_name, prompt, max_tokens)
+
+    try:
+        return _measure("threaded_http", _send, prompts, num_requests, concurrency, headroom_check)
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def wire_bytes(before: dict, after: dict, num_requests: int) -> dict:
+    """Turn two port-forward counter snapshots into bytes on the wire per request.
+
+    Args:
+        before (dict): PortForward.stats() before the run.
+        after (dict): PortForward.stats() after the run.
+        num_requests (int): The requests sent in between.
+
+    Returns:
+        dict: Bytes sent and received per request.
+    """
+    return {direction: (after[direction] - before[direction]) / num_requests
+            for direction in ("bytes_sent", "bytes_received")}
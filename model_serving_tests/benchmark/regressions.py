@@ -0,0 +1,95 @@
+import logging
+from typing import Optional
+
+from model_serving_tests.benchmark.stats import MIN_EFFECT, SIGNIFICANCE, compare_samples
+
+LOGGER = logging.getLogger(__name__)
+
+# The stored result fields compared, and whether a higher value is better
+METRICS = {
+    "output_tokens_per_second": True,
+    "goodput_output_tokens_per_second": True,
+    "max_rate": True,
+    "ttft_p50": False,
+    "ttft_p99": False,
+    "e2e_p50": False,
+    "e2e_p99": False,
+}
+GROUP_FIELDS = ("kind", "model", "deployment_type", "accelerator", "gpu_count")
+
+
+def group_results(results: list) -> dict:
+    """Collect the values of every metric over the repeated runs of each benchmark.
+
+    Args:
+        results (list): The results stored with --benchmark-results.
+
+    Returns:
+        dict: For each (kind, model, deployment_type, accelerator, gpu_count), the list of values of each metric
+            the results carry.
+    """
+    groups = {}
+    for result in results:
+        metrics = groups.setdefault(tuple(result.get(field) for field in GROUP_FIELDS), {})
+        for metric in METRICS:
+            if isinstance(result.get(metric), (int, float)):
+                metrics.setdefault(metric, []).append(result[metric])
+    return groups
+
+
+def compare_result_sets(baseline: list,
+                        candidate: list,
+                        alpha: float = SIGNIFICANCE,
+                        min_effect: float = MIN_EFFECT) -> list:
+    """Compare two sets of stored benchmark results, benchmark by benchmark and metric by metric.
+
+    Each benchmark should have been run several times in both sets: the repeated runs are the samples of the
+    significance test, and with three runs per side no change can be significant at 0.05, so such metrics get the
+    insufficient data verdict instead of unchanged.
+
+    Args:
+        baseline (list): The reference results.
+        candidate (list): The compared results.
+        alpha (float, optional): Significance level. Defaults to SIGNIFICANCE.
+        min_effect (float, optional): Smallest relative median change flagged. Defaults to MIN_EFFECT.
+
+    Returns:
+        list: One dict per benchmark and metric present in both sets, with the group fields, the metric and the
+            compare_samples output, regressions first.
+    """
+    baseline_groups, candidate_groups = group_results(baseline), group_results(candidate)
+    rows = []
+    for key in sorted(baseline_groups.keys() & candidate_groups.keys(), key=str):
+        for metric in METRICS:
+            before, after = baseline_groups[key].get(metric), candidate_groups[key].get(metric)
+            if not before or not after:
+                continue
+            rows.append({**dict(zip(GROUP_FIELDS, key)), "metric": metric,
+                         **compare_samples(before, after, higher_is_better=METRICS[metric], alpha=alpha,
+                                           min_effect=min_effect)})
+    missing = len(baseline_groups.keys() ^ candidate_groups.keys())
+    if missing:
+        LOGGER.warning(f"{missing} benchmarks are only in one of the result sets and are not compared")
+    return sorted(rows, key=lambda row: row["verdict"] != "regression")
+
+
+def _percent(value: Optional[float]) -> str:
+    return f"{value:+.1%}" if value is not None else "-"
+
+
+def format_comparison(rows: list) -> str:
+    """Render a result set comparison as a fixed-width table.
+
+    Args:
+        rows (list): The compare_result_sets output.
+
+    Returns:
+        str: The table.
+    """
+    lines = [f"{'benchmark':<56} {'metric':<34} {'n':>7} {'change':>8} {'95% CI':>17} {'p':>7}  verdict"]
+    for row in rows:
+        benchmark = " ".join(str(row[field]) for field in GROUP_FIELDS)
+        interval = f"[{_percent(row['ci'][0])}, {_percent(row['ci'][1])}]" if row["ci"] else "-"
+        lines.append(f"{benchmark:<56} {row['metric']:<34} {row['baseline_n']:>3}/{row['candidate_n']:<3} "
+                     f"{_percent(row['change']):>8} {interval:>17} {row['p_value']:>7.3f}  {row['verdict']}")
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from kubernetes.dynamic.client import DynamicClient
+
+LOGGER = logging.getLogger(__name__)
+
+PREDICTOR_CONTAINER = "kserve-container"
+# Node labels set by the NVIDIA and AMD GPU feature discovery with the accelerator model
+ACCELERATOR_PRODUCT_LABELS = ("nvidia.com/gpu.product", "amd.com/gpu.product-name")
+_QUANTITY_RE = re.compile(r"^([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$")
+_SUFFIXES = {
+    "": 1, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18,
+    "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40, "Pi": 2 ** 50, "Ei": 2 ** 60,
+}
+
+
+def parse_quantity(quantity: str) -> float:
+    """Convert a Kubernetes resource quantity to a number, cores for CPU and bytes for memory.
+
+    Args:
+        quantity (str): The quantity, e.g. "250m", "1532412n" or "15Gi".
+
+    Returns:
+        float: The value in base units.
+
+    Raises:
+        ValueError: If the quantity is not valid.
+    """
+    match = _QUANTITY_RE.match(str(quantity).strip())
+    if not match or match.group(2) not in _SUFFIXES:
+        raise ValueError(f"Invalid resource quantity: {quantity}")
+    return float(match.group(1)) * _SUFFIXES[match.group(2)]
+
+
+def container_usage(client: DynamicClient, namespace: str, pod_name: str,
+                    container: str = PREDICTOR_CONTAINER) -> Optional[dict]:
+    """Read the current CPU and memory usage of a container from the metrics API.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace of the pod.
+        pod_name (str): The pod name.
+        container (str, optional): The container name. Defaults to the KServe predictor container.
+
+    Returns:
+        Optional[dict]: cpu_cores and memory_bytes, or None if metrics-server has no sample for the container yet.
+    """
+    from kubernetes.dynamic.exceptions import NotFoundError
+
+    api = client.resources.get(api_version="metrics.k8s.io/v1beta1", kind="PodMetrics")
+    try:
+        metrics = api.get(name=pod_name, namespace=namespace)
+    except NotFoundError:
+        LOGGER.debug(f"No metrics yet for pod {namespace}/{pod_name}")
+        return None
+    for entry in metrics.containers or []:
+        if entry.name == container:
+            return {"cpu_cores": parse_quantity(entry.usage.cpu), "memory_bytes": parse_quantity(entry.usage.memory)}
+    return None
+
+
+def container_restarts(client: DynamicClient, namespace: str, pod_name: str,
+                       container: str = PREDICTOR_CONTAINER) -> int:
+    """Return how many times a container of a pod restarted, e.g. after being OOM killed.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace of the pod.
+        pod_name (str): The pod name.
+        container (str, optional): The container name. Defaults to the KServe predictor container.
+
+    Returns:
+        int: The restart count, 0 if the container has no status.
+    """
+    pod = client.resources.get(api_version="v1", kind="Pod").get(name=pod_name, namespace=namespace)
+    for status in pod.status.containerStatuses or []:
+        if status.name == container:
+            return status.restartCount
+    return 0
+
+
+def container_image(client: DynamicClient, namespace: str, pod_name: str,
+                    container: str = PREDICTOR_CONTAINER) -> Optional[str]:
+    """Return the image a container of a pod runs, resolved to its digest once the image is pulled.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace of the pod.
+        pod_name (str): The pod name.
+        container (str, optional): The container name. Defaults to the KServe predictor container.
+
+    Returns:
+        Optional[str]: The image ID of the container status, else the image of the spec, None if the pod has no
+            such container.
+    """
+    pod = client.resources.get(api_version="v1", kind="Pod").get(name=pod_name, namespace=namespace)
+    for status in pod.status.containerStatuses or []:
+        if status.name == container and status.imageID:
+            return status.imageID
+    return next((spec.image for spec in pod.spec.containers if spec.name == container), None)
+
+
+def node_accelerator(client: DynamicClient, namespace: str, pod_name: str) -> Optional[str]:
+    """Return the accelerator model of the node a pod runs on, from the labels of the GPU feature discovery.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace of the pod.
+        pod_name (str): The pod name.
+
+    Returns:
+        Optional[str]: The product name, e.g. "NVIDIA-A100-SXM4-80GB", or None if the node has no such label.
+    """
+    pod = client.resources.get(api_version="v1", kind="Pod").get(name=pod_name, namespace=namespace)
+    node = client.resources.get(api_version="v1", kind="Node").get(name=pod.spec.nodeName)
+    labels = dict(node.metadata.labels or {})
+    for label in ACCELERATOR_PRODUCT_LABELS:
+        if labels.get(label):
+            return labels[label]
+    return None
+
+
+def parse_df(output: str) -> Optional[dict]:
+    """Parse the output of `df -B1 <path>` for one filesystem.
+
+    Args:
+        output (str): The command output, a header line and one row.
+
+    Returns:
+        Optional[dict]: size_bytes and used_bytes, or None if the output has no row.
+    """
+    lines = [line.split() for line in output.strip().splitlines()]
+    if len(lines) < 2:
+        return None
+    # A long filesystem name wraps the row onto a second line
+    row = lines[1] if len(lines[1]) >= 4 else lines[1] + lines[2]
+    return {"size_bytes": float(row[1]), "used_bytes": float(row[2])}
+
+
+def shm_usage(pod: Any, container: str = PREDICTOR_CONTAINER) -> Optional[dict]:
+    """Read the size and usage of /dev/shm inside a container.
+
+    Args:
+        pod (Any): The ocp_resources Pod.
+        container (str, optional): The container name. Defaults to the KServe predictor container.
+
+    Returns:
+        Optional[dict]: size_bytes and used_bytes, or None if df failed.
+    """
+    from ocp_resources.pod import ExecOnPodError
+
+    try:
+        return parse_df(pod.execute(command=["df", "-B1", "/dev/shm"], container=container))
+    except ExecOnPodError as err:
+        LOGGER.debug(f"df /dev/shm failed in {pod.name}: {err}")
+        return None
+
+
+class ResourceSampler:
+    """Call a sampling function on a background thread at a fixed interval and keep what it returns."""
+
+    def __init__(self, sample: Callable[[], Optional[dict]], interval: float = 5.0) -> None:
+        """
+        Initialize the ResourceSampler.
+
+        Args:
+            sample (Callable[[], Optional[dict]]): Returns one sample, or None to skip it.
+            interval (float, optional): Seconds between samples. Defaults to 5.0.
+        """
+        self.sample = sample
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ResourceSampler":
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                sample = self.sample()
+            except Exception:
+                LOGGER.exception("Resource sampling failed")
+                sample = None
+            if sample is not None:
+                self.samples.append(sample)
+            if self._stop.wait(self.interval):
+                return
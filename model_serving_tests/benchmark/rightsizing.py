@@ -0,0 +1,123 @@
+import logging
+import math
+from typing import Optional
+
+from model_serving_tests.benchmark.load import percentile
+from model_serving_tests.benchmark.resources import parse_quantity
+
+LOGGER = logging.getLogger(__name__)
+
+# Recommended requests leave this much room over what was observed under the heaviest load
+CPU_HEADROOM = 1.2
+MEMORY_HEADROOM = 1.25
+SHM_HEADROOM = 1.5
+CPU_STEP_CORES = 0.5
+MIN_CPU_CORES = 1.0
+GIB = 2 ** 30
+USAGE_KEYS = ("cpu_cores", "memory_bytes", "shm_used_bytes")
+
+
+def usage_statistics(samples: list) -> dict:
+    """Reduce resource samples to their median, 95th percentile and peak.
+
+    Args:
+        samples (list): Dicts with any of cpu_cores, memory_bytes and shm_used_bytes.
+
+    Returns:
+        dict: p50, p95 and max of each key present in the samples.
+    """
+    statistics = {}
+    for key in USAGE_KEYS:
+        values = [sample[key] for sample in samples if sample.get(key) is not None]
+        if values:
+            statistics[key] = {"p50": percentile(values, 50), "p95": percentile(values, 95), "max": max(values)}
+    return statistics
+
+
+def _round_up(value: float, step: float, minimum: float = 0.0) -> float:
+    return max(minimum, math.ceil(value / step) * step)
+
+
+def format_cpu(cores: float) -> str:
+    """Format cores as a Kubernetes CPU quantity.
+
+    Args:
+        cores (float): The number of cores.
+
+    Returns:
+        str: The quantity, e.g. "3" or "2500m".
+    """
+    return str(int(cores)) if cores == int(cores) else f"{int(round(cores * 1000))}m"
+
+
+def format_memory(size: float) -> str:
+    """Format bytes as a Kubernetes memory quantity, rounded up to whole GiB.
+
+    Args:
+        size (float): The number of bytes.
+
+    Returns:
+        str: The quantity, e.g. "12Gi".
+    """
+    return f"{int(math.ceil(size / GIB))}Gi"
+
+
+def predictor_requests(isvc: dict) -> tuple:
+    """Read the resource requests and /dev/shm size limit of an InferenceService predictor.
+
+    Args:
+        isvc (dict): The InferenceService manifest or live object as a dict.
+
+    Returns:
+        tuple: The cpu and memory requests, and the sizeLimit of the shared-memory volume or None.
+    """
+    predictor = isvc.get("spec", {}).get("predictor", {})
+    requests = predictor.get("model", {}).get("resources", {}).get("requests", {})
+    current = {key: str(requests[key]) for key in ("cpu", "memory") if key in requests}
+    shm_size_limit = None
+    for volume in predictor.get("volumes") or []:
+        if volume.get("name") == "shared-memory":
+            shm_size_limit = (volume.get("emptyDir") or {}).get("sizeLimit")
+    return current, shm_size_limit
+
+
+def recommend_requests(levels: dict, current: dict, shm_size_limit: Optional[str] = None) -> dict:
+    """Recommend predictor resource requests from the usage observed at every load level.
+
+    CPU is sized on the highest 95th percentile, since short bursts can borrow idle node CPU, while memory and
+    /dev/shm are sized on the peak since exceeding them gets the container OOM killed or vLLM's workers stuck.
+
+    Args:
+        levels (dict): usage_statistics() output keyed by load level, e.g. the concurrency.
+        current (dict): The current requests of the predictor container, e.g. {"cpu": "8", "memory": "15Gi"}.
+        shm_size_limit (Optional[str], optional): The current sizeLimit of the /dev/shm volume, None if the
+            predictor has none. Defaults to None.
+
+    Returns:
+        dict: The observed maxima, the current and recommended cpu, memory and shm quantities, and how much
+            CPU and memory the recommendation frees per predictor.
+    """
+    def _highest(key: str, stat: str) -> Optional[float]:
+        values = [usage[key][stat] for usage in levels.values() if key in usage]
+        return max(values) if values else None
+
+    observed = {"cpu_cores_p95": _highest("cpu_cores", "p95"), "memory_bytes_max": _highest("memory_bytes", "max"),
+                "shm_used_bytes_max": _highest("shm_used_bytes", "max")}
+    recommendation = {"observed": observed, "current": dict(current), "recommended": {}, "freed": {}}
+    if shm_size_limit:
+        recommendation["current"]["shm"] = shm_size_limit
+    if observed["cpu_cores_p95"] is not None:
+        cpu = _round_up(observed["cpu_cores_p95"] * CPU_HEADROOM, CPU_STEP_CORES, MIN_CPU_CORES)
+        recommendation["recommended"]["cpu"] = format_cpu(cpu)
+        if current.get("cpu"):
+            recommendation["freed"]["cpu_cores"] = parse_quantity(current["cpu"]) - cpu
+    if observed["memory_bytes_max"] is not None:
+        memory = _round_up(observed["memory_bytes_max"] * MEMORY_HEADROOM, GIB, GIB)
+        recommendation["recommended"]["memory"] = format_memory(memory)
+        if current.get("memory"):
+            recommendation["freed"]["memory_bytes"] = parse_quantity(current["memory"]) - memory
+    if shm_size_limit and observed["shm_used_bytes_max"] is not None:
+        shm = _round_up(observed["shm_used_bytes_max"] * SHM_HEADROOM, GIB, GIB)
+        recommendation["recommended"]["shm"] = format_memory(shm)
+        recommendation["freed"]["shm_bytes"] = parse_quantity(shm_size_limit) - shm
+    return recommendation
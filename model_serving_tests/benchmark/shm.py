@@ -0,0 +1,49 @@
+import logging
+from typing import Optional
+
+from model_serving_tests.benchmark.resources import parse_quantity
+
+LOGGER = logging.getLogger(__name__)
+
+# A size degrades performance when its throughput falls more than this share below the largest size's
+THROUGHPUT_TOLERANCE = 0.05
+
+
+def smallest_adequate_shm(results: list, tolerance: float = THROUGHPUT_TOLERANCE) -> dict:
+    """Find, per executor backend, the smallest /dev/shm size that performs like the largest one.
+
+    The reference is the largest size of the backend that deployed and served every request; larger sizes that
+    failed, e.g. because they do not fit in the node memory, are skipped. Below the reference a size is adequate
+    when the predictor deployed, every request succeeded and its throughput is within the tolerance of the
+    reference's. Sizes are only accepted if every size between them and the reference is adequate too, so a
+    lucky run below a failing size is not picked.
+
+    Args:
+        results (list): Dicts with backend, shm_size, deployed, errors and output_tokens_per_second.
+        tolerance (float, optional): Accepted throughput loss. Defaults to THROUGHPUT_TOLERANCE.
+
+    Returns:
+        dict: For each backend, the smallest adequate shm_size (None if no size ran cleanly), the reference
+            throughput and the startup time at that size.
+    """
+    by_backend = {}
+    for result in results:
+        by_backend.setdefault(result["backend"], []).append(result)
+
+    recommendations = {}
+    for backend, backend_results in by_backend.items():
+        ordered = sorted(backend_results, key=lambda result: parse_quantity(result["shm_size"]), reverse=True)
+        reference = next((result for result in ordered if result["deployed"] and not result["errors"]), None)
+        chosen: Optional[dict] = None
+        if reference is not None:
+            floor = reference["output_tokens_per_second"] * (1 - tolerance)
+            for result in ordered[ordered.index(reference):]:
+                if not result["deployed"] or result["errors"] or result["output_tokens_per_second"] < floor:
+                    break
+                chosen = result
+        recommendations[backend] = {
+            "shm_size": chosen["shm_size"] if chosen else None,
+            "reference_output_tokens_per_second": reference["output_tokens_per_second"] if reference else None,
+            "load_seconds": chosen["load_seconds"] if chosen else None,
+        }
+    return recommendations
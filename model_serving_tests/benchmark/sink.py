@@ -0,0 +1,208 @@
+import json
+import logging
+from array import array
+from collections import Counter
+from dataclasses import asdict
+from typing import Any, Iterator, Optional
+
+from model_serving_tests.benchmark.load import (GAP_BUCKET_US, NS_PER_SECOND, NS_PER_US, RequestRecord,
+                                                bucket_percentiles, count_gaps)
+
+LOGGER = logging.getLogger(__name__)
+
+# Bytes of serialized records buffered before they are written out
+BUFFER_BYTES = 1 << 20
+# Latencies of a streamed summary are counted in buckets this wide
+LATENCY_BUCKET_NS = 1_000_000
+
+
+def record_to_dict(record: RequestRecord) -> dict:
+    """Serialize a request record to JSON-compatible values.
+
+    Args:
+        record (RequestRecord): The record.
+
+    Returns:
+        dict: Its fields, the token offsets as a list.
+    """
+    return {"started_ns": record.started_ns, "ttft_ns": record.ttft_ns, "e2e_ns": record.e2e_ns,
+            "output_tokens": record.output_tokens, "error": record.error,
+            "token_offsets": record.token_offsets.tolist()}
+
+
+def record_from_dict(values: dict) -> RequestRecord:
+    """Rebuild a request record from record_to_dict output.
+
+    Args:
+        values (dict): The serialized fields.
+
+    Returns:
+        RequestRecord: The record.
+    """
+    return RequestRecord(started_ns=values["started_ns"], ttft_ns=values["ttft_ns"], e2e_ns=values["e2e_ns"],
+                         output_tokens=values["output_tokens"], error=values["error"],
+                         token_offsets=array("I", values["token_offsets"]))
+
+
+class JsonlSink:
+    """Write request records, or any JSON-compatible response, to a JSON Lines file as they arrive.
+
+    At most BUFFER_BYTES of serialized lines are held before being written, so client memory does not depend on
+    the length of the run. Pass the write method as the sink of run_load or run_open_loop.
+    """
+
+    def __init__(self, path: str, buffer_bytes: int = BUFFER_BYTES) -> None:
+        """
+        Initialize the JsonlSink, truncating the file so it only holds the records of this sink.
+
+        Args:
+            path (str): The JSON Lines file.
+            buffer_bytes (int, optional): Write buffer size. Defaults to BUFFER_BYTES.
+        """
+        self.path = path
+        self.written = 0
+        self._file = open(path, "w", buffering=buffer_bytes)
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, item: Any) -> None:
+        """Write one line.
+
+        Args:
+            item (Any): A RequestRecord, serialized with record_to_dict, or a JSON-compatible value.
+        """
+        if isinstance(item, RequestRecord):
+            item = record_to_dict(item)
+        self._file.write(json.dumps(item, separators=(",", ":")) + "\n")
+        self.written += 1
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+        LOGGER.info(f"{self.written} LINES WRITTEN TO {self.path}")
+
+
+def read_jsonl(path: str) -> Iterator[Any]:
+    """Yield the values of a JSON Lines file one at a time.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        Iterator[Any]: The decoded lines.
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_records(path: str) -> Iterator[RequestRecord]:
+    """Yield the request records of a JsonlSink file one at a time.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        Iterator[RequestRecord]: The records.
+    """
+    return map(record_from_dict, read_jsonl(path))
+
+
+class StreamingSummary:
+    """Summarize a load run one record at a time, in memory independent of the number of requests.
+
+    Latencies are counted in LATENCY_BUCKET_NS buckets and inter-token gaps in GAP_BUCKET_US buckets, so the
+    percentiles are those of summarize() rounded up to the bucket width. The write method is a valid sink.
+    """
+
+    def __init__(self, slo: Any = None) -> None:
+        """
+        Initialize the StreamingSummary.
+
+        Args:
+            slo (Any, optional): A goodput.Slo, adding the goodput of the run to the summary. Defaults to None.
+        """
+        self.slo = slo
+        self.requests = 0
+        self.errors = 0
+        self.output_tokens = 0
+        self.good = 0
+        self.good_tokens = 0
+        self.first_started_ns: Optional[int] = None
+        self.last_finished_ns: Optional[int] = None
+        self.ttft = Counter()
+        self.e2e = Counter()
+        self.gaps = Counter()
+
+    def write(self, record: RequestRecord) -> None:
+        """Add a request to the summary.
+
+        Args:
+            record (RequestRecord): The request.
+        """
+        self.requests += 1
+        finished = record.started_ns + record.e2e_ns
+        if self.first_started_ns is None or record.started_ns < self.first_started_ns:
+            self.first_started_ns = record.started_ns
+        if self.last_finished_ns is None or finished > self.last_finished_ns:
+            self.last_finished_ns = finished
+        if self.slo is not None and self.slo.met(record):
+            self.good += 1
+            self.good_tokens += record.output_tokens
+        if not record.ok:
+            self.errors += 1
+            return
+        self.output_tokens += record.output_tokens
+        self.e2e[record.e2e_ns // LATENCY_BUCKET_NS] += 1
+        if record.ttft_ns is not None:
+            self.ttft[record.ttft_ns // LATENCY_BUCKET_NS] += 1
+        count_gaps(self.gaps, record)
+
+    def result(self) -> dict:
+        """Return the summary of the requests added so far.
+
+        Returns:
+            dict: The keys of summarize(), with bucketed percentiles.
+        """
+        duration = ((self.last_finished_ns - self.first_started_ns) / NS_PER_SECOND
+                    if self.first_started_ns is not None else 0.0)
+        latency_bucket = LATENCY_BUCKET_NS / NS_PER_SECOND
+        summary = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "ttft": bucket_percentiles(self.ttft, latency_bucket),
+            "e2e": bucket_percentiles(self.e2e, latency_bucket),
+            "itl": bucket_percentiles(self.gaps, GAP_BUCKET_US * NS_PER_US / NS_PER_SECOND),
+            "output_tokens_per_second": self.output_tokens / duration if duration else 0.0,
+            "duration_seconds": duration,
+        }
+        if self.slo is not None:
+            summary["goodput"] = {
+                "slo": asdict(self.slo),
+                "met": self.good,
+                "share": self.good / self.requests if self.requests else 0.0,
+                "requests_per_second": self.good / duration if duration else 0.0,
+                "output_tokens_per_second": self.good_tokens / duration if duration else 0.0,
+            }
+        return summary
+
+
+def summarize_jsonl(path: str, slo: Any = None) -> dict:
+    """Summarize the request records of a JsonlSink file in one streaming pass.
+
+    Args:
+        path (str): The file.
+        slo (Any, optional): A goodput.Slo. Defaults to None.
+
+    Returns:
+        dict: The StreamingSummary result.
+    """
+    summary = StreamingSummary(slo)
+    for record in read_records(path):
+        summary.write(record)
+    return summary.result()
@@ -0,0 +1,170 @@
+import logging
+import time
+from typing import Callable, Optional
+
+from model_serving_tests.benchmark.load import RequestRecord, run_load
+from model_serving_tests.benchmark.metrics import KV_CACHE_USAGE, PREEMPTIONS, MetricsScraper
+from model_serving_tests.benchmark.sink import StreamingSummary
+from model_serving_tests.benchmark.trend import OnlineTrend
+
+LOGGER = logging.getLogger(__name__)
+
+# Requests per concurrent slot in one load batch; windows are made of whole batches
+REQUESTS_PER_SLOT = 4
+# A resource or latency is flagged when its fit rises with t > MIN_T and by more than this share per hour
+MIN_T = 3.0
+MEMORY_GROWTH_PER_HOUR = 0.05
+LATENCY_GROWTH_PER_HOUR = 0.10
+RESOURCE_TRENDS = ("memory_bytes", "cpu_cores")
+LATENCY_TRENDS = ("e2e_p50", "e2e_p99", "ttft_p50")
+
+
+class SoakMonitor:
+    """Fold the windows of a soak run into online trends and flag memory leaks and latency creep.
+
+    Nothing grows with the length of the run: each window's requests are streamed into a summary, whose
+    statistics update one OnlineTrend per tracked value, and only the first and last metrics samples are kept.
+    """
+
+    def __init__(self,
+                 sample_pod: Callable[[], Optional[dict]],
+                 scraper: MetricsScraper,
+                 sample_restarts: Optional[Callable[[], int]] = None) -> None:
+        """
+        Initialize the SoakMonitor.
+
+        Args:
+            sample_pod (Callable[[], Optional[dict]]): Returns the predictor's cpu_cores and memory_bytes, or None
+                if no sample is available.
+            scraper (MetricsScraper): Scrapes the vLLM metrics once per window, created with keep_samples off.
+            sample_restarts (Optional[Callable[[], int]], optional): Returns the predictor container restart count.
+                Defaults to None.
+        """
+        self.sample_pod = sample_pod
+        self.scraper = scraper
+        self.sample_restarts = sample_restarts
+        self.trends = {name: OnlineTrend(name) for name in RESOURCE_TRENDS + LATENCY_TRENDS + (KV_CACHE_USAGE,)}
+        self.started = time.monotonic()
+        self.windows = 0
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+        self._first_metrics = None
+        self._last_metrics = None
+
+    def observe_window(self, summary: dict) -> dict:
+        """Take one window of requests and the current server state, and update the trends.
+
+        Args:
+            summary (dict): The summary of the window's requests, from a StreamingSummary or summarize().
+
+        Returns:
+            dict: The window statistics that were added to the trends.
+        """
+        elapsed = time.monotonic() - self.started
+        self.windows += 1
+        self.requests += summary["requests"]
+        self.errors += summary["errors"]
+        window = {
+            "e2e_p50": summary["e2e"]["p50"],
+            "e2e_p99": summary["e2e"]["p99"],
+            "ttft_p50": summary["ttft"]["p50"],
+        }
+        window.update(self.sample_pod() or {})
+        sample = self.scraper.scrape()
+        if sample is not None:
+            self._first_metrics = self._first_metrics or sample
+            self._last_metrics = sample
+            window[KV_CACHE_USAGE] = sample.get(KV_CACHE_USAGE)
+        if self.sample_restarts is not None:
+            self.restarts = self.sample_restarts()
+        for name, value in window.items():
+            if value is not None and name in self.trends:
+                self.trends[name].add(elapsed, value)
+        return window
+
+    def findings(self) -> list:
+        """Return what looks like a degradation so far.
+
+        Returns:
+            list: Human readable findings, empty if the run looks healthy.
+        """
+        findings = []
+        if self.trends["memory_bytes"].is_growing(MIN_T, MEMORY_GROWTH_PER_HOUR):
+            growth = self.trends["memory_bytes"].relative_growth_per_hour()
+            findings.append(f"Possible memory leak: predictor memory grows {growth:.1%} per hour")
+        for name in LATENCY_TRENDS:
+            if self.trends[name].is_growing(MIN_T, LATENCY_GROWTH_PER_HOUR):
+                growth = self.trends[name].relative_growth_per_hour()
+                findings.append(f"Latency creep: {name} grows {growth:.1%} per hour")
+        if self.restarts:
+            findings.append(f"The predictor container restarted {self.restarts} times")
+        return findings
+
+    def report(self) -> dict:
+        """Return the state of the run.
+
+        Returns:
+            dict: Duration, request and error counts, restarts, preemptions, every trend fit and the findings.
+        """
+        preemptions = None
+        if self._last_metrics is not None and self._last_metrics.get(PREEMPTIONS) is not None:
+            preemptions = self._last_metrics.get(PREEMPTIONS) - (self._first_metrics.get(PREEMPTIONS) or 0.0)
+        return {
+            "duration_seconds": time.monotonic() - self.started,
+            "windows": self.windows,
+            "requests": self.requests,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "preemptions": preemptions,
+            "trends": {name: trend.as_dict() for name, trend in self.trends.items()},
+            "findings": self.findings(),
+        }
+
+
+def run_soak(url: str,
+             model_name: str,
+             prompts: list,
+             monitor: SoakMonitor,
+             duration: float,
+             sample_interval: float = 60.0,
+             concurrency: int = 8,
+             max_tokens: int = 128,
+             sink: Optional[Callable[[RequestRecord], None]] = None) -> dict:
+    """Keep a closed-loop load on a predictor for a duration, sampling its state every interval.
+
+    Args:
+        url (str): The base URL of the OpenAI compatible endpoint.
+        model_name (str): The served model name.
+        prompts (list): The prompts, cycled through.
+        monitor (SoakMonitor): Receives every window.
+        duration (float): Seconds to keep the load on.
+        sample_interval (float, optional): Seconds per window. Defaults to 60.0.
+        concurrency (int, optional): How many requests are in flight at once. Defaults to 8.
+        max_tokens (int, optional): Tokens to generate per request. Defaults to 128.
+        sink (Optional[Callable[[RequestRecord], None]], optional): Also receives every record, e.g.
+            JsonlSink.write to keep them on disk. Defaults to None.
+
+    Returns:
+        dict: The final SoakMonitor report.
+    """
+    deadline = time.monotonic() + duration
+    window_started = time.monotonic()
+    window = StreamingSummary()
+
+    def _sink(record: RequestRecord) -> None:
+        window.write(record)
+        if sink is not None:
+            sink(record)
+
+    while time.monotonic() < deadline:
+        run_load(url, model_name, prompts, num_requests=REQUESTS_PER_SLOT * concurrency, concurrency=concurrency,
+                 max_tokens=max_tokens, sink=_sink)
+        if time.monotonic() - window_started >= sample_interval or time.monotonic() >= deadline:
+            stats = monitor.observe_window(window.result())
+            LOGGER.info(f"SOAK WINDOW {monitor.windows}: {stats}")
+            for finding in monitor.findings():
+                LOGGER.warning(finding)
+            window = StreamingSummary()
+            window_started = time.monotonic()
+    return monitor.report()
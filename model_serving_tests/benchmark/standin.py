@@ -0,0 +1,110 @@
+import json
+import logging
+import multiprocessing
+import socket
+from typing import Any, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+START_TIMEOUT = 30
+PROTOCOLS = ("http", "grpc")
+
+
+def _serve_http(ports: Any) -> None:
+    import asyncio
+
+    from aiohttp import web
+
+    done = b"data: [DONE]\n\n"
+
+    async def _completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        max_tokens = int(body.get("max_tokens", 16))
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        token = b"data: " + json.dumps({"choices": [{"index": 0, "text": " x"}]}).encode() + b"\n\n"
+        for _ in range(max_tokens):
+            await response.write(token)
+        usage = {"choices": [], "usage": {"prompt_tokens": 1, "completion_tokens": max_tokens}}
+        await response.write(b"data: " + json.dumps(usage).encode() + b"\n\n" + done)
+        return response
+
+    async def _health(request: web.Request) -> web.Response:
+        return web.Response()
+
+    async def _main() -> None:
+        app = web.Application()
+        app.router.add_post("/v1/completions", _completions)
+        app.router.add_get("/health", _health)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        await web.SockSite(runner, listener).start()
+        ports.put(listener.getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(_main())
+
+
+def _serve_grpc(ports: Any) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    import grpc
+
+    from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+
+    pb2 = generation_pb2_grpc.generation__pb2
+
+    class _Generation(generation_pb2_grpc.GenerationServiceServicer):
+        def GenerateStream(self, request: Any, context: Any) -> Any:
+            max_tokens = request.params.stopping.max_new_tokens or 16
+            for count in range(1, max_tokens + 1):
+                yield pb2.GenerationResponse(text=" x", generated_token_count=count)
+
+    server = grpc.server(ThreadPoolExecutor(max_workers=64))
+    generation_pb2_grpc.add_GenerationServiceServicer_to_server(_Generation(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    ports.put(port)
+    server.wait_for_termination()
+
+
+class StandInServer:
+    """A zero-latency local stand-in for a predictor, to measure the load generator alone.
+
+    The HTTP stand-in streams an OpenAI completion of max_tokens chunks and the gRPC one a TGIS GenerateStream of
+    max_new_tokens responses, both without any delay. The server runs in a separate process so it does not compete
+    with the client for the interpreter lock, and the client's CPU time is its own.
+    """
+
+    def __init__(self, protocol: str) -> None:
+        """
+        Initialize the StandInServer.
+
+        Args:
+            protocol (str): http or grpc.
+
+        Raises:
+            ValueError: If the protocol is not one of PROTOCOLS.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown stand-in protocol {protocol}, use one of {PROTOCOLS}")
+        self.protocol = protocol
+        self.address: Optional[str] = None
+        self._process = None
+
+    def __enter__(self) -> str:
+        context = multiprocessing.get_context("spawn")
+        ports = context.Queue()
+        self._process = context.Process(target=_serve_http if self.protocol == "http" else _serve_grpc,
+                                        args=(ports,), daemon=True)
+        self._process.start()
+        port = ports.get(timeout=START_TIMEOUT)
+        self.address = f"http://127.0.0.1:{port}" if self.protocol == "http" else f"127.0.0.1:{port}"
+        LOGGER.info(f"{self.protocol.upper()} STAND-IN SERVING ON {self.address}")
+        return self.address
+
+    def __exit__(self, *exc_info) -> None:
+        self._process.terminate()
+        self._process.join()
@@ -0,0 +1,231 @@
+import logging
+import math
+import random
+import statistics
+from collections import Counter
+from typing import Callable, Optional
+
+from model_serving_tests.benchmark.load import percentile
+
+LOGGER = logging.getLogger(__name__)
+
+SIGNIFICANCE = 0.05
+CONFIDENCE = 0.95
+RESAMPLES = 2000
+# Relative changes of the median smaller than this are not reported as regressions, however significant
+MIN_EFFECT = 0.02
+# Observations per sample below which nothing is concluded, a bootstrap of a single value has no spread
+MIN_SAMPLES = 2
+# Up to this many observations in total the p-value comes from the exact distribution of U, not its normal
+# approximation, which needs about eight observations per sample
+EXACT_MAX_N = 30
+
+
+def _ranks(values: list) -> list:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        # Tied values share the mean of the ranks they span
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        start = end + 1
+    return ranks
+
+
+def _tie_counts(ranks: list) -> list:
+    counts = {}
+    for rank in ranks:
+        counts[rank] = counts.get(rank, 0) + 1
+    return [count for count in counts.values() if count > 1]
+
+
+def _exact_p_value(ranks: list, n1: int) -> float:
+    # Ranks are multiples of 1/2, doubled they are integers and the rank sums can be counted exactly
+    doubled = [int(rank * 2) for rank in ranks]
+    counts = [Counter() for _ in range(n1 + 1)]
+    counts[0][0] = 1
+    for index, rank in enumerate(doubled):
+        for size in range(min(index + 1, n1), 0, -1):
+            for total, count in counts[size - 1].items():
+                counts[size][total + rank] += count
+    # Two-sided: every assignment of n1 ranks whose sum is at least as far from its mean as the observed one
+    mean = n1 * (len(ranks) + 1)
+    distance = abs(sum(doubled[:n1]) - mean)
+    extreme = sum(count for total, count in counts[n1].items() if abs(total - mean) >= distance)
+    return min(1.0, extreme / math.comb(len(ranks), n1))
+
+
+def smallest_p_value(n1: int, n2: int) -> float:
+    """Return the smallest two-sided p-value a Mann-Whitney test can reach with these sample sizes.
+
+    Args:
+        n1 (int): Observations in one sample.
+        n2 (int): Observations in the other.
+
+    Returns:
+        float: The p-value of two fully separated samples, 1.0 if either is empty.
+    """
+    if not n1 or not n2:
+        return 1.0
+    return min(1.0, 2 / math.comb(n1 + n2, n1))
+
+
+def mann_whitney_u(baseline: list, candidate: list) -> dict:
+    """Test whether two samples come from the same distribution, without assuming a shape for it.
+
+    Up to EXACT_MAX_N observations in total the p-value is exact, counting every assignment of the pooled ranks to
+    the two samples, ties included. Larger samples use the normal approximation of the U statistic with tie and
+    continuity corrections.
+
+    Args:
+        baseline (list): The reference observations.
+        candidate (list): The compared observations.
+
+    Returns:
+        dict: The U statistic of the candidate, the two-sided p-value, 1.0 when either sample is empty or every
+            observation is equal, and whether it is exact.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    if not n1 or not n2:
+        return {"u": None, "p_value": 1.0, "exact": False}
+    ranks = _ranks(list(candidate) + list(baseline))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    if n <= EXACT_MAX_N:
+        return {"u": u, "p_value": _exact_p_value(ranks, n1), "exact": True}
+    ties = sum(count ** 3 - count for count in _tie_counts(ranks))
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return {"u": u, "p_value": 1.0, "exact": False}
+    deviation = u - n1 * n2 / 2
+    z = (abs(deviation) - 0.5) / math.sqrt(variance) if abs(deviation) >= 0.5 else 0.0
+    return {"u": u, "p_value": min(1.0, math.erfc(z / math.sqrt(2))), "exact": False}
+
+
+def bootstrap_change(baseline: list,
+                     candidate: list,
+                     statistic: Callable[[list], float] = statistics.median,
+                     resamples: int = RESAMPLES,
+                     confidence: float = CONFIDENCE,
+                     seed: int = 0) -> Optional[tuple]:
+    """Bootstrap a confidence interval of the relative change of a statistic from baseline to candidate.
+
+    Args:
+        baseline (list): The reference observations.
+        candidate (list): The compared observations.
+        statistic (Callable[[list], float], optional): Reduces a sample to one value. Defaults to the median.
+        resamples (int, optional): Bootstrap iterations. Defaults to RESAMPLES.
+        confidence (float, optional): Coverage of the interval. Defaults to CONFIDENCE.
+        seed (int, optional): Seed of the resampling, so a comparison is reproducible. Defaults to 0.
+
+    Returns:
+        Optional[tuple]: The lower and upper bound of candidate / baseline - 1, None if either sample has fewer
+            than MIN_SAMPLES observations or the baseline statistic is zero.
+    """
+    if len(baseline) < MIN_SAMPLES or len(candidate) < MIN_SAMPLES or not statistic(baseline):
+        return None
+    generator = random.Random(seed)
+    changes = []
+    for _ in range(resamples):
+        reference = statistic(generator.choices(baseline, k=len(baseline)))
+        if reference:
+            changes.append(statistic(generator.choices(candidate, k=len(candidate))) / reference - 1)
+    tail = (1 - confidence) / 2 * 100
+    return percentile(changes, tail), percentile(changes, 100 - tail)
+
+
+def block_bootstrap_change(baseline_blocks: list,
+                           candidate_blocks: list,
+                           statistic: Callable[[list], float] = statistics.median,
+                           resamples: int = RESAMPLES,
+                           confidence: float = CONFIDENCE,
+                           seed: int = 0) -> Optional[tuple]:
+    """Bootstrap the relative change of a statistic by resampling whole blocks of observations.
+
+    The requests of one run share its conditions, e.g. a neighbour's load or the cache state, and are not
+    independent. Resampling runs rather than requests keeps that correlation in the interval, which a bootstrap of
+    the pooled requests would understate.
+
+    Args:
+        baseline_blocks (list): The observation lists of the reference runs.
+        candidate_blocks (list): The observation lists of the compared runs.
+        statistic (Callable[[list], float], optional): Reduces the pooled observations to one value. Defaults to
+            the median.
+        resamples (int, optional): Bootstrap iterations. Defaults to RESAMPLES.
+        confidence (float, optional): Coverage of the interval. Defaults to CONFIDENCE.
+        seed (int, optional): Seed of the resampling. Defaults to 0.
+
+    Returns:
+        Optional[tuple]: The lower and upper bound of candidate / baseline - 1, None if either side has fewer than
+            MIN_SAMPLES non-empty blocks or the pooled baseline statistic is zero.
+    """
+    baseline_blocks = [block for block in baseline_blocks if block]
+    candidate_blocks = [block for block in candidate_blocks if block]
+    if len(baseline_blocks) < MIN_SAMPLES or len(candidate_blocks) < MIN_SAMPLES:
+        return None
+    if not statistic([value for block in baseline_blocks for value in block]):
+        return None
+    generator = random.Random(seed)
+    changes = []
+    for _ in range(resamples):
+        reference = statistic([value for block in generator.choices(baseline_blocks, k=len(baseline_blocks))
+                               for value in block])
+        if reference:
+            compared = statistic([value for block in generator.choices(candidate_blocks, k=len(candidate_blocks))
+                                  for value in block])
+            changes.append(compared / reference - 1)
+    tail = (1 - confidence) / 2 * 100
+    return percentile(changes, tail), percentile(changes, 100 - tail)
+
+
+def compare_samples(baseline: list,
+                    candidate: list,
+                    higher_is_better: bool = False,
+                    alpha: float = SIGNIFICANCE,
+                    min_effect: float = MIN_EFFECT,
+                    seed: int = 0) -> dict:
+    """Compare two samples of a metric and decide whether the candidate regressed.
+
+    A change is only called when the Mann-Whitney test is significant, the bootstrap interval of the median
+    change excludes zero and the median moved by at least min_effect, so run-to-run noise does not raise alarms.
+    With fewer than MIN_SAMPLES observations on a side, or so few that even fully separated samples could not be
+    significant at alpha, the verdict is insufficient data rather than unchanged: a regression would go unseen.
+
+    Args:
+        baseline (list): The reference observations.
+        candidate (list): The compared observations.
+        higher_is_better (bool, optional): True for throughput, False for latencies. Defaults to False.
+        alpha (float, optional): Significance level of the test. Defaults to SIGNIFICANCE.
+        min_effect (float, optional): Smallest relative median change that counts. Defaults to MIN_EFFECT.
+        seed (int, optional): Seed of the bootstrap. Defaults to 0.
+
+    Returns:
+        dict: The sample sizes and medians, the relative median change with its confidence interval, the p-value
+            and a verdict: regression, improvement, unchanged or insufficient data.
+    """
+    baseline_median = statistics.median(baseline) if baseline else None
+    candidate_median = statistics.median(candidate) if candidate else None
+    change = candidate_median / baseline_median - 1 if baseline_median and candidate_median is not None else None
+    interval = bootstrap_change(baseline, candidate, seed=seed)
+    p_value = mann_whitney_u(baseline, candidate)["p_value"]
+
+    if change is None or interval is None or smallest_p_value(len(baseline), len(candidate)) >= alpha:
+        verdict = "insufficient data"
+    elif p_value < alpha and (interval[0] > 0 or interval[1] < 0) and abs(change) >= min_effect:
+        verdict = "improvement" if (change > 0) == higher_is_better else "regression"
+    else:
+        verdict = "unchanged"
+    return {
+        "baseline_n": len(baseline),
+        "candidate_n": len(candidate),
+        "baseline_median": baseline_median,
+        "candidate_median": candidate_median,
+        "change": change,
+        "ci": list(interval) if interval else None,
+        "p_value": p_value,
+        "verdict": verdict,
+    }
@@ -0,0 +1,199 @@
+import json
+import logging
+import math
+import sqlite3
+import time
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+# Readers map this much of the database file instead of copying pages through read() calls
+MMAP_SIZE = 1 << 30
+BUSY_TIMEOUT = 60.0
+RUN_COLUMNS = ("kind", "model", "deployment_type", "gpu_count", "accelerator", "config_hash", "image")
+REQUEST_COLUMNS = ("started", "ttft", "e2e", "output_tokens", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    deployment_type TEXT NOT NULL,
+    gpu_count INTEGER NOT NULL,
+    accelerator TEXT,
+    config_hash TEXT,
+    image TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS requests (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    started REAL NOT NULL,
+    ttft REAL,
+    e2e REAL NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS requests_run ON requests (run_id);
+CREATE INDEX IF NOT EXISTS runs_model ON runs (model, kind);
+"""
+
+
+class ResultStore:
+    """An append-only SQLite store of benchmark runs and the timings of each of their requests.
+
+    Requests are inserted in batches inside one transaction per run, and aggregates and quantiles are computed by
+    SQLite over memory-mapped pages, so runs of millions of requests are queried without building a Python object
+    per request. The database is in WAL mode: pytest-xdist workers append while reports are read.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE) -> None:
+        """
+        Initialize the ResultStore, creating the database if needed.
+
+        Args:
+            path (str): The database file.
+            batch_size (int, optional): Requests inserted per statement. Defaults to BATCH_SIZE.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def add_run(self, run: dict, records: Iterable) -> int:
+        """Append a run and its requests.
+
+        Args:
+            run (dict): The run metadata: kind, model, deployment_type and gpu_count, optionally accelerator,
+                config_hash, image and created. Any other key is kept in the JSON summary column.
+            records (Iterable): The RequestRecord objects of the run, consumed once in batches.
+
+        Returns:
+            int: The run id.
+        """
+        # RequestRecord.started is monotonic, stored as wall-clock time so runs of different sessions line up
+        wall_offset = time.time() - time.monotonic()
+        summary = {key: value for key, value in run.items() if key not in (*RUN_COLUMNS, "created")}
+        rows = ((record.started + wall_offset, record.ttft, record.e2e, record.output_tokens, record.error)
+                for record in records)
+        inserted = 0
+        with self._connection:
+            cursor = self._connection.execute(
+                f"INSERT INTO runs (created, {', '.join(RUN_COLUMNS)}, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run.get("created", time.time()), *(run.get(column) for column in RUN_COLUMNS),
+                 json.dumps(summary, default=str)))
+            run_id = cursor.lastrowid
+            while batch := list(islice(rows, self.batch_size)):
+                self._connection.executemany(
+                    f"INSERT INTO requests (run_id, {', '.join(REQUEST_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, *row) for row in batch])
+                inserted += len(batch)
+        LOGGER.info(f"STORED RUN {run_id} WITH {inserted} REQUESTS IN {self.path}")
+        return run_id
+
+    @staticmethod
+    def _where(filters: dict) -> tuple:
+        unknown = set(filters) - set(RUN_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot filter runs on {', '.join(sorted(unknown))}, use one of {RUN_COLUMNS}")
+        if not filters:
+            return "", ()
+        return " WHERE " + " AND ".join(f"runs.{column} = ?" for column in filters), tuple(filters.values())
+
+    def runs(self, **filters: object) -> list:
+        """List the stored runs.
+
+        Args:
+            **filters (object): Values the run columns must equal, e.g. model="granite-2b" or image=digest.
+
+        Returns:
+            list: The run dicts, oldest first, with their summary decoded.
+        """
+        where, parameters = self._where(filters)
+        cursor = self._connection.execute(
+            f"SELECT id, created, {', '.join(RUN_COLUMNS)}, summary FROM runs{where} ORDER BY created", parameters)
+        columns = [description[0] for description in cursor.description]
+        runs = []
+        for row in cursor:
+            run = dict(zip(columns, row))
+            run["summary"] = json.loads(run["summary"]) if run["summary"] else {}
+            runs.append(run)
+        return runs
+
+    def requests(self, run_id: int) -> Iterator[tuple]:
+        """Stream the requests of a run, in the order they were sent.
+
+        Args:
+            run_id (int): The run id.
+
+        Returns:
+            Iterator[tuple]: (started, ttft, e2e, output_tokens, error) rows, fetched lazily.
+        """
+        return self._connection.execute(
+            f"SELECT {', '.join(REQUEST_COLUMNS)} FROM requests WHERE run_id = ? ORDER BY started", (run_id,))
+
+    def aggregate(self, **filters: object) -> list:
+        """Summarize each run inside SQLite.
+
+        Args:
+            **filters (object): Values the run columns must equal.
+
+        Returns:
+            list: Per run, its id, model and config_hash, the request, error and output token counts, the mean
+                TTFT and end-to-end latency of successful requests, the duration and output tokens per second.
+        """
+        where, parameters = self._where(filters)
+        cursor = self._connection.execute(
+            "SELECT runs.id, runs.model, runs.config_hash, COUNT(*), "
+            "SUM(requests.error IS NOT NULL), "
+            "SUM(CASE WHEN requests.error IS NULL THEN requests.output_tokens ELSE 0 END), "
+            "AVG(CASE WHEN requests.error IS NULL THEN requests.ttft END), "
+            "AVG(CASE WHEN requests.error IS NULL THEN requests.e2e END), "
+            "MAX(requests.started + requests.e2e) - MIN(requests.started) "
+            f"FROM runs JOIN requests ON requests.run_id = runs.id{where} GROUP BY runs.id ORDER BY runs.created",
+            parameters)
+        return [{"run_id": run_id, "model": model, "config_hash": config_hash, "requests": count, "errors": errors,
+                 "output_tokens": tokens, "mean_ttft": mean_ttft, "mean_e2e": mean_e2e, "duration_seconds": duration,
+                 "output_tokens_per_second": tokens / duration if duration else 0.0}
+                for run_id, model, config_hash, count, errors, tokens, mean_ttft, mean_e2e, duration in cursor]
+
+    def quantile(self, column: str, q: float, **filters: object) -> Optional[float]:
+        """Compute a nearest-rank percentile of a latency over the successful requests of the matching runs.
+
+        Args:
+            column (str): ttft or e2e.
+            q (float): The percentile, between 0 and 100.
+            **filters (object): Values the run columns must equal.
+
+        Returns:
+            Optional[float]: The percentile, None if no request matches.
+
+        Raises:
+            ValueError: If the column is not a latency.
+        """
+        if column not in ("ttft", "e2e"):
+            raise ValueError(f"Cannot compute quantiles of {column}, use ttft or e2e")
+        where, parameters = self._where(filters)
+        selection = (f"FROM runs JOIN requests ON requests.run_id = runs.id{where}"
+                     f"{' AND' if where else ' WHERE'} requests.error IS NULL AND requests.{column} IS NOT NULL")
+        (count,) = self._connection.execute(f"SELECT COUNT(*) {selection}", parameters).fetchone()
+        if not count:
+            return None
+        row = self._connection.execute(
+            f"SELECT requests.{column} {selection} ORDER BY requests.{column} LIMIT 1 OFFSET ?",
+            (*parameters, min(count - 1, max(0, math.ceil(q / 100 * count) - 1)))).fetchone()
+        return row[0]
@@ -0,0 +1,93 @@
+import math
+from typing import Optional
+
+
+class OnlineTrend:
+    """Least-squares line through a stream of (time, value) points, updated in constant memory.
+
+    Only the count, the means and the co-moments are kept, updated with Welford's method, so a soak of any
+    length costs the same and the fit stays numerically stable when the values are large, e.g. bytes.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize the OnlineTrend.
+
+        Args:
+            name (str): What is tracked, used in reports.
+        """
+        self.name = name
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self._c_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        """Add a point.
+
+        Args:
+            x (float): The time of the observation, in seconds.
+            y (float): The observed value.
+        """
+        self.count += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.count
+        dy = y - self.mean_y
+        self.mean_y += dy / self.count
+        self._m2_x += dx * (x - self.mean_x)
+        self._m2_y += dy * (y - self.mean_y)
+        self._c_xy += dx * (y - self.mean_y)
+
+    @property
+    def slope(self) -> Optional[float]:
+        """Optional[float]: Change of the value per second, None until two distinct times were seen."""
+        return self._c_xy / self._m2_x if self.count >= 2 and self._m2_x > 0 else None
+
+    @property
+    def t_statistic(self) -> Optional[float]:
+        """Optional[float]: The slope divided by its standard error, None with fewer than three points."""
+        slope = self.slope
+        if slope is None or self.count < 3:
+            return None
+        residual = max(self._m2_y - slope * self._c_xy, 0.0) / (self.count - 2)
+        if residual == 0:
+            return math.copysign(math.inf, slope) if slope else 0.0
+        return slope / math.sqrt(residual / self._m2_x)
+
+    def relative_growth_per_hour(self) -> Optional[float]:
+        """Return the fitted change over one hour relative to the mean value.
+
+        Returns:
+            Optional[float]: E.g. 0.1 for 10% per hour, None without a slope or with a zero mean.
+        """
+        slope = self.slope
+        if slope is None or not self.mean_y:
+            return None
+        return slope * 3600 / abs(self.mean_y)
+
+    def is_growing(self, min_t: float = 3.0, min_growth_per_hour: float = 0.05) -> bool:
+        """Tell whether the value is rising significantly, statistically and in size.
+
+        Args:
+            min_t (float, optional): The t statistic the slope must exceed. Defaults to 3.0.
+            min_growth_per_hour (float, optional): The relative hourly growth it must exceed. Defaults to 0.05.
+
+        Returns:
+            bool: Whether the trend is a significant rise.
+        """
+        t_statistic = self.t_statistic
+        growth = self.relative_growth_per_hour()
+        return t_statistic is not None and growth is not None and t_statistic > min_t and growth > min_growth_per_hour
+
+    def as_dict(self) -> dict:
+        """Return the fit.
+
+        Returns:
+            dict: The point count, mean, slope per hour, t statistic and relative growth per hour.
+        """
+        slope = self.slope
+        return {"points": self.count, "mean": self.mean_y,
+                "slope_per_hour": slope * 3600 if slope is not None else None,
+                "t_statistic": self.t_statistic, "relative_growth_per_hour": self.relative_growth_per_hour()}
@@ -0,0 +1,152 @@
+import argparse
+import json
+import logging
+import sys
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _load_results(path: str) -> list:
+    with open(path) as file:
+        return json.load(file).get("results", [])
+
+
+def _write_json(path: str, content: list) -> None:
+    with open(path, "w") as file:
+        json.dump(content, file, indent=2)
+    LOGGER.info(f"Written to {path}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare two stored result sets, return 1 if the candidate regressed and 2 if some metric had too few runs."""
+    from model_serving_tests.benchmark.regressions import compare_result_sets, format_comparison
+
+    rows = compare_result_sets(_load_results(args.baseline), _load_results(args.candidate), alpha=args.alpha,
+                               min_effect=args.min_effect)
+    print(format_comparison(rows))
+    if args.json:
+        _write_json(args.json, rows)
+    regressions = [row for row in rows if row["verdict"] == "regression"]
+    insufficient = [row for row in rows if row["verdict"] == "insufficient data"]
+    if regressions:
+        print(f"{len(regressions)} significant regressions")
+    if insufficient:
+        print(f"WARNING: {len(insufficient)} metrics have too few runs to detect a change, repeat the benchmarks in "
+              f"both result sets", file=sys.stderr)
+    if regressions:
+        return 1
+    return 2 if insufficient else 0
+
+
+def plan(args: argparse.Namespace) -> int:
+    """Print the capacity plan of a stored result set."""
+    from model_serving_tests.benchmark.planner import format_plan, load_costs, plan_capacity
+
+    plans = plan_capacity(_load_results(args.results), load_costs(args.costs), args.target_rps)
+    print(format_plan(plans, args.target_rps))
+    if args.json:
+        _write_json(args.json, plans)
+    return 0
+
+
+def runs(args: argparse.Namespace) -> int:
+    """Print the per-run aggregates of a results database."""
+    from model_serving_tests.benchmark.store import ResultStore
+
+    filters = {column: value for column, value in (("model", args.model), ("image", args.image),
+                                                   ("config_hash", args.config_hash)) if value}
+    with ResultStore(args.database) as store:
+        aggregates = store.aggregate(**filters)
+        print(f"{'run':>5} {'model':<32} {'config':<12} {'requests':>9} {'errors':>6} {'tokens/s':>10} "
+              f"{'mean ttft':>9} {'mean e2e':>9}")
+        for row in aggregates:
+            print(f"{row['run_id']:>5} {row['model']:<32} {row['config_hash'] or '-':<12} {row['requests']:>9} "
+                  f"{row['errors']:>6} {row['output_tokens_per_second']:>10.1f} {row['mean_ttft'] or 0.0:>9.3f} "
+                  f"{row['mean_e2e'] or 0.0:>9.3f}")
+        if aggregates:
+            print(f"p99 TTFT {store.quantile('ttft', 99, **filters)}s, p99 e2e {store.quantile('e2e', 99, **filters)}s")
+    if args.json:
+        _write_json(args.json, aggregates)
+    return 0
+
+
+def calibrate(args: argparse.Namespace) -> int:
+    """Measure the load generators against local stand-in servers and save their ceilings."""
+    from model_serving_tests.benchmark.calibration import save_calibration
+    from model_serving_tests.benchmark.calibration import calibrate as run_calibration
+
+    calibration = run_calibration(tuple(args.clients), num_requests=args.requests, concurrency=args.concurrency,
+                                  max_tokens=args.max_tokens)
+    print(f"{'client':<14} {'requests/s':>11} {'tokens/s':>11} {'cpu':>5} {'requests/core-s':>16} "
+          f"{'tokens/core-s':>14}")
+    for client, result in calibration["clients"].items():
+        print(f"{client:<14} {result['requests_per_second']:>11.1f} {result['tokens_per_second']:>11.1f} "
+              f"{result['cpu_utilization']:>5.0%} {result['requests_per_core_second'] or 0.0:>16.1f} "
+              f"{result['tokens_per_core_second'] or 0.0:>14.1f}")
+    save_calibration(calibration)
+    return 1 if any(result["errors"] for result in calibration["clients"].values()) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser of the model-serving-tests command and its subcommands."""
+    from model_serving_tests.benchmark.calibration import CALIBRATION_FILE, CLIENTS
+    from model_serving_tests.benchmark.stats import MIN_EFFECT, SIGNIFICANCE
+
+    parser = argparse.ArgumentParser(
+        prog="model-serving-tests",
+        description="Analyse the benchmark results stored with --benchmark-results and --results-db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Test the differences between two result sets and flag regressions",
+        description="Compare each benchmark and metric of two result sets. The repeated runs of a benchmark in a "
+                    "set are its samples: a change is flagged when a Mann-Whitney U test is significant, the "
+                    "bootstrap confidence interval of the median change excludes zero and the change is large enough. "
+                    "Exits with 1 on a regression, and with 2 when a metric has too few runs to detect one.")
+    compare_parser.add_argument("baseline", help="The reference results JSON")
+    compare_parser.add_argument("candidate", help="The compared results JSON")
+    compare_parser.add_argument("--alpha", type=float, default=SIGNIFICANCE, help="Significance level")
+    compare_parser.add_argument("--min-effect", type=float, default=MIN_EFFECT,
+                                help="Smallest relative median change flagged, e.g. 0.02 for 2%%")
+    compare_parser.add_argument("--json", default="", help="Also write the comparison to this JSON file")
+    compare_parser.set_defaults(handler=compare)
+
+    plan_parser = subparsers.add_parser("plan", help="Plan replicas and cost per token for a target request rate")
+    plan_parser.add_argument("results", help="The results JSON")
+    plan_parser.add_argument("--costs", required=True,
+                             help="YAML file mapping each accelerator to its cost per GPU-hour")
+    plan_parser.add_argument("--target-rps", type=float, required=True, help="The request rate to serve")
+    plan_parser.add_argument("--json", default="", help="Also write the plans to this JSON file")
+    plan_parser.set_defaults(handler=plan)
+
+    runs_parser = subparsers.add_parser("runs", help="Aggregate the runs of a --results-db database")
+    runs_parser.add_argument("database", help="The SQLite database")
+    runs_parser.add_argument("--model", default="", help="Only the runs of this model")
+    runs_parser.add_argument("--image", default="", help="Only the runs of this predictor image digest")
+    runs_parser.add_argument("--config-hash", default="", help="Only the runs of this deployment fingerprint")
+    runs_parser.add_argument("--json", default="", help="Also write the aggregates to this JSON file")
+    runs_parser.set_defaults(handler=runs)
+
+    calibrate_parser = subparsers.add_parser(
+        "calibrate", help="Measure the request and token rates the load generators can sustain",
+        description="Run each load generator against a zero-latency local stand-in server and save the rates it "
+                    f"reaches per CPU second to {CALIBRATION_FILE}, moved with MODEL_SERVING_TESTS_CACHE_DIR. "
+                    "Benchmarks then warn when they drive a client near its ceiling.")
+    calibrate_parser.add_argument("--clients", nargs="+", choices=tuple(CLIENTS), default=list(CLIENTS),
+                                  help="The load generators to measure")
+    calibrate_parser.add_argument("--requests", type=int, default=2000, help="Requests sent per load generator")
+    calibrate_parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    calibrate_parser.add_argument("--max-tokens", type=int, default=64, help="Tokens streamed per request")
+    calibrate_parser.set_defaults(handler=calibrate)
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
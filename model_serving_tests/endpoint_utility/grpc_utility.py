@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 import logging
-import grpc
 import socket
 import ssl
 import sys
-from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # grpc and the generated stubs are imported on first request, keeping test collection fast
+    import grpc
 
 logger = logging.getLogger(__name__)
 
@@ -37,16 +42,23 @@ class TGISGRPCPlugin:
         return ssl.DER_cert_to_PEM_cert(cert_der)
 
     def _channel_credentials(self) -> grpc.ChannelCredentials:
+        import grpc
+
         if self.use_tls:
             cert = self._get_server_certificate(self.host, 443).encode()
             return grpc.ssl_channel_credentials(root_certificates=cert)
         return None
 
     def _create_channel(self) -> grpc.Channel:
+        import grpc
+
         credentials = self._channel_credentials()
         return grpc.secure_channel(self.host, credentials) if credentials else grpc.insecure_channel(self.host)
 
     def make_grpc_request(self, query: dict):
+        import grpc
+        from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+
         channel = self._create_channel()
         stub = generation_pb2_grpc.GenerationServiceStub(channel)
 
@@ -75,6 +87,9 @@ class TGISGRPCPlugin:
             return None
 
     def make_grpc_request_stream(self, query: dict):
+        import grpc
+        from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+
         channel = self._create_channel()
         stub = generation_pb2_grpc.GenerationServiceStub(channel)
 
@@ -113,6 +128,9 @@ class TGISGRPCPlugin:
         }
 
     def get_model_info(self):
+        import grpc
+        from model_serving_tests.endpoint_utility.utils import generation_pb2_grpc
+
         channel = self._create_channel()
         stub = generation_pb2_grpc.GenerationServiceStub(channel)
 
@@ -1,16 +1,24 @@
+import functools
 import json
 import logging
 import time
 from typing import Any, Optional
 import pytest
-import requests
-from urllib3.exceptions import InsecureRequestWarning
 
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _requests() -> Any:
+    # requests is imported on first use so that collecting the tests does not pay for it
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+    return requests
+
+
 class OpenAIClient:
     """
     A client for interacting with the OpenAI API.
@@ -54,6 +62,7 @@ class OpenAIClient:
         Raises:
             pytest.Fail: If the request fails due to an exception.
         """
+        requests = _requests()
         headers = {"Content-Type": "application/json"}
         data = self._construct_request_data(endpoint, query, extra_param)
         logger.info(data)
@@ -89,6 +98,7 @@ class OpenAIClient:
             requests.exceptions.RequestException: If there is a request error.
             json.JSONDecodeError: If there is a JSON decoding error.
         """
+        requests = _requests()
         headers = {"Content-Type": "application/json"}
         data = self._construct_request_data(endpoint, query, extra_param, streaming=True)
         time.sleep(10)
@@ -126,6 +136,7 @@ class OpenAIClient:
             requests.exceptions.RequestException: If there is a request error.
             json.JSONDecodeError: If there is a JSON decoding error.
         """
+        requests = _requests()
         headers = {"Content-Type": "application/json"}
         url = f"{host}{endpoint}"
         try:
@@ -0,0 +1,88 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import deployment_type_pairs, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import DeploymentPool, ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the comparison with the RawDeployment and Serverless cases of every model that has both."""
+    if "case_pair" in metafunc.fixturenames:
+        params = []
+        for raw_case, serverless_case in deployment_type_pairs(generate_model_cases(load_model_specs())):
+            # Both deployments are up at once, the test is a group of its own
+            schedule = pytest.mark.schedule(gpus=raw_case.gpu_count + serverless_case.gpu_count,
+                                            load_seconds=max(raw_case.expected_load_seconds,
+                                                             serverless_case.expected_load_seconds))
+            params.append(pytest.param((raw_case, serverless_case), id=raw_case.model_name,
+                                       marks=[pytest.mark.benchmark, schedule]))
+        metafunc.parametrize("case_pair", params)
+
+
+def test_deployment_comparison(deploy_model: Callable[..., ModelDeployment],
+                               deployment_pool: DeploymentPool,
+                               benchmark_settings: dict,
+                               record_property: Callable[[str, Any], None],
+                               case_pair: tuple) -> None:
+    """
+    Drive an identical workload at the RawDeployment and Serverless deployments of a model and compare them.
+
+    This function performs the following steps:
+    1. Deploys the model in both modes with the same runtime image, GPU count and engine arguments.
+    2. Measures the connection setup cost of each endpoint.
+    3. Sends the same requests to both, alternating which goes first each round, and compares the TTFT and
+       end-to-end percentiles of Serverless against RawDeployment.
+    4. Doubles the concurrency on each endpoint until throughput stops growing to find its sustainable maximum.
+    5. Releases both deployments, which no other test shares.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        deployment_pool (DeploymentPool): The pool holding the deployments.
+        benchmark_settings (dict): The load options.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        case_pair (tuple): The RawDeployment and Serverless ModelCase of the model.
+    """
+    from model_serving_tests.benchmark.comparison import (compare_latencies, connection_setup_cost,
+                                                          interleaved_runs, saturation_sweep)
+
+    raw_case, serverless_case = case_pair
+    deployments = {}
+    try:
+        for case in case_pair:
+            deployments[case.deployment_type] = deploy_model(
+                case.model_name, case.deployment_type, gpu_count=case.gpu_count, new_args=case.new_args,
+                env_vars=case.env_vars, namespace_name=case.namespace_name, ready_timeout=case.ready_timeout)
+        targets = {deployment_type: deployment.http_url for deployment_type, deployment in deployments.items()}
+        prompts = [query["text"] for query in raw_case.completion_queries]
+
+        with timed_phase("requests:benchmark"):
+            setup = {deployment_type: connection_setup_cost(url) for deployment_type, url in targets.items()}
+            summaries = interleaved_runs(targets, raw_case.model_name, prompts,
+                                         num_requests=benchmark_settings["num_requests"],
+                                         concurrency=benchmark_settings["concurrency"],
+                                         max_tokens=benchmark_settings["max_tokens"])
+            throughput = {deployment_type: saturation_sweep(url, raw_case.model_name, prompts,
+                                                            max_concurrency=4 * benchmark_settings["concurrency"],
+                                                            max_tokens=benchmark_settings["max_tokens"])
+                          for deployment_type, url in targets.items()}
+    finally:
+        for case in case_pair:
+            deployment_pool.release(case.fingerprint)
+
+    latency = compare_latencies(summaries[raw_case.deployment_type], summaries[serverless_case.deployment_type])
+    max_sustainable = {deployment_type: sweep["max_sustainable"] for deployment_type, sweep in throughput.items()}
+    LOGGER.info(f"SERVERLESS VS RAWDEPLOYMENT LATENCY: {latency}")
+    LOGGER.info(f"CONNECTION SETUP: {setup}")
+    LOGGER.info(f"MAX SUSTAINABLE THROUGHPUT: {max_sustainable}")
+    record_property("summaries", summaries)
+    record_property("latency_comparison", latency)
+    record_property("connection_setup", setup)
+    record_property("throughput_sweep", throughput)
+
+    for deployment_type, summary in summaries.items():
+        assert summary["errors"] == 0, f"{summary['errors']} {deployment_type} benchmark requests failed"
@@ -0,0 +1,63 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, load_model_specs, sweep_cases
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.sweep_report import SWEEP_PROPERTY, load_sweep_grid
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the sweep with every engine-argument combination of the --sweep-grid or the model specs."""
+    if "model_case" in metafunc.fixturenames:
+        grid = load_sweep_grid(metafunc.config.getoption("--sweep-grid"))
+        cases = sweep_cases(load_model_specs(), grid)
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.benchmark) for case in cases])
+
+
+def test_engine_sweep(deploy_model: Callable[..., ModelDeployment],
+                      benchmark_settings: dict,
+                      slo: Any,
+                      record_property: Callable[[str, Any], None],
+                      model_case: ModelCase) -> None:
+    """
+    Deploy one engine-argument combination of the sweep and measure it under the benchmark workload.
+
+    The results of all combinations are ranked per model at the end of the session, see sweep_report.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        benchmark_settings (dict): The load options.
+        slo (Any): The latency objectives of goodput.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The model and engine arguments to measure.
+    """
+    from model_serving_tests.benchmark.load import run_load, summarize
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    prompts = [query["text"] for query in model_case.completion_queries]
+    with timed_phase("requests:benchmark"):
+        summary = summarize(run_load(deployment.http_url, model_case.model_name, prompts,
+                                     num_requests=benchmark_settings["num_requests"],
+                                     concurrency=benchmark_settings["concurrency"],
+                                     max_tokens=benchmark_settings["max_tokens"]), slo=slo)
+    result = {
+        "model": model_case.model_name,
+        "args": model_case.new_args,
+        "output_tokens_per_second": summary["output_tokens_per_second"],
+        "p99_e2e": summary["e2e"]["p99"],
+        "p99_ttft": summary["ttft"]["p99"],
+        "errors": summary["errors"],
+        "goodput_tokens_per_second": summary["goodput"]["output_tokens_per_second"],
+        "load_seconds": deployment.load_seconds,
+    }
+    LOGGER.info(f"SWEEP {model_case.model_name} {' '.join(model_case.new_args)}: {summary}")
+    record_property(SWEEP_PROPERTY, result)
+
+    assert summary["errors"] == 0, f"{summary['errors']} benchmark requests failed with {model_case.new_args}"
@@ -0,0 +1,62 @@
+from typing import Any, Callable
+import functools
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, benchmark_cases, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the capacity search with one case per model and deployment type of the matrix."""
+    if "model_case" in metafunc.fixturenames:
+        cases = benchmark_cases(generate_model_cases(load_model_specs()))
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.benchmark) for case in cases])
+
+
+def test_goodput_capacity(deploy_model: Callable[..., ModelDeployment],
+                          benchmark_settings: dict,
+                          slo: Any,
+                          record_property: Callable[[str, Any], None],
+                          benchmark_result: Callable[..., dict],
+                          model_case: ModelCase) -> None:
+    """
+    Find the highest Poisson arrival rate at which a model still serves the target share of requests within the SLO.
+
+    Each probe sends the benchmark number of requests open-loop at one rate, with the same arrival pattern, and
+    the rate is searched by doubling then bisection. The rate found is the capacity to provision against.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        benchmark_settings (dict): The load options and goodput target.
+        slo (Any): The latency objectives of goodput.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        benchmark_result (Callable[..., dict]): Publishes the capacity for the capacity planner.
+        model_case (ModelCase): The model and deployment to measure.
+    """
+    from model_serving_tests.benchmark.goodput import max_rate_for_goodput
+    from model_serving_tests.benchmark.load import run_open_loop
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    prompts = [query["text"] for query in model_case.completion_queries]
+    probe = functools.partial(run_open_loop, deployment.http_url, model_case.model_name, prompts,
+                              num_requests=benchmark_settings["num_requests"],
+                              max_tokens=benchmark_settings["max_tokens"])
+    with timed_phase("requests:benchmark"):
+        capacity = max_rate_for_goodput(lambda rate: probe(rate=rate), slo,
+                                        target=benchmark_settings["goodput_target"])
+    LOGGER.info(f"CAPACITY OF {model_case.id}: {capacity['max_rate']} REQUESTS PER SECOND AT "
+                f"{capacity['target']:.0%} GOODPUT UNDER {slo}")
+    record_property("goodput_capacity", capacity)
+
+    assert capacity["max_rate"] is not None, (
+        f"{model_case.id} missed the SLO for more than {1 - capacity['target']:.0%} of requests at every rate")
+    benchmark_result("goodput_capacity", deployment, slo=capacity["goodput"]["slo"], target=capacity["target"],
+                     max_rate=capacity["max_rate"],
+                     goodput_output_tokens_per_second=capacity["goodput"]["output_tokens_per_second"])
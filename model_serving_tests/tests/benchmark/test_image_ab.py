@@ -0,0 +1,121 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, benchmark_cases, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import DeploymentPool, ModelDeployment
+from model_serving_tests.tests.scheduler import deployment_fingerprint
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+IMAGES = ("baseline", "candidate")
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the A/B comparison with the RawDeployment benchmark case of every model."""
+    if "model_case" in metafunc.fixturenames:
+        config = metafunc.config
+        side_by_side = config.getoption("--ab-mode") == "parallel"
+        marks = [pytest.mark.benchmark]
+        if not config.getoption("--candidate-image"):
+            marks.append(pytest.mark.skip(reason="The image A/B benchmark needs --candidate-image"))
+        params = []
+        for case in benchmark_cases(generate_model_cases(load_model_specs())):
+            # Serverless adds the ingress path to the noise the comparison has to see through
+            if case.deployment_type != "RawDeployment":
+                continue
+            # Both images are private deployments, the test is a group of its own
+            schedule = pytest.mark.schedule(gpus=case.gpu_count * (2 if side_by_side else 1),
+                                            load_seconds=case.expected_load_seconds * (1 if side_by_side else 2))
+            params.append(pytest.param(case, id=case.id, marks=[*marks, schedule]))
+        metafunc.parametrize("model_case", params)
+
+
+def test_image_ab(deploy_model: Callable[..., ModelDeployment],
+                  deployment_pool: DeploymentPool,
+                  runtime_image: str,
+                  benchmark_settings: dict,
+                  record_property: Callable[[str, Any], None],
+                  model_case: ModelCase) -> None:
+    """
+    Compare the performance of a model served by --runtime-image and by --candidate-image.
+
+    This function performs the following steps:
+    1. Deploys the model with each image in its own namespace, one after the other or side by side.
+    2. Sends each deployment the same greedy workload --ab-rounds times, alternating the images between rounds
+       when both are up.
+    3. Tests the differences of the per-round TTFT, TPOT and end-to-end latency medians and throughput with a
+       Mann-Whitney U test and a bootstrap confidence interval of the median change, cross-checks the latencies
+       with a block bootstrap over whole rounds, and fails on a regression both agree on.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        deployment_pool (DeploymentPool): The pool holding the deployments.
+        runtime_image (str): The baseline image.
+        benchmark_settings (dict): The load options, candidate image, A/B mode and rounds.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The model to compare the images on.
+    """
+    from model_serving_tests.benchmark.comparison import compare_runs, interleaved_records
+
+    images = {"baseline": runtime_image, "candidate": benchmark_settings["candidate_image"]}
+    namespace_name = model_case.namespace_name or model_case.model_name.lower()
+    prompts = [query["text"] for query in model_case.completion_queries]
+    load_options = {"num_requests": benchmark_settings["num_requests"],
+                    "concurrency": benchmark_settings["concurrency"],
+                    "max_tokens": benchmark_settings["max_tokens"]}
+
+    def _deploy(label: str) -> ModelDeployment:
+        return deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                            new_args=model_case.new_args, env_vars=model_case.env_vars,
+                            namespace_name=f"{namespace_name}-{label}", ready_timeout=model_case.ready_timeout,
+                            image=images[label])
+
+    def _release(label: str) -> None:
+        deployment_pool.release(deployment_fingerprint(model_case.model_name, model_case.deployment_type,
+                                                       gpu_count=model_case.gpu_count, new_args=model_case.new_args,
+                                                       env_vars=model_case.env_vars, image=images[label]))
+
+    runs = {}
+    load_seconds = {}
+    if benchmark_settings["ab_mode"] == "parallel":
+        try:
+            deployments = {label: _deploy(label) for label in IMAGES}
+            load_seconds = {label: deployment.load_seconds for label, deployment in deployments.items()}
+            with timed_phase("requests:benchmark"):
+                runs = interleaved_records({label: deployment.http_url for label, deployment in deployments.items()},
+                                           model_case.model_name, prompts, rounds=benchmark_settings["ab_rounds"],
+                                           **load_options)
+        finally:
+            for label in IMAGES:
+                _release(label)
+    else:
+        for label in IMAGES:
+            try:
+                deployment = _deploy(label)
+                load_seconds[label] = deployment.load_seconds
+                with timed_phase("requests:benchmark"):
+                    runs.update(interleaved_records({label: deployment.http_url}, model_case.model_name, prompts,
+                                                    rounds=benchmark_settings["ab_rounds"], **load_options))
+            finally:
+                _release(label)
+
+    comparison = compare_runs(runs["baseline"], runs["candidate"])
+    errors = {label: sum(not record.ok for run in label_runs for record in run) for label, label_runs in runs.items()}
+    LOGGER.info(f"IMAGE A/B FOR {model_case.model_name}, {images['candidate']} VS {images['baseline']}: {comparison}")
+    record_property("images", images)
+    record_property("image_comparison", comparison)
+    record_property("load_seconds", load_seconds)
+    record_property("errors", errors)
+    insufficient = [metric for metric, result in comparison.items()
+                    if metric != "regressions" and result["verdict"] == "insufficient data"]
+    if insufficient:
+        LOGGER.warning(f"{benchmark_settings['ab_rounds']} ROUNDS ARE TOO FEW TO DETECT A CHANGE IN "
+                       f"{', '.join(insufficient)}, RAISE --ab-rounds")
+
+    for label, count in errors.items():
+        assert count == 0, f"{count} benchmark requests to the {label} image failed"
+    assert not comparison["regressions"], (
+        f"{images['candidate']} regressed {', '.join(comparison['regressions'])} against {images['baseline']}")
@@ -0,0 +1,79 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, benchmark_cases, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import DeploymentPool, ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+GRPC_PORT = 8033
+HTTP_PORT = 8080
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the comparison with the RawDeployment benchmark case of every model, the only mode with gRPC."""
+    if "model_case" in metafunc.fixturenames:
+        cases = [case for case in benchmark_cases(generate_model_cases(load_model_specs()))
+                 if case.deployment_type.lower() == "rawdeployment"]
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.benchmark) for case in cases])
+
+
+def test_protocol_comparison(deploy_model: Callable[..., ModelDeployment],
+                             deployment_pool: DeploymentPool,
+                             benchmark_settings: dict,
+                             record_property: Callable[[str, Any], None],
+                             model_case: ModelCase) -> None:
+    """
+    Compare the TGIS gRPC and OpenAI HTTP front doors of one predictor under the same workload.
+
+    This function performs the following steps:
+    1. Deploys the model as a RawDeployment, which port-forwards both the gRPC and the HTTP port of the pod.
+    2. Warms up both protocols, then sends the same prompts through each with greedy decoding and exactly
+       max_tokens generated tokens, from the same thread pool.
+    3. Compares TTFT and end-to-end percentiles, output tokens per second, client CPU time per request and the
+       bytes each request moved through the port-forward tunnel.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        deployment_pool (DeploymentPool): The pool holding the deployment and its port-forwards.
+        benchmark_settings (dict): The load options.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The RawDeployment case of the model.
+    """
+    from model_serving_tests.benchmark.comparison import compare_latencies
+    from model_serving_tests.benchmark.protocols import grpc_load, http_load, wire_bytes
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    prompts = [query["text"] for query in model_case.completion_queries]
+    load_options = {"concurrency": benchmark_settings["concurrency"], "max_tokens": benchmark_settings["max_tokens"]}
+    protocols = {
+        "grpc": (GRPC_PORT, lambda num_requests: grpc_load(deployment.grpc_host, model_case.model_name, prompts,
+                                                           num_requests=num_requests, **load_options)),
+        "http": (HTTP_PORT, lambda num_requests: http_load(deployment.http_url, model_case.model_name, prompts,
+                                                           num_requests=num_requests, **load_options)),
+    }
+
+    results = {}
+    with timed_phase("requests:benchmark"):
+        for _, send in protocols.values():
+            send(benchmark_settings["concurrency"])
+        for protocol, (port, send) in protocols.items():
+            before = deployment_pool.forward_stats(model_case.fingerprint)[port]
+            results[protocol] = send(benchmark_settings["num_requests"])
+            after = deployment_pool.forward_stats(model_case.fingerprint)[port]
+            results[protocol]["wire_bytes_per_request"] = wire_bytes(before, after, benchmark_settings["num_requests"])
+
+    latency = compare_latencies(results["http"], results["grpc"])
+    LOGGER.info(f"GRPC: {results['grpc']}")
+    LOGGER.info(f"HTTP: {results['http']}")
+    LOGGER.info(f"GRPC VS HTTP LATENCY: {latency}")
+    record_property("protocols", results)
+    record_property("grpc_vs_http_latency", latency)
+
+    for protocol, summary in results.items():
+        assert summary["errors"] == 0, f"{summary['errors']} {protocol} benchmark requests failed"
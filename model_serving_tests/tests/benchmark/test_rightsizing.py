@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+import logging
+import time
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, generate_model_cases, gpu_count_cases, load_model_specs
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.rightsizing_report import RIGHTSIZING_PROPERTY
+from model_serving_tests.tests.timing import timed_phase
+
+if TYPE_CHECKING:
+    from kubernetes.dynamic.client import DynamicClient
+
+LOGGER = logging.getLogger(__name__)
+
+# Seconds between two resource samples while a load level runs
+SAMPLE_INTERVAL = 5.0
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the profiling with a RawDeployment case per model and GPU count."""
+    if "model_case" in metafunc.fixturenames:
+        cases = gpu_count_cases(generate_model_cases(load_model_specs()))
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.benchmark) for case in cases])
+
+
+def test_rightsizing(deploy_model: Callable[..., ModelDeployment],
+                     client: DynamicClient,
+                     benchmark_settings: dict,
+                     record_property: Callable[[str, Any], None],
+                     model_case: ModelCase) -> None:
+    """
+    Profile the predictor container's CPU, memory and /dev/shm usage across load levels and recommend requests.
+
+    This function performs the following steps:
+    1. Deploys the model as a RawDeployment with the GPU count of the case.
+    2. Runs the benchmark workload idle, at concurrency 1, at the benchmark concurrency and at twice that, while
+       sampling the metrics API and `df /dev/shm` in the kserve-container.
+    3. Recommends cpu, memory and shm sizes from the heaviest level and compares them with the template's.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        client (DynamicClient): The Kubernetes dynamic client.
+        benchmark_settings (dict): The load options.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The model and GPU count to profile.
+    """
+    from model_serving_tests.benchmark.load import run_load
+    from model_serving_tests.benchmark.resources import ResourceSampler, container_usage, shm_usage
+    from model_serving_tests.benchmark.rightsizing import predictor_requests, recommend_requests, usage_statistics
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    pod = deployment.predictor_pod
+
+    def _sample():
+        usage = container_usage(client, pod.namespace, pod.name) or {}
+        shm = shm_usage(pod)
+        if shm is not None:
+            usage["shm_used_bytes"] = shm["used_bytes"]
+        return usage or None
+
+    prompts = [query["text"] for query in model_case.completion_queries]
+    concurrency = benchmark_settings["concurrency"]
+    levels = {}
+    with timed_phase("requests:benchmark"):
+        with ResourceSampler(_sample, interval=SAMPLE_INTERVAL) as sampler:
+            time.sleep(3 * SAMPLE_INTERVAL)
+        levels[0] = usage_statistics(sampler.samples)
+        for level in sorted({1, concurrency, 2 * concurrency}):
+            with ResourceSampler(_sample, interval=SAMPLE_INTERVAL) as sampler:
+                run_load(deployment.http_url, model_case.model_name, prompts,
+                         num_requests=max(benchmark_settings["num_requests"], 4 * level), concurrency=level,
+                         max_tokens=benchmark_settings["max_tokens"])
+            levels[level] = usage_statistics(sampler.samples)
+
+    current, shm_size_limit = predictor_requests(deployment.inference_service.instance.to_dict())
+    recommendation = recommend_requests(levels, current, shm_size_limit)
+    recommendation.update({"model": model_case.model_name, "gpu_count": model_case.gpu_count, "levels": levels})
+    LOGGER.info(f"RESOURCES OF {model_case.model_name} ON {model_case.gpu_count} GPU: "
+                f"{recommendation['current']} -> {recommendation['recommended']}")
+    record_property(RIGHTSIZING_PROPERTY, recommendation)
+
+    assert recommendation["recommended"], f"No resource usage could be sampled from {pod.name}"
@@ -0,0 +1,90 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, benchmark_cases, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the benchmark with one case per model and deployment type of the matrix."""
+    if "model_case" in metafunc.fixturenames:
+        cases = benchmark_cases(generate_model_cases(load_model_specs()))
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.benchmark) for case in cases])
+
+
+def test_serving_benchmark(deploy_model: Callable[..., ModelDeployment],
+                           metrics_scraper: Callable[[str], Any],
+                           benchmark_settings: dict,
+                           slo: Any,
+                           record_property: Callable[[str, Any], None],
+                           benchmark_result: Callable[..., dict],
+                           model_case: ModelCase) -> None:
+    """
+    Benchmark a model under concurrent streamed completions while scraping the vLLM metrics.
+
+    This function performs the following steps:
+    1. Deploys the model, reusing the deployment of its matrix case when they are scheduled together.
+    2. Starts scraping the predictor's /metrics and sends the load at the configured concurrency.
+    3. Records client-side TTFT and end-to-end latencies, goodput under the SLO, the server-side summary and how
+       client latency correlates with the queue depth and KV-cache usage the server reported when each request
+       started.
+    4. Attributes the difference between client and server latencies to the path in between, the port-forward
+       relay for RawDeployment or the mesh and Knative for Serverless, split into connection setup, measured on
+       /health before the load, and in-request overhead.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        metrics_scraper (Callable[[str], Any]): A function to start scraping a metrics endpoint.
+        benchmark_settings (dict): The load and scraping options.
+        slo (Any): The latency objectives of goodput.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        benchmark_result (Callable[..., dict]): Publishes the throughput for the capacity planner.
+        model_case (ModelCase): The model to benchmark.
+    """
+    from model_serving_tests.benchmark.attribution import attribute_latency
+    from model_serving_tests.benchmark.comparison import connection_setup_cost
+    from model_serving_tests.benchmark.load import run_load, summarize
+    from model_serving_tests.benchmark.metrics import KV_CACHE_USAGE, WAITING_REQUESTS, correlate
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    prompts = [query["text"] for query in model_case.completion_queries]
+    connection = connection_setup_cost(deployment.http_url)
+    scraper = metrics_scraper(f"{deployment.http_url}/metrics")
+    with timed_phase("requests:benchmark"):
+        records = run_load(deployment.http_url, model_case.model_name, prompts,
+                           num_requests=benchmark_settings["num_requests"],
+                           concurrency=benchmark_settings["concurrency"],
+                           max_tokens=benchmark_settings["max_tokens"])
+    scraper.stop()
+
+    client_summary = summarize(records, slo=slo)
+    server_summary = scraper.summary()
+    correlations = {name: correlate(scraper, records, name)["pearson"] for name in (WAITING_REQUESTS, KV_CACHE_USAGE)}
+    LOGGER.info(f"CLIENT: {client_summary}")
+    LOGGER.info(f"SERVER: {server_summary}")
+    attribution = attribute_latency(records, scraper, deployment.deployment_type, connection_setup=connection,
+                                    connections=benchmark_settings["concurrency"])
+    LOGGER.info(f"E2E LATENCY CORRELATION WITH SERVER STATE: {correlations}")
+    LOGGER.info(f"{deployment.deployment_type.upper()} OVERHEAD ({attribution['overhead_source']}): "
+                f"TTFT {attribution['ttft']['overhead']}, E2E {attribution['e2e']['overhead']}, "
+                f"MEAN E2E SPLIT {attribution['e2e']['breakdown']}")
+    record_property("client", client_summary)
+    record_property("server", server_summary)
+    record_property("e2e_correlation", correlations)
+    record_property("attribution", attribution)
+
+    assert client_summary["errors"] == 0, f"{client_summary['errors']} benchmark requests failed"
+    assert server_summary, f"No metrics could be scraped from {scraper.url}"
+    benchmark_result("serving", deployment, records=records, concurrency=benchmark_settings["concurrency"],
+                     output_tokens_per_second=client_summary["output_tokens_per_second"],
+                     goodput_output_tokens_per_second=client_summary["goodput"]["output_tokens_per_second"],
+                     slo=client_summary["goodput"]["slo"], ttft_p50=client_summary["ttft"]["p50"],
+                     ttft_p99=client_summary["ttft"]["p99"], e2e_p50=client_summary["e2e"]["p50"],
+                     e2e_p99=client_summary["e2e"]["p99"])
@@ -0,0 +1,94 @@
+from typing import Any, Callable
+import logging
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, generate_model_cases, gpu_count_cases, load_model_specs
+from model_serving_tests.tests.provisioning import DeploymentError, DeploymentPool, ModelDeployment
+from model_serving_tests.tests.scheduler import deployment_fingerprint
+from model_serving_tests.tests.timing import timed_phase
+from model_serving_tests.tests.utils import PodNotFoundError
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the sizing with the tensor-parallel RawDeployment case of every model, one GPU count each."""
+    if "model_case" in metafunc.fixturenames:
+        combinations = (len(metafunc.config.getoption("--shm-sizes").split(","))
+                        * len(metafunc.config.getoption("--executor-backends").split(",")))
+        params = []
+        for case in gpu_count_cases(generate_model_cases(load_model_specs())):
+            if case.gpu_count < 2:
+                continue
+            # Every combination is its own deployment, the test is a group of its own deploying them in turn
+            schedule = pytest.mark.schedule(gpus=case.gpu_count, load_seconds=case.expected_load_seconds * combinations)
+            params.append(pytest.param(case, id=case.id, marks=[pytest.mark.benchmark, pytest.mark.multigpu,
+                                                                schedule]))
+        metafunc.parametrize("model_case", params)
+
+
+def test_shm_sizing(deploy_model: Callable[..., ModelDeployment],
+                    deployment_pool: DeploymentPool,
+                    benchmark_settings: dict,
+                    record_property: Callable[[str, Any], None],
+                    model_case: ModelCase) -> None:
+    """
+    Find the smallest /dev/shm size limit that does not degrade a tensor-parallel predictor, per executor backend.
+
+    This function performs the following steps:
+    1. Deploys the model once per executor backend and shm size, largest size first.
+    2. Records whether it deployed, its startup time, and the throughput, failures and p99 latency of the
+       benchmark workload, then releases the deployment.
+    3. Reports the smallest size per backend whose throughput stays within 5% of the largest clean size's.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        deployment_pool (DeploymentPool): The pool holding the deployments.
+        benchmark_settings (dict): The load options, shm sizes and executor backends.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The tensor-parallel case of the model.
+    """
+    from model_serving_tests.benchmark.load import run_load, summarize
+    from model_serving_tests.benchmark.shm import smallest_adequate_shm
+
+    prompts = [query["text"] for query in model_case.completion_queries]
+    results = []
+    for backend in benchmark_settings["executor_backends"]:
+        for shm_size in benchmark_settings["shm_sizes"]:
+            result = {"backend": backend, "shm_size": shm_size, "deployed": False, "errors": None,
+                      "output_tokens_per_second": 0.0, "p99_e2e": None, "load_seconds": None}
+            try:
+                deployment = deploy_model(model_case.model_name, model_case.deployment_type,
+                                          gpu_count=model_case.gpu_count, new_args=model_case.new_args,
+                                          env_vars=model_case.env_vars, namespace_name=model_case.namespace_name,
+                                          ready_timeout=model_case.ready_timeout, shm_size=shm_size,
+                                          executor_backend=backend)
+            except (DeploymentError, PodNotFoundError) as err:
+                LOGGER.warning(f"{model_case.model_name} DID NOT DEPLOY WITH {backend} AND {shm_size} SHM: {err}")
+                results.append(result)
+                continue
+            try:
+                with timed_phase("requests:benchmark"):
+                    summary = summarize(run_load(deployment.http_url, model_case.model_name, prompts,
+                                                 num_requests=benchmark_settings["num_requests"],
+                                                 concurrency=benchmark_settings["concurrency"],
+                                                 max_tokens=benchmark_settings["max_tokens"]))
+            finally:
+                deployment_pool.release(deployment_fingerprint(
+                    model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                    new_args=model_case.new_args, env_vars=model_case.env_vars, shm_size=shm_size,
+                    executor_backend=backend))
+            result.update({"deployed": True, "errors": summary["errors"], "p99_e2e": summary["e2e"]["p99"],
+                           "output_tokens_per_second": summary["output_tokens_per_second"],
+                           "load_seconds": deployment.load_seconds})
+            LOGGER.info(f"SHM {shm_size} WITH {backend}: {result}")
+            results.append(result)
+
+    recommendations = smallest_adequate_shm(results)
+    LOGGER.info(f"SMALLEST ADEQUATE SHM FOR {model_case.id}: {recommendations}")
+    record_property("shm_results", results)
+    record_property("shm_recommendations", recommendations)
+
+    assert any(recommendation["shm_size"] for recommendation in recommendations.values()), (
+        f"{model_case.model_name} did not run cleanly with any shm size and executor backend")
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+import logging
+import os
+
+import pytest
+
+from model_serving_tests.tests.model_matrix import ModelCase, benchmark_cases, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+if TYPE_CHECKING:
+    from kubernetes.dynamic.client import DynamicClient
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the soak with the RawDeployment benchmark case of every model, select one with -k."""
+    if "model_case" in metafunc.fixturenames:
+        cases = [case for case in benchmark_cases(generate_model_cases(load_model_specs()))
+                 if case.deployment_type.lower() == "rawdeployment"]
+        metafunc.parametrize("model_case", [case.as_param(pytest.mark.soak) for case in cases])
+
+
+def test_soak(deploy_model: Callable[..., ModelDeployment],
+              client: DynamicClient,
+              benchmark_settings: dict,
+              record_property: Callable[[str, Any], None],
+              model_case: ModelCase) -> None:
+    """
+    Keep the benchmark load on a predictor for --soak-duration seconds and look for slow degradations.
+
+    Every --soak-sample-interval seconds the predictor container's CPU and memory are read from the metrics API,
+    the vLLM metrics are scraped and the latencies of the window are reduced to percentiles. Each value feeds an
+    online linear fit, and the test fails if memory keeps growing, latency creeps up or the container restarted.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        client (DynamicClient): The Kubernetes dynamic client.
+        benchmark_settings (dict): The load and soak options and the --requests-log directory.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The model to soak.
+    """
+    from model_serving_tests.benchmark.metrics import MetricsScraper
+    from model_serving_tests.benchmark.resources import container_restarts, container_usage
+    from model_serving_tests.benchmark.sink import JsonlSink, summarize_jsonl
+    from model_serving_tests.benchmark.soak import SoakMonitor, run_soak
+
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    pod = deployment.predictor_pod
+    monitor = SoakMonitor(
+        sample_pod=lambda: container_usage(client, pod.namespace, pod.name),
+        scraper=MetricsScraper(f"{deployment.http_url}/metrics", keep_samples=False),
+        sample_restarts=lambda: container_restarts(client, pod.namespace, pod.name),
+    )
+    prompts = [query["text"] for query in model_case.completion_queries]
+    log = (JsonlSink(os.path.join(benchmark_settings["requests_log"], f"soak-{model_case.id}.jsonl"))
+           if benchmark_settings["requests_log"] else None)
+    try:
+        with timed_phase("requests:soak"):
+            report = run_soak(deployment.http_url, model_case.model_name, prompts, monitor,
+                              duration=benchmark_settings["soak_duration"],
+                              sample_interval=benchmark_settings["soak_sample_interval"],
+                              concurrency=benchmark_settings["concurrency"],
+                              max_tokens=benchmark_settings["max_tokens"], sink=log.write if log else None)
+    finally:
+        if log:
+            log.close()
+    LOGGER.info(f"SOAK REPORT: {report}")
+    record_property("soak", report)
+    if log:
+        # One streaming pass over the whole run, however long it was
+        record_property("requests_summary", summarize_jsonl(log.path))
+
+    assert not report["findings"], f"Degradation during the soak of {model_case.model_name}: {report['findings']}"
+    assert report["errors"] == 0, f"{report['errors']} of {report['requests']} soak requests failed"
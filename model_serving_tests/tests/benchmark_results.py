@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# user_properties entry carrying one benchmark result from the (possibly remote) worker to the controller
+BENCHMARK_RESULT_PROPERTY = "benchmark_result"
+
+
+def load_results(path: str) -> list:
+    """Read the benchmark results stored with --benchmark-results.
+
+    Args:
+        path (str): The JSON file.
+
+    Returns:
+        list: The result dicts, empty if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file).get("results", [])
+
+
+class BenchmarkResults:
+    """Collect the results benchmarks publish and append them to a JSON file, for offline planning."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the BenchmarkResults.
+
+        Args:
+            path (str): The JSON file results are appended to, empty to keep nothing.
+        """
+        self.path = path
+        self.results = []
+
+    def pytest_runtest_logreport(self, report):
+        properties = dict(report.user_properties)
+        if report.when == "call" and BENCHMARK_RESULT_PROPERTY in properties:
+            self.results.append(properties[BENCHMARK_RESULT_PROPERTY])
+
+    def pytest_sessionfinish(self, session):
+        if not self.path or not self.results:
+            return
+        results = load_results(self.path) + self.results
+        with open(self.path, "w") as file:
+            json.dump({"updated": time.time(), "results": results}, file, indent=2, sort_keys=True)
+        LOGGER.info(f"{len(self.results)} benchmark results appended to {self.path}")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-results",
+        action="store",
+        default="",
+        help="Append the benchmark results to this JSON file, the input of the capacity planner"
+    )
+    parser.addoption(
+        "--results-db",
+        action="store",
+        default="",
+        help="Also append every benchmark run and the timings of each of its requests to this SQLite database"
+    )
+    parser.addoption(
+        "--accelerator-name",
+        action="store",
+        default="",
+        help="Accelerator model the results are recorded under, e.g. A100-80GB. "
+             "Defaults to the node's GPU product label, else --accelerator_type"
+    )
+
+
+def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        return
+    config.pluginmanager.register(BenchmarkResults(config.getoption("--benchmark-results")), "benchmark_results")
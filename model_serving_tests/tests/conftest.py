@@ -1,23 +1,27 @@
+from __future__ import annotations
+
 import time
-import subprocess
-import signal
 import os
+from typing import TYPE_CHECKING
 import pytest
 from syrupy.extensions.json import JSONSnapshotExtension
-from ocp_resources.serving_runtime import ServingRuntime
-from ocp_resources.inference_service import InferenceService
-from kubernetes.dynamic import DynamicClient
-from ocp_resources.namespace import Namespace
-from ocp_resources.resource import get_client
-from ocp_resources.secret import Secret
-from ocp_resources.service_account import ServiceAccount
 import logging
-from model_serving_tests.tests.constant import INFERE_DIR, RUNTIME_DIR, STORAGE_DIR
+from model_serving_tests.tests.provisioning import DELETE_TIMEOUT, DeploymentPool, NamespaceReaper
+from model_serving_tests.tests.utils import (
+    create_isvc_manifest_from_template, create_runtime_manifest_from_template, create_s3_secret_manifest)
+
+if TYPE_CHECKING:
+    # The cluster clients are imported by the fixtures that use them, so collection stays fast
+    from kubernetes.dynamic import DynamicClient
+    from model_serving_tests.tests.scheduler import GpuBudget
+
+# Registered as a plugin, so its names are imported where they are used rather than at module level
+pytest_plugins = ["model_serving_tests.tests.scheduler", "model_serving_tests.tests.phase_timing",
+                  "model_serving_tests.tests.sweep_report", "model_serving_tests.tests.rightsizing_report",
+                  "model_serving_tests.tests.benchmark_results"]
 
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
-# Define constants for timeouts
-DELETE_TIMEOUT = 600
 
 
 def pytest_addoption(parser):
@@ -49,6 +53,148 @@ def pytest_addoption(parser):
         help="Specify the runtime file name"
     )
 
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the tests marked as benchmark, skipped by default"
+    )
+
+    parser.addoption(
+        "--benchmark-requests",
+        action="store",
+        type=int,
+        default=64,
+        help="Requests sent by each benchmark"
+    )
+
+    parser.addoption(
+        "--benchmark-concurrency",
+        action="store",
+        type=int,
+        default=8,
+        help="Requests kept in flight by each benchmark"
+    )
+
+    parser.addoption(
+        "--benchmark-max-tokens",
+        action="store",
+        type=int,
+        default=128,
+        help="Tokens generated per benchmark request"
+    )
+
+    parser.addoption(
+        "--metrics-interval",
+        action="store",
+        type=float,
+        default=1.0,
+        help="Seconds between two scrapes of the predictor metrics during a benchmark"
+    )
+
+    parser.addoption(
+        "--slo-ttft",
+        action="store",
+        type=float,
+        default=2.0,
+        help="Seconds to the first token a request must not exceed to count towards goodput, 0 to not check it"
+    )
+
+    parser.addoption(
+        "--slo-tpot",
+        action="store",
+        type=float,
+        default=0.1,
+        help="Seconds per output token a request must not exceed to count towards goodput, 0 to not check it"
+    )
+
+    parser.addoption(
+        "--slo-e2e",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Seconds a request must complete in to count towards goodput, 0 to not check it"
+    )
+
+    parser.addoption(
+        "--goodput-target",
+        action="store",
+        type=float,
+        default=0.9,
+        help="Share of requests that must meet the SLO at the capacity found by the goodput benchmark"
+    )
+
+    parser.addoption(
+        "--shm-sizes",
+        action="store",
+        default="16Gi,8Gi,4Gi,2Gi,1Gi",
+        help="Comma separated /dev/shm size limits tried by the shared-memory sizing benchmark"
+    )
+
+    parser.addoption(
+        "--executor-backends",
+        action="store",
+        default="mp,ray",
+        help="Comma separated vLLM distributed executor backends tried by the shared-memory sizing benchmark"
+    )
+
+    parser.addoption(
+        "--candidate-image",
+        action="store",
+        default="",
+        help="Runtime image compared against --runtime-image by the image A/B benchmark, skipped when empty"
+    )
+
+    parser.addoption(
+        "--ab-mode",
+        action="store",
+        default="sequential",
+        choices=("sequential", "parallel"),
+        help="Deploy the two images of the A/B benchmark one after the other, or side by side in two namespaces"
+    )
+
+    parser.addoption(
+        "--ab-rounds",
+        action="store",
+        type=int,
+        default=4,
+        help="Benchmark runs per image in the A/B benchmark"
+    )
+
+    parser.addoption(
+        "--soak-duration",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Seconds of load each soak test keeps on its predictor, soak tests are skipped when 0"
+    )
+
+    parser.addoption(
+        "--requests-log",
+        action="store",
+        default="",
+        help="Directory the soak tests stream the timings of every request to, one JSON Lines file per test, "
+             "overwritten by the next run"
+    )
+
+    parser.addoption(
+        "--soak-sample-interval",
+        action="store",
+        type=float,
+        default=60.0,
+        help="Seconds between two samples of the predictor resources, metrics and latencies during a soak"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --run-benchmarks")
+    skip_soak = pytest.mark.skip(reason="Soak tests only run with --soak-duration")
+    for item in items:
+        if item.get_closest_marker("benchmark") and not config.getoption("--run-benchmarks"):
+            item.add_marker(skip_benchmark)
+        if item.get_closest_marker("soak") and not config.getoption("--soak-duration"):
+            item.add_marker(skip_soak)
+
 
 @pytest.fixture(scope="session")
 def runtime_image(request):
@@ -75,139 +221,149 @@ def runtime_name(request):
 
 
 @pytest.fixture(scope="session")
-def client() -> DynamicClient:
-    yield get_client()
+def benchmark_settings(request) -> dict:
+    """Fixture to get the benchmark, soak, shared-memory sizing, goodput, image A/B and scraping options."""
+    return {
+        "num_requests": request.config.getoption("--benchmark-requests"),
+        "concurrency": request.config.getoption("--benchmark-concurrency"),
+        "max_tokens": request.config.getoption("--benchmark-max-tokens"),
+        "metrics_interval": request.config.getoption("--metrics-interval"),
+        "soak_duration": request.config.getoption("--soak-duration"),
+        "soak_sample_interval": request.config.getoption("--soak-sample-interval"),
+        "requests_log": request.config.getoption("--requests-log"),
+        "shm_sizes": request.config.getoption("--shm-sizes").split(","),
+        "executor_backends": request.config.getoption("--executor-backends").split(","),
+        "goodput_target": request.config.getoption("--goodput-target"),
+        "candidate_image": request.config.getoption("--candidate-image"),
+        "ab_mode": request.config.getoption("--ab-mode"),
+        "ab_rounds": request.config.getoption("--ab-rounds"),
+    }
 
 
-@pytest.fixture
-def create_namespace(client: DynamicClient):
-    """
-    Factory to create and delete Namespaces needed in a test class
-    """
+@pytest.fixture(scope="session")
+def slo(request):
+    """Fixture to get the latency objectives of goodput from the --slo-* options."""
+    from model_serving_tests.benchmark.goodput import Slo
 
-    created_namespaces = {}
+    return Slo(ttft=request.config.getoption("--slo-ttft") or None,
+               tpot=request.config.getoption("--slo-tpot") or None,
+               e2e=request.config.getoption("--slo-e2e") or None)
 
-    def _create_namespace(name):
-        if name in created_namespaces.keys():
-            return created_namespaces[name]
-        LOGGER.info("CREATING NEW NAMESPACE")
-        ns = Namespace(client=client, name=name, delete_timeout=DELETE_TIMEOUT)
-        ns.create()
-        LOGGER.info("WAITING FOR NS STATUS TO BECOME ACTIVE")
-        ns.wait_for_status(status=Namespace.Status.ACTIVE, timeout=120)
-        created_namespaces[name] = ns
-        LOGGER.info(f"NS {name} IS ACTIVE, RETURNING")
-        return ns
 
-    yield _create_namespace
+@pytest.fixture(scope="session")
+def client() -> DynamicClient:
+    from model_serving_tests.tests.kube_cache import get_cached_client
 
-    for ns in created_namespaces.values():
-        ns.delete(wait=True)
+    yield get_cached_client()
 
 
-@pytest.fixture
-def create_serving_runtime_from_file(client: DynamicClient):
-    _runtimes = []
+@pytest.fixture(scope="session")
+def namespace_reaper(client: DynamicClient):
+    """Deletes namespaces in the background and waits for all of them at the end of the session."""
+    reaper = NamespaceReaper(client=client, timeout=DELETE_TIMEOUT)
+    yield reaper
+    reaper.drain()
 
-    def _create_runtime(namespace, path="vLLM", runtime_name="serving_runtime"):
-        LOGGER.info("CREATING NEW RUNTIME")
-        runtime_yaml = RUNTIME_DIR / path / f'{runtime_name}_updated.yaml'
-        runtime = ServingRuntime(client=client, namespace=namespace, yaml_file=runtime_yaml)
-        runtime.create()
-        _runtimes.append(runtime)
-        return runtime
 
-    yield _create_runtime
-    for runtime in _runtimes:
-        runtime.delete(wait=True)
+@pytest.fixture(scope="session")
+def gpu_budget(request) -> GpuBudget:
+    """The cluster GPU budget declared with --cluster-gpus, shared by all pytest-xdist workers."""
+    from model_serving_tests.tests.scheduler import GPU_BUDGET_DIR_ENV, GpuBudget
 
+    return GpuBudget(os.environ.get(GPU_BUDGET_DIR_ENV), capacity=request.config.getoption("--cluster-gpus"))
 
-@pytest.fixture
-def create_secret_from_file(client: DynamicClient):
-    _secret = []
 
-    def _create_secret(namespace, path="storage_config", file_name="s3_seceret"):
-        LOGGER.info("CREATING secret")
-        s3_path = STORAGE_DIR / f'{file_name}.yaml'
-        s3_secret = Secret(client=client, namespace=namespace, yaml_file=s3_path)
-        s3_secret.create()
-        _secret.append(s3_secret)
-        return s3_secret
+@pytest.fixture(scope="session")
+def deployment_pool(request, client: DynamicClient, namespace_reaper: NamespaceReaper, gpu_budget: GpuBudget):
+    """Deployments kept alive until the last scheduled test of their fingerprint group finished."""
+    from model_serving_tests.tests.scheduler import SCHEDULE_PLAN_KEY
 
-    yield _create_secret
-    for s3 in _secret:
-        s3.delete(wait=True)
+    pool = DeploymentPool(client=client, namespace_reaper=namespace_reaper, gpu_budget=gpu_budget)
+    request.config.stash[SCHEDULE_PLAN_KEY].subscribe(pool.release)
+    yield pool
+    pool.close()
 
 
 @pytest.fixture
-def create_service_account(client: DynamicClient):
-    _service = []
+def response_snapshot(snapshot):
+    return snapshot.use_extension(JSONSnapshotExtension)
 
-    def _sa(namespace):
-        LOGGER.info("CREATING SA")
-        service_account = ServiceAccount(client=client, name="modelmesh-serving-sa", namespace=namespace,
-                                         secrets=[{'name': 'models-bucket-secret'}])
-        service_account.create()
-        _service.append(service_account)
-        return service_account
 
-    yield _sa
-    for sa in _service:
-        sa.delete(wait=True)
+@pytest.fixture
+def deploy_model(deployment_pool: DeploymentPool, runtime: str, runtime_image: str, runtime_name: str,
+                 accelerator_type: str):
+    """
+    Factory to deploy a model from its templates, wait until it is Loaded and return a ModelDeployment.
+    Deployments come from the session pool, so tests scheduled together on the same fingerprint share one.
+    """
+
+    def _deploy_model(model_name, deployment_type, gpu_count=1, new_args=None, env_vars=None, namespace_name=None,
+                      ready_timeout=600, shm_size=None, executor_backend=None, image=None):
+        from model_serving_tests.tests.scheduler import deployment_fingerprint
+
+        runtime_manifest = create_runtime_manifest_from_template(deployment_type, image or runtime_image, runtime_name,
+                                                                 runtime=runtime, executor_backend=executor_backend)
+        isvc_manifest = create_isvc_manifest_from_template(deployment_type, model_name,
+                                                           accelerator_type=accelerator_type, gpu_count=gpu_count,
+                                                           new_args=new_args or None, env_vars=env_vars or None,
+                                                           shm_size=shm_size)
+        return deployment_pool.deploy(deployment_fingerprint(model_name, deployment_type, gpu_count=gpu_count,
+                                                             new_args=new_args, env_vars=env_vars, shm_size=shm_size,
+                                                             executor_backend=executor_backend, image=image),
+                                      model_name=model_name, deployment_type=deployment_type, gpu_count=gpu_count,
+                                      namespace_name=namespace_name or model_name.lower(),
+                                      secret_manifest=create_s3_secret_manifest(),
+                                      runtime_manifest=runtime_manifest, isvc_manifest=isvc_manifest,
+                                      ready_timeout=ready_timeout)
+
+    return _deploy_model
 
 
 @pytest.fixture
-def create_isvc_from_file(client: DynamicClient):
-    _isvc = []
+def benchmark_result(request, record_property, client: DynamicClient, accelerator_type: str):
+    """
+    Factory to publish a benchmark result for the capacity planner, see --benchmark-results.
+    Results are tagged with the accelerator model: --accelerator-name, else the node's GPU product label, else
+    --accelerator_type. Given the request records, the run is also appended to the --results-db store, with the
+    deployment fingerprint and the predictor image digest.
+    """
+    from model_serving_tests.benchmark.resources import container_image, node_accelerator
+    from model_serving_tests.tests.benchmark_results import BENCHMARK_RESULT_PROPERTY
 
-    def _create_isvc(namespace, model_name, path='vLLM'):
-        LOGGER.info("CREATING INFERENCE SERVICE")
-        inference_yaml = INFERE_DIR / model_name / f'{model_name}_updated.yaml'
-        isvc = InferenceService(client=client, namespace=namespace, yaml_file=inference_yaml)
-        isvc.create()
-        _isvc.append(isvc)
-        return isvc
+    def _benchmark_result(kind, deployment, records=None, **values):
+        pod = deployment.predictor_pod
+        accelerator = (request.config.getoption("--accelerator-name")
+                       or node_accelerator(client, pod.namespace, pod.name) or accelerator_type)
+        result = {"kind": kind, "model": deployment.model_name, "deployment_type": deployment.deployment_type,
+                  "gpu_count": deployment.gpu_count, "accelerator": accelerator, "created": time.time(), **values}
+        record_property(BENCHMARK_RESULT_PROPERTY, result)
+        results_db = request.config.getoption("--results-db")
+        if results_db and records is not None:
+            from model_serving_tests.benchmark.store import ResultStore
 
-    yield _create_isvc
-    for runtime in _isvc:
-        runtime.delete(wait=True)
+            with ResultStore(results_db) as store:
+                store.add_run({**result, "config_hash": deployment.fingerprint,
+                               "image": container_image(client, pod.namespace, pod.name)}, records)
+        return result
+
+    return _benchmark_result
 
 
 @pytest.fixture
-def response_snapshot(snapshot):
-    return snapshot.use_extension(JSONSnapshotExtension)
+def metrics_scraper(benchmark_settings: dict):
+    """
+    Factory to scrape a Prometheus metrics endpoint in the background for the duration of a test
+    """
+    scrapers = []
 
+    def _metrics_scraper(url):
+        from model_serving_tests.benchmark.metrics import MetricsScraper
 
-@pytest.fixture
-def run_static_command():
-    processes = []
-
-    def run_cmd(cmd):
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, preexec_fn=os.setpgrp,
-                                   shell=True)
-        LOGGER.info(f"Running command: {cmd}")
-        processes.append(process)
-        time.sleep(10)
-        return process
-
-    yield run_cmd
-
-    for process in processes:
-        try:
-            os.killpg(process.pid, signal.SIGTERM)  # Send SIGTERM to the process group
-        except OSError as e:
-            LOGGER.debug(f"Error terminating process: {e}")
-
-        # Ensure the process is fully terminated
-        process.stdout.close()
-        process.stderr.close()
-        try:
-            process.wait(timeout=5)  # Wait for process to exit
-        except subprocess.TimeoutExpired:
-            LOGGER.debug(f"Process {process.pid} did not exit in time, force killing...")
-            process.kill()  # Force kill if it didn't exit in time
-            process.wait()  # Ensure it has terminated
-        except Exception as e:
-            LOGGER.debug(f"Exception occurred: {e}")
+        scraper = MetricsScraper(url=url, interval=benchmark_settings["metrics_interval"])
+        scrapers.append(scraper)
+        return scraper.start()
 
+    yield _metrics_scraper
 
+    for scraper in scrapers:
+        scraper.stop()
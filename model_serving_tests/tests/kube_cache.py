@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import kubernetes
+from kubernetes.client.exceptions import ApiException
+from kubernetes.config import ConfigException
+from kubernetes.dynamic.client import DynamicClient
+from urllib3.exceptions import MaxRetryError
+
+LOGGER = logging.getLogger(__name__)
+
+# Discovery results survive across sessions here; point it at a CI cache volume to share it between jobs
+DISCOVERY_CACHE_DIR = Path(os.environ.get("MODEL_SERVING_TESTS_CACHE_DIR",
+                                          Path.home() / ".cache" / "model-serving-tests"))
+WATCH_TIMEOUT = 300
+# Seconds to wait for the initial list of an informer before lookups give up
+SYNC_TIMEOUT = 120
+# A failed list or watch is retried after this many seconds, doubling up to MAX_RELIST_BACKOFF
+RELIST_BACKOFF = 1.0
+MAX_RELIST_BACKOFF = 30.0
+
+_informers = {}
+_informers_lock = threading.Lock()
+
+
+def get_cached_client(config_file: str = "") -> DynamicClient:
+    """Create a dynamic client whose API discovery is persisted to disk.
+
+    The kubernetes client only re-runs full discovery when the cache file is missing or a lookup misses, so a
+    warm cache turns session startup into a handful of requests.
+
+    Args:
+        config_file (str, optional): Path to a kubeconfig. Defaults to $KUBECONFIG or ~/.kube/config.
+
+    Returns:
+        DynamicClient: The Kubernetes dynamic client.
+    """
+    config_file = config_file or os.environ.get("KUBECONFIG", "~/.kube/config")
+    try:
+        api_client = kubernetes.config.new_client_from_config(config_file=config_file)
+    except (ConfigException, MaxRetryError):
+        LOGGER.info("Trying to get client via incluster_config")
+        kubernetes.config.load_incluster_config()
+        api_client = kubernetes.client.ApiClient()
+
+    DISCOVERY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    host_id = hashlib.sha256(api_client.configuration.host.encode()).hexdigest()[:16]
+    cache_file = DISCOVERY_CACHE_DIR / f"discovery-{host_id}.json"
+    LOGGER.info(f"Using API discovery cache {cache_file}")
+    return DynamicClient(client=api_client, cache_file=str(cache_file))
+
+
+class PodInformer:
+    """Informer-style cache of the pods matching a label selector in one namespace.
+
+    A single list call seeds the cache, then a watch resumed from the last seen resource version keeps it
+    current, so lookups and readiness waits are served locally instead of listing pods over and over.
+    """
+
+    def __init__(self, client: DynamicClient, namespace: str, label_selector: str) -> None:
+        """
+        Initialize the PodInformer and start its watch thread.
+
+        Args:
+            client (DynamicClient): The Kubernetes dynamic client.
+            namespace (str): The namespace to watch.
+            label_selector (str): The label selector of the pods to cache.
+        """
+        self.client = client
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.api = client.resources.get(api_version="v1", kind="Pod")
+        self._pods = {}
+        self._synced = False
+        self._last_error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        self._watcher = kubernetes.watch.Watch()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"pod-informer-{namespace}", daemon=True)
+        self._thread.start()
+
+    def pods(self, timeout: float = SYNC_TIMEOUT) -> list:
+        """Return the cached pods, waiting for the initial list if it has not completed yet.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the initial list. Defaults to SYNC_TIMEOUT.
+
+        Returns:
+            list: The cached pod instances.
+
+        Raises:
+            TimeoutError: If the pods could not be listed in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._synced, timeout=timeout):
+                raise TimeoutError(f"Pods in {self.namespace} matching {self.label_selector} could not be listed "
+                                   f"within {timeout}s, last error: {self._last_error!r}")
+            return list(self._pods.values())
+
+    def wait_for(self, predicate: Callable[[Any], bool], timeout: float) -> Optional[Any]:
+        """Wait until a cached pod satisfies the predicate.
+
+        Args:
+            predicate (Callable[[Any], bool]): Called with each pod instance.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            Optional[Any]: The first matching pod instance, or None on timeout.
+        """
+        def _match():
+            return next((pod for pod in self._pods.values() if predicate(pod)), None)
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._synced and _match() is not None, timeout=timeout)
+            return _match()
+
+    def stop(self) -> None:
+        """Stop watching. The thread exits on the next event or watch timeout."""
+        self._stopped.set()
+        self._watcher.stop()
+
+    def _run(self) -> None:
+        resource_version = None
+        backoff = RELIST_BACKOFF
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list()
+                for event in self.client.watch(self.api, namespace=self.namespace, label_selector=self.label_selector,
+                                               resource_version=resource_version, timeout=WATCH_TIMEOUT,
+                                               watcher=self._watcher):
+                    if event["type"] == "ERROR":
+                        # Typically 410 Gone: our resource version is too old, start over from a fresh list
+                        resource_version = None
+                        break
+                    pod = event["object"]
+                    resource_version = pod.metadata.resourceVersion
+                    backoff = RELIST_BACKOFF
+                    with self._condition:
+                        if event["type"] == "DELETED":
+                            self._pods.pop(pod.metadata.name, None)
+                        else:
+                            self._pods[pod.metadata.name] = pod
+                        self._condition.notify_all()
+            except Exception as err:
+                # Connection resets and undecodable events end the watch like API errors, the thread must survive them
+                reason = err.reason if isinstance(err, ApiException) else repr(err)
+                LOGGER.warning(f"Pod watch in {self.namespace} failed, relisting in {backoff:.0f}s: {reason}")
+                self._last_error = err
+                resource_version = None
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, MAX_RELIST_BACKOFF)
+
+    def _list(self) -> str:
+        pods = self.api.get(namespace=self.namespace, label_selector=self.label_selector)
+        with self._condition:
+            self._pods = {pod.metadata.name: pod for pod in pods.items}
+            self._synced = True
+            self._condition.notify_all()
+        return pods.metadata.resourceVersion
+
+
+def get_pod_informer(client: DynamicClient, namespace: str, label_selector: str) -> PodInformer:
+    """Return the shared informer for a namespace and label selector, starting it on first use.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace to watch.
+        label_selector (str): The label selector of the pods to cache.
+
+    Returns:
+        PodInformer: The informer.
+    """
+    with _informers_lock:
+        key = (namespace, label_selector)
+        if key not in _informers:
+            _informers[key] = PodInformer(client=client, namespace=namespace, label_selector=label_selector)
+        return _informers[key]
+
+
+def stop_pod_informers(namespace: str) -> None:
+    """Stop and forget the informers of a namespace, e.g. when it is deleted.
+
+    Args:
+        namespace (str): The namespace.
+    """
+    with _informers_lock:
+        for key in [key for key in _informers if key[0] == namespace]:
+            _informers.pop(key).stop()
@@ -0,0 +1,72 @@
+from typing import Any, Callable
+import logging
+import time
+
+from model_serving_tests.endpoint_utility.openai_utility import OpenAIClient
+from model_serving_tests.endpoint_utility.grpc_utility import TGISGRPCPlugin
+from model_serving_tests.tests.model_matrix import ModelCase, generate_model_cases, load_model_specs
+from model_serving_tests.tests.provisioning import ModelDeployment
+from model_serving_tests.tests.timing import timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the generic flow with every model that has a sidecar spec in model_config."""
+    if "model_case" in metafunc.fixturenames:
+        metafunc.parametrize("model_case", [case.as_param(*case.validation_marks)
+                                            for case in generate_model_cases(load_model_specs())])
+
+
+def test_model_matrix(deploy_model: Callable[..., ModelDeployment],
+                      response_snapshot: Any,
+                      record_property: Callable[[str, Any], None],
+                      model_case: ModelCase) -> None:
+    """
+    Generic deploy, validate and benchmark flow run for every case of the model matrix.
+
+    This function performs the following steps:
+    1. Deploys the model with the GPU count and engine arguments of the case and waits for it to be Loaded.
+    2. Sends the spec queries over gRPC (RawDeployment only) and HTTP and compares the responses with snapshots.
+       Serverless cases send the first completion query only.
+    3. Records the load time and the gRPC request latencies as test properties, next to the spec's expected load time.
+
+    Args:
+        deploy_model (Callable[..., ModelDeployment]): A function to deploy a model and return its endpoints.
+        response_snapshot (Any): A snapshot object for response comparison.
+        record_property (Callable[[str, Any], None]): Records a property in the test report.
+        model_case (ModelCase): The model, deployment type, variant and GPU count to test.
+    """
+    deployment = deploy_model(model_case.model_name, model_case.deployment_type, gpu_count=model_case.gpu_count,
+                              new_args=model_case.new_args, env_vars=model_case.env_vars,
+                              namespace_name=model_case.namespace_name, ready_timeout=model_case.ready_timeout)
+    record_property("load_seconds", round(deployment.load_seconds, 1))
+    record_property("expected_load_seconds", model_case.expected_load_seconds)
+    if deployment.load_seconds > model_case.expected_load_seconds:
+        LOGGER.warning(f"{model_case.id} took {deployment.load_seconds:.0f}s to load, "
+                       f"expected {model_case.expected_load_seconds}s")
+
+    if deployment.grpc_host:
+        tgis_client = TGISGRPCPlugin(host=deployment.grpc_host, model_name=model_case.model_name, streaming=True)
+        latencies = []
+        all_tokens = []
+        with timed_phase("requests:grpc"):
+            for query in model_case.completion_queries:
+                started = time.perf_counter()
+                all_tokens.append(tgis_client.make_grpc_request(query))
+                latencies.append(time.perf_counter() - started)
+            model_info = tgis_client.get_model_info()
+            stream = [tgis_client.make_grpc_request_stream(query) for query in model_case.completion_queries]
+        record_property("grpc_latency_seconds", [round(latency, 3) for latency in latencies])
+        assert all_tokens == response_snapshot
+        assert model_info == response_snapshot
+        assert stream == response_snapshot
+
+    openai_client = OpenAIClient(host=deployment.http_url, model_name=model_case.model_name)
+    with timed_phase("requests:http"):
+        completion_responses = [openai_client.request_http(endpoint="/v1/completions", query=query)
+                                for query in model_case.http_completion_queries]
+        chat_responses = [openai_client.request_http(endpoint="/v1/chat/completions", query=query)
+                          for query in model_case.chat_queries]
+    assert completion_responses == response_snapshot
+    assert chat_responses == response_snapshot
@@ -0,0 +1,283 @@
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+import yaml
+
+from model_serving_tests.benchmark.pareto import expand_grid
+from model_serving_tests.tests.constant import INFERE_DIR
+from model_serving_tests.tests.scheduler import deployment_fingerprint
+from model_serving_tests.tests.utils import YAML_LOADER
+
+LOGGER = logging.getLogger(__name__)
+
+# Sidecar spec next to each model's InferenceService template, opting the model into the generic matrix
+SPEC_FILE_NAME = "model_spec.yaml"
+DEFAULT_DEPLOYMENT_TYPES = ["RawDeployment", "Serverless"]
+DEFAULT_GPU_COUNTS = [1]
+DEFAULT_EXPECTED_LOAD_SECONDS = 300
+DEFAULT_VARIANTS = {"default": {}}
+MIN_READY_TIMEOUT = 600
+
+
+class ModelSpecError(Exception):
+    """Exception raised when a model spec is missing required fields or is malformed."""
+    pass
+
+
+@dataclass
+class ModelCase:
+    """One deployment of the model matrix: a model, deployment type, engine-argument variant and GPU count.
+
+    Attributes:
+        model_name (str): The model name, also the folder and template name under model_inference.
+        deployment_type (str): The KServe deployment mode, "RawDeployment" or "Serverless".
+        variant (str): The name of the engine-argument variant.
+        gpu_count (int): The number of GPUs the predictor requests.
+        expected_load_seconds (int): How long the model usually takes from provisioning to Loaded.
+        completion_queries (list): The completion queries to send.
+        chat_queries (list): The chat conversations to send.
+        new_args (list): Extra vLLM arguments of the variant.
+        env_vars (list): Extra environment variables of the variant.
+        http_completion_count (Optional[int]): How many of the completion queries a RawDeployment sends over HTTP,
+            all of them if None.
+        extra_marks (list): Names of the pytest marks of the model, e.g. granite4k.
+        xfail (Optional[str]): Why the variant is expected to fail, None if it is expected to pass.
+    """
+
+    model_name: str
+    deployment_type: str
+    variant: str
+    gpu_count: int
+    expected_load_seconds: int
+    completion_queries: list
+    chat_queries: list
+    new_args: list = field(default_factory=list)
+    env_vars: list = field(default_factory=list)
+    http_completion_count: Optional[int] = None
+    extra_marks: list = field(default_factory=list)
+    xfail: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        """str: The pytest parameter id."""
+        return f"{self.model_name}-{self.deployment_type}-{self.variant}-{self.gpu_count}gpu"
+
+    @property
+    def namespace_name(self) -> str:
+        """str: The namespace to deploy into, shared by cases that differ only in deployment type or GPU count."""
+        name = self.model_name if self.variant == "default" else f"{self.model_name}-{self.variant}"
+        return name.lower()[:63]
+
+    @property
+    def fingerprint(self) -> str:
+        """str: The deployment fingerprint, equal to the one deploy_model computes for the same settings."""
+        return deployment_fingerprint(self.model_name, self.deployment_type, gpu_count=self.gpu_count,
+                                      new_args=self.new_args, env_vars=self.env_vars)
+
+    @property
+    def http_completion_queries(self) -> list:
+        """list: The completion queries sent over HTTP. Serverless cases send the first one only."""
+        if self.deployment_type.lower() == "serverless":
+            return self.completion_queries[:1]
+        return self.completion_queries[:self.http_completion_count]
+
+    @property
+    def ready_timeout(self) -> int:
+        """int: Seconds to wait for the predictor pod, with headroom over the expected load time."""
+        return max(MIN_READY_TIMEOUT, 2 * self.expected_load_seconds)
+
+    @property
+    def marks(self) -> list:
+        """list: The pytest marks of the case, including its scheduling hints."""
+        marks = [pytest.mark.model_matrix,
+                 pytest.mark.schedule(gpus=self.gpu_count, load_seconds=self.expected_load_seconds,
+                                      fingerprint=self.fingerprint)]
+        if self.gpu_count > 1:
+            marks.append(pytest.mark.multigpu)
+        return marks
+
+    @property
+    def validation_marks(self) -> list:
+        """list: The marks of the case in the generic validation flow: smoke on one GPU, the model's marks and
+        xfail for variants expected to fail."""
+        marks = [] if self.gpu_count > 1 else [pytest.mark.smoke]
+        marks += [getattr(pytest.mark, name) for name in self.extra_marks]
+        if self.xfail:
+            marks.append(pytest.mark.xfail(reason=self.xfail))
+        return marks
+
+    def as_param(self, *marks: Any) -> Any:
+        """Return the case as a pytest parameter carrying its id and marks.
+
+        Args:
+            *marks (Any): Extra marks to add, e.g. pytest.mark.benchmark.
+
+        Returns:
+            Any: The pytest.param object.
+        """
+        return pytest.param(self, id=self.id, marks=self.marks + list(marks))
+
+
+def load_model_specs(inference_dir: Path = INFERE_DIR) -> dict:
+    """Read the sidecar spec of every model template that has one.
+
+    Args:
+        inference_dir (Path, optional): The model_inference folder. Defaults to INFERE_DIR.
+
+    Returns:
+        dict: The specs keyed by model name, in model name order.
+
+    Raises:
+        ModelSpecError: If a spec has no queries or a template does not match its folder name.
+    """
+    specs = {}
+    for template in sorted(inference_dir.glob("*/*.yaml")):
+        if template.name == SPEC_FILE_NAME:
+            continue
+        model_name = template.parent.name
+        if template.stem != model_name:
+            raise ModelSpecError(f"Template {template} must be named {model_name}.yaml")
+        spec_path = template.parent / SPEC_FILE_NAME
+        if not spec_path.exists():
+            LOGGER.debug(f"No {SPEC_FILE_NAME} for {model_name}, not part of the model matrix")
+            continue
+        with open(spec_path) as file:
+            spec = yaml.load(file, Loader=YAML_LOADER) or {}
+        if not spec.get("completion_queries") and not spec.get("chat_queries"):
+            raise ModelSpecError(f"{spec_path} defines neither completion_queries nor chat_queries")
+        specs[model_name] = spec
+    return specs
+
+
+def _excluded(case: ModelCase, exclusions: list) -> bool:
+    return any(all(str(getattr(case, key)) == str(value) for key, value in exclusion.items())
+               for exclusion in exclusions)
+
+
+def generate_model_cases(specs: dict) -> list:
+    """Expand model specs into the cross product of deployment types, variants and GPU counts.
+
+    A spec's `exclude` entries drop the combinations matching all of their deployment_type, variant and gpu_count
+    values, e.g. the ones without a curated snapshot.
+
+    Args:
+        specs (dict): The specs keyed by model name, see load_model_specs.
+
+    Returns:
+        list: The ModelCase objects.
+    """
+    cases = []
+    for model_name, spec in specs.items():
+        for deployment_type in spec.get("deployment_types", DEFAULT_DEPLOYMENT_TYPES):
+            for variant, overrides in (spec.get("variants") or DEFAULT_VARIANTS).items():
+                overrides = overrides or {}
+                for gpu_count in spec.get("gpu_counts", DEFAULT_GPU_COUNTS):
+                    case = ModelCase(
+                        model_name=model_name,
+                        deployment_type=deployment_type,
+                        variant=variant,
+                        gpu_count=int(gpu_count),
+                        expected_load_seconds=int(overrides.get("expected_load_seconds",
+                                                                spec.get("expected_load_seconds",
+                                                                         DEFAULT_EXPECTED_LOAD_SECONDS))),
+                        completion_queries=spec.get("completion_queries", []),
+                        chat_queries=spec.get("chat_queries", []),
+                        new_args=list(overrides.get("new_args", [])),
+                        env_vars=list(overrides.get("env_vars", [])),
+                        http_completion_count=spec.get("http_completion_count"),
+                        extra_marks=list(spec.get("marks", [])),
+                        xfail=overrides.get("xfail"),
+                    )
+                    if not _excluded(case, spec.get("exclude", [])):
+                        cases.append(case)
+    return cases
+
+
+def benchmark_cases(cases: list) -> list:
+    """Pick the cases to benchmark: one per model and deployment type, on its first variant and GPU count.
+
+    The picked cases share their fingerprint with a matrix case, so the scheduler runs both on one deployment.
+    Benchmarking both deployment types of a model lets the client-side overhead of each path be compared.
+
+    Args:
+        cases (list): The ModelCase objects, see generate_model_cases.
+
+    Returns:
+        list: One ModelCase per model and deployment type.
+    """
+    picked = {}
+    for case in cases:
+        if not case.xfail:
+            picked.setdefault((case.model_name, case.deployment_type), case)
+    return list(picked.values())
+
+
+def gpu_count_cases(cases: list) -> list:
+    """Pick one RawDeployment case per model and GPU count, on its first variant.
+
+    Args:
+        cases (list): The ModelCase objects, see generate_model_cases.
+
+    Returns:
+        list: One ModelCase per model and GPU count.
+    """
+    picked = {}
+    for case in cases:
+        if case.deployment_type.lower() == "rawdeployment" and not case.xfail:
+            picked.setdefault((case.model_name, case.gpu_count), case)
+    return list(picked.values())
+
+
+def deployment_type_pairs(cases: list) -> list:
+    """Pair the RawDeployment and Serverless benchmark cases of every model that has both.
+
+    Args:
+        cases (list): The ModelCase objects, see generate_model_cases.
+
+    Returns:
+        list: (RawDeployment case, Serverless case) tuples, one per model.
+    """
+    by_type = {}
+    for case in benchmark_cases(cases):
+        by_type.setdefault(case.model_name, {})[case.deployment_type.lower()] = case
+    return [(types["rawdeployment"], types["serverless"]) for types in by_type.values()
+            if {"rawdeployment", "serverless"} <= types.keys()]
+
+
+def sweep_cases(specs: dict, grid: Optional[dict] = None) -> list:
+    """Expand the engine-argument sweep of every model into one case per combination.
+
+    Each model sweeps the grid given here, or else the `sweep` grid of its spec, and is skipped if it has
+    neither. The sweep runs as a RawDeployment on the first GPU count, on top of the engine arguments of the
+    first variant so quantized models keep their quantization.
+
+    Args:
+        specs (dict): The specs keyed by model name, see load_model_specs.
+        grid (Optional[dict], optional): Candidate values keyed by engine argument, for every model.
+            Defaults to None.
+
+    Returns:
+        list: The ModelCase objects, variants named sweep0, sweep1, ...
+    """
+    cases = []
+    for model_name, spec in specs.items():
+        model_grid = grid or spec.get("sweep")
+        if not model_grid:
+            continue
+        base = next(iter((spec.get("variants") or DEFAULT_VARIANTS).values())) or {}
+        for index, args in enumerate(expand_grid(model_grid)):
+            cases.append(ModelCase(
+                model_name=model_name,
+                deployment_type="RawDeployment",
+                variant=f"sweep{index}",
+                gpu_count=int(spec.get("gpu_counts", DEFAULT_GPU_COUNTS)[0]),
+                expected_load_seconds=int(spec.get("expected_load_seconds", DEFAULT_EXPECTED_LOAD_SECONDS)),
+                completion_queries=spec.get("completion_queries", []),
+                chat_queries=spec.get("chat_queries", []),
+                new_args=list(base.get("new_args", [])) + args,
+                env_vars=list(base.get("env_vars", [])),
+            ))
+    return cases
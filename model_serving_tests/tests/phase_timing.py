@@ -0,0 +1,180 @@
+import html
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any
+
+import pytest
+
+from model_serving_tests.tests.timing import RECORDER, timed_phase
+
+LOGGER = logging.getLogger(__name__)
+
+# user_properties entries carrying the timings from the (possibly remote) worker to the controller
+PHASES_PROPERTY = "phase_timings"
+MODEL_PROPERTY = "phase_model"
+SUMMARY_TOP_PHASES = 10
+
+
+def item_model_name(item: Any) -> str:
+    """Return the model a test deploys, from its `model_case` or `model_name` parameter.
+
+    Args:
+        item (Any): The pytest item.
+
+    Returns:
+        str: The model name, or "-" if the test is not parametrized with one.
+    """
+    params = getattr(getattr(item, "callspec", None), "params", {})
+    if "model_case" in params:
+        return params["model_case"].model_name
+    return params.get("model_name", "-")
+
+
+class PhaseTimingReport:
+    """Aggregate the phase timings of every test per test and per model, on the controlling process."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the PhaseTimingReport.
+
+        Args:
+            path (str): Where to write the JSON report, empty to skip it.
+        """
+        self.path = path
+        self.tests = {}
+
+    def pytest_runtest_logreport(self, report):
+        properties = dict(report.user_properties)
+        if report.when != "teardown" or PHASES_PROPERTY not in properties:
+            return
+        self.tests[report.nodeid] = {"model": properties.get(MODEL_PROPERTY, "-"),
+                                     "phases": properties[PHASES_PROPERTY]}
+
+    def per_model(self) -> dict:
+        """Sum the phases of the tests of each model.
+
+        Returns:
+            dict: For each model, its number of tests and the total seconds per phase.
+        """
+        models = {}
+        for record in self.tests.values():
+            model = models.setdefault(record["model"], {"tests": 0, "phases": defaultdict(float)})
+            model["tests"] += 1
+            for name, seconds in record["phases"].items():
+                model["phases"][name] += seconds
+        return {name: {"tests": model["tests"], "phases": dict(model["phases"])} for name, model in models.items()}
+
+    def totals(self) -> dict:
+        """Sum each phase over all tests, longest first.
+
+        Returns:
+            dict: Total seconds per phase name.
+        """
+        totals = defaultdict(float)
+        for record in self.tests.values():
+            for name, seconds in record["phases"].items():
+                totals[name] += seconds
+        return dict(sorted(totals.items(), key=lambda entry: entry[1], reverse=True))
+
+    def as_dict(self) -> dict:
+        """Return the whole report.
+
+        Returns:
+            dict: The creation time, totals, per-model and per-test timings.
+        """
+        return {"created": time.time(), "totals": self.totals(), "models": self.per_model(), "tests": self.tests}
+
+    def pytest_sessionfinish(self, session):
+        if self.path and self.tests:
+            with open(self.path, "w") as file:
+                json.dump(self.as_dict(), file, indent=2, sort_keys=True)
+            LOGGER.info(f"Phase timings written to {self.path}")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.tests:
+            return
+        terminalreporter.write_sep("-", "phase timings (seconds, summed over tests)")
+        for name, seconds in list(self.totals().items())[:SUMMARY_TOP_PHASES]:
+            terminalreporter.write_line(f"{seconds:10.1f}  {name}")
+
+
+class PhaseTimingHtml:
+    """pytest-html summary section with the per-model phase table, registered only when pytest-html is active."""
+
+    def __init__(self, report: PhaseTimingReport) -> None:
+        """
+        Initialize the PhaseTimingHtml.
+
+        Args:
+            report (PhaseTimingReport): The aggregated timings.
+        """
+        self.report = report
+
+    def pytest_html_results_summary(self, prefix, summary, postfix, session):
+        models = self.report.per_model()
+        if not models:
+            return
+        phases = list(self.report.totals())[:SUMMARY_TOP_PHASES]
+        header = "".join(f"<th>{html.escape(name)}</th>" for name in phases)
+        rows = "".join(
+            f"<tr><td>{html.escape(model)}</td><td>{data['tests']}</td>"
+            + "".join(f"<td>{data['phases'].get(name, 0.0):.1f}</td>" for name in phases) + "</tr>"
+            for model, data in sorted(models.items()))
+        postfix.append(f"<h2>Phase timings (seconds)</h2><table><tr><th>model</th><th>tests</th>{header}</tr>"
+                       f"{rows}</table>")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--phase-report",
+        action="store",
+        default="",
+        help="Write the per-test and per-model phase timings to this JSON file"
+    )
+
+
+def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        return
+    report = PhaseTimingReport(config.getoption("--phase-report"))
+    config.pluginmanager.register(report, "phase_timing_report")
+    if config.pluginmanager.hasplugin("html"):
+        config.pluginmanager.register(PhaseTimingHtml(report), "phase_timing_html")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    started = time.perf_counter()
+    yield
+    RECORDER.add(f"fixture:{fixturedef.argname}", time.perf_counter() - started)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    # Drop anything recorded outside of a test, e.g. during collection
+    RECORDER.drain()
+    with timed_phase("setup"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with timed_phase("call"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    with timed_phase("teardown"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when == "teardown":
+        report = outcome.get_result()
+        report.user_properties.append((MODEL_PROPERTY, item_model_name(item)))
+        report.user_properties.append((PHASES_PROPERTY, RECORDER.drain()))
@@ -0,0 +1,220 @@
+import asyncio
+import functools
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from kubernetes.client import CoreV1Api
+from kubernetes.client.exceptions import ApiException
+from kubernetes.dynamic.client import DynamicClient
+from kubernetes.stream import portforward
+from websocket import WebSocketException
+
+LOGGER = logging.getLogger(__name__)
+
+RELAY_BUFFER_SIZE = 64 * 1024
+
+
+class PortForwardError(Exception):
+    """Exception raised when a tunnel to the pod port cannot be opened."""
+    pass
+
+
+class PortForward:
+    """In-process port-forward from a local TCP port to a pod port.
+
+    A local asyncio TCP server accepts connections and relays each of them over its own Kubernetes portforward
+    websocket, so no `oc` process is needed. The relay runs on a dedicated event loop thread. A tunnel that fails
+    to open is retried with a linear backoff, and a dropped tunnel only closes the connection that was using it,
+    new connections open a fresh tunnel.
+    """
+
+    def __init__(self,
+                 client: DynamicClient,
+                 namespace: str,
+                 pod_name: str,
+                 remote_port: int,
+                 local_port: int = 0,
+                 max_retries: int = 5,
+                 retry_delay: float = 1.0) -> None:
+        """
+        Initialize the PortForward.
+
+        Args:
+            client (DynamicClient): The Kubernetes dynamic client.
+            namespace (str): The namespace of the pod.
+            pod_name (str): The name of the pod to forward to.
+            remote_port (int): The pod port to forward to.
+            local_port (int, optional): The local port to listen on. Defaults to 0, an ephemeral port.
+            max_retries (int, optional): Attempts to open a tunnel before giving up. Defaults to 5.
+            retry_delay (float, optional): Base delay in seconds between attempts. Defaults to 1.0.
+        """
+        self.core_api = CoreV1Api(api_client=client.client)
+        self.namespace = namespace
+        self.pod_name = pod_name
+        self.remote_port = remote_port
+        self.local_port = local_port
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # Resolves to the bound local port once the listener is up and a tunnel to the pod was opened
+        self.ready: Future = Future()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connections = 0
+        self.tunnel_failures = 0
+        self.drops = 0
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "PortForward":
+        self.start()
+        self.wait_ready()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "PortForward":
+        """Start the relay thread. Use `ready` or `wait_ready` to know when the forward is usable."""
+        self._thread = threading.Thread(target=self._run, name=f"port-forward-{self.pod_name}-{self.remote_port}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_ready(self, timeout: float = 60) -> int:
+        """Block until the forward is ready.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to 60.
+
+        Returns:
+            int: The local port to connect to.
+
+        Raises:
+            PortForwardError: If no tunnel to the pod could be opened.
+        """
+        return self.ready.result(timeout=timeout)
+
+    def stop(self) -> None:
+        """Stop accepting connections, close open tunnels and join the relay thread."""
+        if self._loop is not None and self._stop_event is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        if not self.ready.done():
+            self.ready.set_exception(PortForwardError("Port-forward stopped before it became ready"))
+
+    def stats(self) -> dict:
+        """Return the tunnel traffic counters and throughput.
+
+        Returns:
+            dict: Bytes relayed in each direction, throughput in bytes per second, the local connections, the
+                failed attempts to open a tunnel and the tunnels dropped mid-connection.
+        """
+        end = self._stopped_at or time.monotonic()
+        elapsed = end - self._started_at if self._started_at else 0.0
+        total = self.bytes_sent + self.bytes_received
+        return {
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "elapsed_seconds": elapsed,
+            "throughput_bytes_per_second": total / elapsed if elapsed else 0.0,
+            "connections": self.connections,
+            "tunnel_failures": self.tunnel_failures,
+            "drops": self.drops,
+        }
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as err:
+            LOGGER.exception("Port-forward relay failed")
+            if not self.ready.done():
+                self.ready.set_exception(err)
+        finally:
+            self._stopped_at = time.monotonic()
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        self._stop_event = asyncio.Event()
+        server = await asyncio.start_server(self._handle_connection, host="localhost", port=self.local_port)
+        async with server:
+            self.local_port = server.sockets[0].getsockname()[1]
+            try:
+                # Open one tunnel up front so readiness means the pod port is reachable through the API server
+                probe = await self._open_tunnel()
+            except PortForwardError as err:
+                self.ready.set_exception(err)
+                return
+            forward, _, writer = probe
+            writer.close()
+            forward.close()
+            self._started_at = time.monotonic()
+            LOGGER.info(f"Forwarding localhost:{self.local_port} -> "
+                        f"{self.namespace}/{self.pod_name}:{self.remote_port}")
+            self.ready.set_result(self.local_port)
+            await self._stop_event.wait()
+
+    async def _open_tunnel(self) -> tuple:
+        open_forward = functools.partial(portforward, self.core_api.connect_get_namespaced_pod_portforward,
+                                         self.pod_name, self.namespace, ports=str(self.remote_port))
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                forward = await asyncio.get_running_loop().run_in_executor(None, open_forward)
+                # Take ownership of the socketpair end so asyncio can drive it directly
+                sock = socket.socket(fileno=forward.socket(self.remote_port).detach())
+                reader, writer = await asyncio.open_connection(sock=sock)
+                return forward, reader, writer
+            except (ApiException, WebSocketException, OSError) as err:
+                LOGGER.warning(f"Opening tunnel to {self.pod_name}:{self.remote_port} failed "
+                               f"(attempt {attempt}/{self.max_retries}): {err}")
+                self.tunnel_failures += 1
+                await asyncio.sleep(self.retry_delay * attempt)
+        raise PortForwardError(f"Could not open a tunnel to {self.namespace}/{self.pod_name}:{self.remote_port}")
+
+    async def _handle_connection(self, client_reader: asyncio.StreamReader,
+                                 client_writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            forward, tunnel_reader, tunnel_writer = await self._open_tunnel()
+        except PortForwardError:
+            LOGGER.exception("Dropping local connection, no tunnel available")
+            client_writer.close()
+            return
+
+        upstream = asyncio.create_task(self._relay(client_reader, tunnel_writer, "bytes_sent"))
+        downstream = asyncio.create_task(self._relay(tunnel_reader, client_writer, "bytes_received"))
+        stop = asyncio.create_task(self._stop_event.wait())
+        # The exchange is over once the pod side is done sending, a half-closed local side may still await a reply
+        done, _ = await asyncio.wait({downstream, stop}, return_when=asyncio.FIRST_COMPLETED)
+        if downstream in done and not forward.connected and not client_reader.at_eof():
+            # The websocket went away while the local side was still talking
+            self.drops += 1
+            LOGGER.warning(f"Tunnel to {self.pod_name}:{self.remote_port} dropped, closing local connection")
+        for task in (upstream, downstream, stop):
+            task.cancel()
+        for writer in (tunnel_writer, client_writer):
+            writer.close()
+        forward.close()
+
+    async def _relay(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, counter: str) -> None:
+        try:
+            while data := await reader.read(RELAY_BUFFER_SIZE):
+                writer.write(data)
+                await writer.drain()
+                setattr(self, counter, getattr(self, counter) + len(data))
+        except (ConnectionError, OSError) as err:
+            LOGGER.debug(f"Relay closed: {err}")
+        finally:
+            if writer.can_write_eof():
+                try:
+                    writer.write_eof()
+                except OSError:
+                    pass
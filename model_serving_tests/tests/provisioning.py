@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from model_serving_tests.tests.timing import timed_phase
+from model_serving_tests.tests.utils import resource_from_manifest, wait_for_predictor_pod, worker_namespace_name
+
+if TYPE_CHECKING:
+    from kubernetes.dynamic.client import DynamicClient
+    from ocp_resources.inference_service import InferenceService
+    from ocp_resources.namespace import Namespace
+    from ocp_resources.pod import Pod
+
+LOGGER = logging.getLogger(__name__)
+
+SERVICE_ACCOUNT_NAME = "modelmesh-serving-sa"
+DELETE_TIMEOUT = 600
+REAPER_POLL_INTERVAL = 5
+MODEL_STATE_POLL_INTERVAL = 2
+# Namespace conditions reporting what still blocks the deletion
+FINALIZER_CONDITIONS = ("NamespaceContentRemaining", "NamespaceFinalizersRemaining")
+
+
+class DeploymentError(Exception):
+    """Exception raised when a model deployment does not reach the Loaded state."""
+    pass
+
+
+def create_active_namespace(client: DynamicClient, namespace_reaper: NamespaceReaper, name: str) -> Namespace:
+    """Create a namespace for the current pytest-xdist worker and wait for it to be Active.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace_reaper (NamespaceReaper): The reaper, waited on if a namespace of that name is still terminating.
+        name (str): The base namespace name, suffixed with the worker id.
+
+    Returns:
+        Namespace: The Active namespace.
+    """
+    from ocp_resources.namespace import Namespace
+
+    name = worker_namespace_name(name)
+    namespace_reaper.wait_for(name)
+    LOGGER.info("CREATING NEW NAMESPACE")
+    with timed_phase("namespace"):
+        namespace = Namespace(client=client, name=name, delete_timeout=DELETE_TIMEOUT)
+        namespace.create()
+        LOGGER.info("WAITING FOR NS STATUS TO BECOME ACTIVE")
+        namespace.wait_for_status(status=Namespace.Status.ACTIVE, timeout=120)
+    LOGGER.info(f"NS {name} IS ACTIVE, RETURNING")
+    return namespace
+
+
+def provision_model_resources(client: DynamicClient,
+                              namespace: str,
+                              secret_manifest: dict,
+                              runtime_manifest: dict,
+                              isvc_manifest: dict) -> InferenceService:
+    """Create the resources of a model deployment in an Active namespace.
+
+    The secret, service account and serving runtime do not depend on each other and are created concurrently.
+    The InferenceService is created once they all exist, so its predictor never races its service account.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace to provision into.
+        secret_manifest (dict): The rendered S3 secret manifest.
+        runtime_manifest (dict): The rendered ServingRuntime manifest.
+        isvc_manifest (dict): The rendered InferenceService manifest.
+
+    Returns:
+        InferenceService: The created inference service.
+    """
+    from ocp_resources.inference_service import InferenceService
+    from ocp_resources.secret import Secret
+    from ocp_resources.service_account import ServiceAccount
+    from ocp_resources.serving_runtime import ServingRuntime
+
+    secret = resource_from_manifest(Secret, client=client, namespace=namespace, manifest=secret_manifest)
+    service_account = ServiceAccount(client=client, name=SERVICE_ACCOUNT_NAME, namespace=namespace,
+                                     secrets=[{'name': secret.name}])
+    serving_runtime = resource_from_manifest(ServingRuntime, client=client, namespace=namespace,
+                                             manifest=runtime_manifest)
+    LOGGER.info(f"CREATING SECRET, SA AND RUNTIME IN {namespace}")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(_timed_create, phase, resource) for phase, resource in
+                   (("secret", secret), ("service_account", service_account), ("runtime", serving_runtime))]
+        for future in futures:
+            future.result()
+
+    LOGGER.info("CREATING INFERENCE SERVICE")
+    inference_service = resource_from_manifest(InferenceService, client=client, namespace=namespace,
+                                               manifest=isvc_manifest)
+    _timed_create("inference_service", inference_service)
+    return inference_service
+
+
+def _timed_create(phase: str, resource: Any) -> None:
+    with timed_phase(phase):
+        resource.create()
+
+
+@dataclass
+class ModelDeployment:
+    """A model deployed and ready to serve, with the endpoints to reach it.
+
+    Attributes:
+        model_name (str): The served model name.
+        deployment_type (str): The KServe deployment mode.
+        gpu_count (int): The number of GPUs of the predictor.
+        namespace (Namespace): The namespace holding the deployment.
+        inference_service (InferenceService): The inference service.
+        predictor_pod (Pod): The ready predictor pod.
+        http_url (str): The base URL of the OpenAI compatible HTTP endpoint.
+        grpc_host (Optional[str]): The host:port of the TGIS gRPC endpoint, None when it is not exposed.
+        load_seconds (float): Seconds from provisioning to the model being Loaded.
+        fingerprint (str): The deployment fingerprint, a hash of the settings the deployment was made with.
+    """
+
+    model_name: str
+    deployment_type: str
+    gpu_count: int
+    namespace: Namespace
+    inference_service: InferenceService
+    predictor_pod: Pod
+    http_url: str
+    grpc_host: Optional[str]
+    load_seconds: float
+    fingerprint: str
+
+
+def wait_for_model_loaded(inference_service: InferenceService, timeout: int = 60) -> Optional[str]:
+    """Wait for the active model state of an inference service to become Loaded.
+
+    Args:
+        inference_service (InferenceService): The inference service.
+        timeout (int, optional): Seconds to wait. Defaults to 60.
+
+    Returns:
+        Optional[str]: The last observed active model state.
+    """
+    deadline = time.monotonic() + timeout
+    state = None
+    while True:
+        status = inference_service.instance.status
+        states = status.modelStatus.states if status and status.modelStatus else None
+        state = states.activeModelState if states else None
+        if state == "Loaded" or time.monotonic() >= deadline:
+            LOGGER.info(f"Model status: {state}")
+            return state
+        time.sleep(MODEL_STATE_POLL_INTERVAL)
+
+
+class NamespaceReaper:
+    """Delete namespaces in the background and track them until they are gone.
+
+    Deleting a namespace cascades to everything in it, so one non-blocking delete replaces a serial
+    `delete(wait=True)` per resource. A monitor thread polls the pending namespaces and logs which content or
+    finalizers still hold each of them, so a stuck teardown is visible while the next test is already running.
+    """
+
+    def __init__(self, client: DynamicClient, timeout: int = 600) -> None:
+        """
+        Initialize the NamespaceReaper.
+
+        Args:
+            client (DynamicClient): The Kubernetes dynamic client.
+            timeout (int, optional): Seconds a namespace may take to disappear. Defaults to 600.
+        """
+        self.client = client
+        self.timeout = timeout
+        self._pending = {}
+        self._finalizer_messages = {}
+        self._callbacks = defaultdict(list)
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._monitor = threading.Thread(target=self._watch, name="namespace-reaper", daemon=True)
+        self._monitor.start()
+
+    def reap(self, namespace: Namespace) -> None:
+        """Issue the deletion of a namespace without waiting for it.
+
+        Args:
+            namespace (Namespace): The namespace to delete.
+        """
+        from model_serving_tests.tests.kube_cache import stop_pod_informers
+
+        LOGGER.info(f"DELETING NAMESPACE {namespace.name} IN THE BACKGROUND")
+        stop_pod_informers(namespace.name)
+        namespace.delete(wait=False)
+        with self._lock:
+            self._pending[namespace.name] = time.monotonic()
+            self._lock.notify_all()
+
+    def on_deleted(self, name: str, callback: Callable[[], None]) -> None:
+        """Register a callable to run once a namespace is gone, e.g. to hand its GPUs back to the budget.
+
+        Args:
+            name (str): The namespace name.
+            callback (Callable[[], None]): Called from the monitor thread after the deletion completed.
+        """
+        with self._lock:
+            self._callbacks[name].append(callback)
+
+    def wait_for(self, name: str) -> None:
+        """Block until a namespace queued for deletion is gone, e.g. before re-creating one with the same name.
+
+        Args:
+            name (str): The namespace name.
+
+        Raises:
+            TimeoutError: If the namespace is still terminating after the reaper timeout.
+        """
+        with self._lock:
+            if name in self._pending:
+                LOGGER.info(f"WAITING FOR PREVIOUS NAMESPACE {name} TO TERMINATE")
+            if not self._lock.wait_for(lambda: name not in self._pending, timeout=self.timeout):
+                raise TimeoutError(f"Namespace {name} is still terminating: {self._finalizer_messages.get(name)}")
+
+    def drain(self) -> None:
+        """Wait for every pending deletion, then stop the monitor thread."""
+        with self._lock:
+            if not self._lock.wait_for(lambda: not self._pending, timeout=self.timeout):
+                LOGGER.warning(f"Namespaces still terminating at the end of the session: {sorted(self._pending)}")
+            callbacks = [callback for callbacks in self._callbacks.values() for callback in callbacks]
+            self._callbacks.clear()
+        for callback in callbacks:
+            callback()
+        self._stop.set()
+        self._monitor.join(timeout=REAPER_POLL_INTERVAL * 2)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(REAPER_POLL_INTERVAL):
+            with self._lock:
+                pending = dict(self._pending)
+            for name, deleted_at in pending.items():
+                try:
+                    self._check(name, deleted_at)
+                except Exception:
+                    LOGGER.exception(f"Failed to check namespace {name}")
+
+    def _check(self, name: str, deleted_at: float) -> None:
+        from ocp_resources.namespace import Namespace
+
+        namespace = Namespace(client=self.client, name=name)
+        instance = namespace.exists
+        if not instance:
+            LOGGER.info(f"NAMESPACE {name} DELETED AFTER {time.monotonic() - deleted_at:.1f}s")
+            with self._lock:
+                self._pending.pop(name, None)
+                self._finalizer_messages.pop(name, None)
+                callbacks = self._callbacks.pop(name, [])
+                self._lock.notify_all()
+            for callback in callbacks:
+                callback()
+            return
+
+        messages = [condition.message for condition in (instance.status.conditions or [])
+                    if condition.type in FINALIZER_CONDITIONS and condition.status == "True"]
+        if messages and messages != self._finalizer_messages.get(name):
+            self._finalizer_messages[name] = messages
+            LOGGER.info(f"NAMESPACE {name} WAITING ON: {'; '.join(messages)}")
+
+
+class DeploymentPool:
+    """Model deployments shared by the tests of one schedule group.
+
+    Deployments are keyed by their fingerprint and kept, along with their namespace and port-forwards, until
+    `release` is called for the fingerprint, which the scheduler does once the last test of the group finished.
+    Tests scheduled back to back on the same deployment therefore pay for a single cold start. GPUs are leased
+    from the budget before provisioning and handed back once the namespace is gone.
+    """
+
+    def __init__(self, client: DynamicClient, namespace_reaper: NamespaceReaper, gpu_budget: Any) -> None:
+        """
+        Initialize the DeploymentPool.
+
+        Args:
+            client (DynamicClient): The Kubernetes dynamic client.
+            namespace_reaper (NamespaceReaper): The reaper deleting released namespaces.
+            gpu_budget (Any): The GpuBudget to lease GPUs from.
+        """
+        self.client = client
+        self.namespace_reaper = namespace_reaper
+        self.gpu_budget = gpu_budget
+        self._deployments = {}
+        self._namespaces = {}
+        self._forwards = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def deploy(self,
+               fingerprint: str,
+               model_name: str,
+               deployment_type: str,
+               gpu_count: int,
+               namespace_name: str,
+               secret_manifest: dict,
+               runtime_manifest: dict,
+               isvc_manifest: dict,
+               ready_timeout: int = 600) -> ModelDeployment:
+        """Return the deployment of a fingerprint, deploying it first if it is not in the pool.
+
+        Args:
+            fingerprint (str): The deployment fingerprint.
+            model_name (str): The model name.
+            deployment_type (str): The KServe deployment mode.
+            gpu_count (int): The number of GPUs of the predictor.
+            namespace_name (str): The base namespace name.
+            secret_manifest (dict): The rendered S3 secret manifest.
+            runtime_manifest (dict): The rendered ServingRuntime manifest.
+            isvc_manifest (dict): The rendered InferenceService manifest.
+            ready_timeout (int, optional): Seconds to wait for the predictor pod. Defaults to 600.
+
+        Returns:
+            ModelDeployment: The ready deployment.
+
+        Raises:
+            DeploymentError: If the model did not reach the Loaded state.
+        """
+        with self._lock:
+            if fingerprint in self._deployments:
+                LOGGER.info(f"REUSING DEPLOYMENT {fingerprint} OF {model_name}")
+                return self._deployments[fingerprint]
+
+            started = time.monotonic()
+            lease = self.gpu_budget.acquire(gpu_count)
+            try:
+                namespace = create_active_namespace(self.client, self.namespace_reaper,
+                                                    f"{namespace_name[:45].rstrip('-')}-{fingerprint[:6]}")
+            except Exception:
+                lease.release()
+                raise
+            self.namespace_reaper.on_deleted(namespace.name, lease.release)
+            self._namespaces[fingerprint] = namespace
+            try:
+                deployment = self._deploy(fingerprint, namespace, model_name, deployment_type, gpu_count,
+                                          secret_manifest, runtime_manifest, isvc_manifest, ready_timeout, started)
+            except Exception:
+                self._teardown(fingerprint)
+                raise
+            self._deployments[fingerprint] = deployment
+            return deployment
+
+    def release(self, fingerprint: str) -> None:
+        """Tear down the deployment of a fingerprint if the pool holds one.
+
+        Args:
+            fingerprint (str): The deployment fingerprint.
+        """
+        with self._lock:
+            self._teardown(fingerprint)
+
+    def forward_stats(self, fingerprint: str) -> dict:
+        """Return the traffic counters of the port-forwards of a deployment.
+
+        Args:
+            fingerprint (str): The deployment fingerprint.
+
+        Returns:
+            dict: PortForward.stats() keyed by remote port, empty for Serverless deployments.
+        """
+        with self._lock:
+            return {forward.remote_port: forward.stats() for forward in self._forwards.get(fingerprint, [])}
+
+    def close(self) -> None:
+        """Tear down every deployment still in the pool."""
+        with self._lock:
+            for fingerprint in list(self._namespaces):
+                self._teardown(fingerprint)
+
+    def _deploy(self, fingerprint: str, namespace: Namespace, model_name: str, deployment_type: str, gpu_count: int,
+                secret_manifest: dict, runtime_manifest: dict, isvc_manifest: dict, ready_timeout: int,
+                started: float) -> ModelDeployment:
+        inference_service = provision_model_resources(client=self.client, namespace=namespace.name,
+                                                      secret_manifest=secret_manifest,
+                                                      runtime_manifest=runtime_manifest,
+                                                      isvc_manifest=isvc_manifest)
+        predictor_pod = wait_for_predictor_pod(self.client, namespace=namespace.name, is_name=inference_service.name,
+                                               timeout=ready_timeout)
+        with timed_phase("model_loaded"):
+            state = wait_for_model_loaded(inference_service)
+        if state != "Loaded":
+            raise DeploymentError(f"Model {model_name} in {namespace.name} is not in Loaded state")
+        load_seconds = time.monotonic() - started
+        LOGGER.info(f"MODEL {model_name} LOADED IN {load_seconds:.1f}s")
+
+        if deployment_type.lower() == "rawdeployment":
+            grpc_host = f"localhost:{self._port_forward(fingerprint, namespace, predictor_pod, 8033)}"
+            http_url = f"http://localhost:{self._port_forward(fingerprint, namespace, predictor_pod, 8080)}"
+        else:
+            grpc_host = None
+            http_url = f"{inference_service.instance.status.url}:443"
+        return ModelDeployment(model_name=model_name, deployment_type=deployment_type, gpu_count=gpu_count,
+                               namespace=namespace, inference_service=inference_service, predictor_pod=predictor_pod,
+                               http_url=http_url, grpc_host=grpc_host, load_seconds=load_seconds,
+                               fingerprint=fingerprint)
+
+    def _port_forward(self, fingerprint: str, namespace: Namespace, pod: Pod, remote_port: int) -> int:
+        from model_serving_tests.tests.port_forward import PortForward
+
+        forward = PortForward(client=self.client, namespace=namespace.name, pod_name=pod.name,
+                              remote_port=remote_port)
+        self._forwards[fingerprint].append(forward)
+        with timed_phase("port_forward"):
+            return forward.start().wait_ready()
+
+    def _teardown(self, fingerprint: str) -> None:
+        with timed_phase("deployment_teardown"):
+            self._release(fingerprint)
+
+    def _release(self, fingerprint: str) -> None:
+        for forward in self._forwards.pop(fingerprint, []):
+            forward.stop()
+            LOGGER.info(f"Port-forward {forward.pod_name}:{forward.remote_port} stats: {forward.stats()}")
+        self._deployments.pop(fingerprint, None)
+        namespace = self._namespaces.pop(fingerprint, None)
+        if namespace is not None:
+            self.namespace_reaper.reap(namespace)
@@ -0,0 +1,63 @@
+import json
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# user_properties entry carrying one recommendation from the (possibly remote) worker to the controller
+RIGHTSIZING_PROPERTY = "rightsizing"
+
+
+class RightsizingReport:
+    """Collect the resource recommendations of every worker and print them per model and GPU count."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the RightsizingReport.
+
+        Args:
+            path (str): Where to write the JSON report, empty to skip it.
+        """
+        self.path = path
+        self.recommendations = {}
+
+    def pytest_runtest_logreport(self, report):
+        properties = dict(report.user_properties)
+        if report.when != "call" or RIGHTSIZING_PROPERTY not in properties:
+            return
+        recommendation = properties[RIGHTSIZING_PROPERTY]
+        self.recommendations.setdefault(recommendation["model"], {})[recommendation["gpu_count"]] = recommendation
+
+    def pytest_sessionfinish(self, session):
+        if self.path and self.recommendations:
+            with open(self.path, "w") as file:
+                json.dump({"created": time.time(), "models": self.recommendations}, file, indent=2, sort_keys=True)
+            LOGGER.info(f"Resource recommendations written to {self.path}")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.recommendations:
+            return
+        terminalreporter.write_sep("-", "predictor resource requests (current -> recommended)")
+        terminalreporter.write_line(f"{'model':<40} {'gpus':>4} {'cpu':>14} {'memory':>16} {'shm':>14}")
+        for model, by_gpu_count in sorted(self.recommendations.items()):
+            for gpu_count, recommendation in sorted(by_gpu_count.items()):
+                current, recommended = recommendation["current"], recommendation["recommended"]
+                columns = [f"{current.get(key, '-')} -> {recommended.get(key, '-')}"
+                           for key in ("cpu", "memory", "shm")]
+                terminalreporter.write_line(f"{model:<40} {gpu_count:>4} {columns[0]:>14} {columns[1]:>16} "
+                                            f"{columns[2]:>14}")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--rightsizing-report",
+        action="store",
+        default="",
+        help="Write the recommended predictor resource requests to this JSON file"
+    )
+
+
+def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        return
+    config.pluginmanager.register(RightsizingReport(config.getoption("--rightsizing-report")), "rightsizing_report")
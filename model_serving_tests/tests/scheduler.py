@@ -0,0 +1,375 @@
+import fcntl
+import hashlib
+import heapq
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+# Set by the controlling process so that every pytest-xdist worker shares one GPU budget
+GPU_BUDGET_DIR_ENV = "MODEL_SERVING_TESTS_GPU_BUDGET_DIR"
+DEFAULT_LOAD_SECONDS = 300
+# Rough request time of one test against an already loaded model, only used to weigh the groups
+REQUEST_SECONDS_PER_TEST = 60
+GPU_WAIT_TIMEOUT = 7200
+GPU_POLL_INTERVAL = 5
+
+
+def deployment_fingerprint(model_name: str, deployment_type: str, gpu_count: int = 1, new_args: Any = None,
+                           env_vars: Any = None, shm_size: Any = None, executor_backend: Any = None,
+                           image: Any = None) -> str:
+    """Return a stable identifier of a model deployment, equal for tests that can share one.
+
+    Args:
+        model_name (str): The model name.
+        deployment_type (str): The KServe deployment mode.
+        gpu_count (int, optional): The number of GPUs. Defaults to 1.
+        new_args (Any, optional): Extra vLLM arguments. Defaults to None.
+        env_vars (Any, optional): Extra environment variables. Defaults to None.
+        shm_size (Any, optional): The /dev/shm size limit, None for the template's. Defaults to None.
+        executor_backend (Any, optional): The distributed executor backend, None for the template's.
+            Defaults to None.
+        image (Any, optional): The runtime image, None for --runtime-image. Defaults to None.
+
+    Returns:
+        str: A short hash of the deployment settings.
+    """
+    settings = [model_name, deployment_type.lower(), int(gpu_count), list(new_args or []), list(env_vars or [])]
+    # Template overrides only enter the hash when set, so deployments using the template defaults keep theirs
+    if shm_size is not None or executor_backend is not None:
+        settings += [shm_size, executor_backend]
+    if image is not None:
+        settings += ["image", image]
+    payload = json.dumps(settings, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+@dataclass
+class DeploymentGroup:
+    """The tests sharing one deployment fingerprint, scheduled as a unit.
+
+    Attributes:
+        fingerprint (str): The deployment fingerprint.
+        gpus (int): The GPUs the deployment holds.
+        load_seconds (float): The expected time to get the model Loaded.
+        items (list): The pytest items of the group, in collection order.
+    """
+
+    fingerprint: str
+    gpus: int
+    load_seconds: float
+    items: list = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        """float: Estimated seconds the deployment is held, one cold start plus the requests of every test."""
+        return self.load_seconds + REQUEST_SECONDS_PER_TEST * len(self.items)
+
+
+class SchedulePlan:
+    """Per-process bookkeeping of which deployment groups still have tests left to run.
+
+    Listeners are called with a fingerprint once the last test of its group finished, so a deployment kept
+    alive for the group can be released right away instead of at the end of the session.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty SchedulePlan."""
+        self.fingerprints = {}
+        self.remaining = Counter()
+        self.listeners = []
+
+    def add(self, group: DeploymentGroup) -> None:
+        """Track the tests of a group.
+
+        Args:
+            group (DeploymentGroup): The group.
+        """
+        for item in group.items:
+            self.fingerprints[item.nodeid] = group.fingerprint
+        self.remaining[group.fingerprint] += len(group.items)
+
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        """Register a callable to notify when a group has no tests left.
+
+        Args:
+            listener (Callable[[str], None]): Called with the fingerprint of the finished group.
+        """
+        self.listeners.append(listener)
+
+    def finished(self, nodeid: str) -> None:
+        """Record that a test finished, notifying the listeners if it was the last of its group.
+
+        Args:
+            nodeid (str): The pytest node id of the test.
+        """
+        fingerprint = self.fingerprints.pop(nodeid, None)
+        if fingerprint is None:
+            return
+        self.remaining[fingerprint] -= 1
+        if self.remaining[fingerprint] <= 0:
+            for listener in self.listeners:
+                listener(fingerprint)
+
+
+SCHEDULE_PLAN_KEY = pytest.StashKey[SchedulePlan]()
+GPU_BUDGET_DIR_KEY = pytest.StashKey[str]()
+
+
+def item_schedule(item: Any) -> tuple:
+    """Read the scheduling hints of a test.
+
+    Tests generated from the model matrix carry a `schedule` mark, other tests fall back to the `multigpu` mark
+    and their node id, since their deployment is only known inside the test body.
+
+    Args:
+        item (Any): The pytest item.
+
+    Returns:
+        tuple: The deployment fingerprint, GPU count and expected load seconds.
+    """
+    mark = item.get_closest_marker("schedule")
+    hints = mark.kwargs if mark else {}
+    gpus = hints.get("gpus", 2 if item.get_closest_marker("multigpu") else 1)
+    return hints.get("fingerprint") or item.nodeid, int(gpus), float(hints.get("load_seconds", DEFAULT_LOAD_SECONDS))
+
+
+def is_deployment_test(item: Any) -> bool:
+    """Tell whether a test deploys a model, that is whether it requests the deployment pool.
+
+    Args:
+        item (Any): The pytest item.
+
+    Returns:
+        bool: True if the test holds a deployment and is scheduled, False for tests running without a cluster.
+    """
+    return "deployment_pool" in getattr(item, "fixturenames", ())
+
+
+def group_items(items: list) -> list:
+    """Group tests by deployment fingerprint, keeping the collection order of the first test of each group.
+
+    Args:
+        items (list): The pytest items.
+
+    Returns:
+        list: The DeploymentGroup objects.
+    """
+    groups = {}
+    for item in items:
+        fingerprint, gpus, load_seconds = item_schedule(item)
+        group = groups.setdefault(fingerprint, DeploymentGroup(fingerprint=fingerprint, gpus=gpus,
+                                                               load_seconds=load_seconds))
+        group.items.append(item)
+    return list(groups.values())
+
+
+def plan_schedule(groups: list, cluster_gpus: int) -> tuple:
+    """Order deployment groups by simulating list scheduling on the cluster GPUs.
+
+    The longest pending group that fits in the free GPUs starts first, and when none fits the simulation
+    advances to the next group completion. Multi-GPU groups thus start as soon as enough GPUs drain, while
+    single-GPU groups backfill the remaining ones. The resulting start order is the order to run the tests in.
+
+    Args:
+        groups (list): The DeploymentGroup objects.
+        cluster_gpus (int): The GPUs available to the run, 0 for unlimited.
+
+    Returns:
+        tuple: The ordered groups and the estimated makespan in seconds.
+    """
+    capacity = cluster_gpus if cluster_gpus > 0 else max(sum(group.gpus for group in groups), 1)
+    pending = sorted(groups, key=lambda group: (group.duration, group.gpus), reverse=True)
+    running = []
+    free = capacity
+    now = 0.0
+    makespan = 0.0
+    ordered = []
+    while pending:
+        group = next((group for group in pending if min(group.gpus, capacity) <= free), None)
+        if group is None:
+            end, _, gpus = heapq.heappop(running)
+            now = end
+            free += gpus
+            continue
+        gpus = min(group.gpus, capacity)
+        if group.gpus > capacity:
+            LOGGER.warning(f"{group.items[0].nodeid} needs {group.gpus} GPUs, more than the {capacity} declared")
+        pending.remove(group)
+        ordered.append(group)
+        free -= gpus
+        heapq.heappush(running, (now + group.duration, len(ordered), gpus))
+        makespan = max(makespan, now + group.duration)
+    return ordered, makespan
+
+
+class GpuLease:
+    """GPUs held from a GpuBudget, returned by closing the slot files."""
+
+    def __init__(self, slots: list) -> None:
+        """
+        Initialize the GpuLease.
+
+        Args:
+            slots (list): The open and locked slot files.
+        """
+        self._slots = slots
+
+    def release(self) -> None:
+        """Return the GPUs to the budget. Releasing twice is a no-op."""
+        for slot in self._slots:
+            slot.close()
+        self._slots = []
+
+
+class GpuBudget:
+    """Cross-process budget of cluster GPUs, shared by all pytest-xdist workers through file locks.
+
+    Each GPU is a slot file, held with an exclusive flock for as long as a deployment uses it. A lease takes all
+    of its slots at once under a global lock, so two workers each holding part of what they need cannot block
+    each other. Slots of a crashed worker are released by the kernel when the process exits.
+    """
+
+    def __init__(self, directory: Optional[str], capacity: int) -> None:
+        """
+        Initialize the GpuBudget.
+
+        Args:
+            directory (Optional[str]): The directory holding the slot files.
+            capacity (int): The GPUs available to the run, 0 to disable the budget.
+        """
+        self.capacity = capacity if directory else 0
+        self.directory = Path(directory) if directory else None
+        if self.capacity:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def acquire(self, gpus: int, timeout: float = GPU_WAIT_TIMEOUT) -> GpuLease:
+        """Wait until the requested GPUs are free and take them.
+
+        Args:
+            gpus (int): The GPUs to take.
+            timeout (float, optional): Seconds to wait. Defaults to GPU_WAIT_TIMEOUT.
+
+        Returns:
+            GpuLease: The lease to release once the deployment is gone.
+
+        Raises:
+            TimeoutError: If the GPUs did not free up in time.
+        """
+        gpus = min(gpus, self.capacity)
+        if gpus <= 0:
+            return GpuLease([])
+        deadline = time.monotonic() + timeout
+        logged = False
+        while True:
+            slots = self._try_acquire(gpus)
+            if slots:
+                return GpuLease(slots)
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{gpus} of {self.capacity} GPUs did not free up within {timeout}s")
+            if not logged:
+                LOGGER.info(f"WAITING FOR {gpus} OF {self.capacity} GPUS TO FREE UP")
+                logged = True
+            time.sleep(GPU_POLL_INTERVAL)
+
+    def _try_acquire(self, gpus: int) -> list:
+        with open(self.directory / "lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            slots = []
+            for index in range(self.capacity):
+                slot = open(self.directory / f"slot-{index}", "a")
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    slot.close()
+                    continue
+                slots.append(slot)
+                if len(slots) == gpus:
+                    return slots
+            for slot in slots:
+                slot.close()
+            return []
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--cluster-gpus",
+        action="store",
+        type=int,
+        default=0,
+        help="GPUs available to the run, used to order tests and to cap concurrent deployments. 0 means unlimited"
+    )
+
+    parser.addoption(
+        "--no-gpu-scheduling",
+        action="store_true",
+        default=False,
+        help="Run the tests in file order instead of grouping and ordering them by deployment"
+    )
+
+
+def pytest_configure(config):
+    config.stash[SCHEDULE_PLAN_KEY] = SchedulePlan()
+    is_worker = hasattr(config, "workerinput")
+    distribution = getattr(config.option, "dist", "no")
+    if not is_worker and config.getoption("--cluster-gpus") and distribution not in ("no", "loadgroup"):
+        # A worker only releases a deployment once it ran every test of its group, which other modes spread over
+        # several workers: the deployments would hold their GPUs to the end and the budget would time out
+        raise pytest.UsageError(f"--cluster-gpus needs --dist loadgroup with pytest-xdist, not --dist {distribution}")
+    if not is_worker and config.getoption("--cluster-gpus") and GPU_BUDGET_DIR_ENV not in os.environ:
+        # Workers are spawned after configure and inherit the environment, so they all find the same slots
+        os.environ[GPU_BUDGET_DIR_ENV] = tempfile.mkdtemp(prefix="model-serving-tests-gpus-")
+        config.stash[GPU_BUDGET_DIR_KEY] = os.environ[GPU_BUDGET_DIR_ENV]
+
+
+def pytest_unconfigure(config):
+    budget_dir = config.stash.get(GPU_BUDGET_DIR_KEY, None)
+    if budget_dir:
+        shutil.rmtree(budget_dir, ignore_errors=True)
+        os.environ.pop(GPU_BUDGET_DIR_ENV, None)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(session, config, items):
+    if config.getoption("--no-gpu-scheduling"):
+        yield
+        return
+    # Before every other implementation: pytest-xdist reads the xdist_group marks in its own hook, and with
+    # `--dist loadgroup` keeps a group on one worker so its deployment is reused
+    for item in items:
+        if is_deployment_test(item):
+            item.add_marker(pytest.mark.xdist_group(name=item_schedule(item)[0]))
+    yield
+    # After every other implementation: only the tests left after -m/-k deselection and the skips are planned
+    scheduled, unscheduled = [], []
+    for item in items:
+        planned = is_deployment_test(item) and not item.get_closest_marker("skip")
+        (scheduled if planned else unscheduled).append(item)
+    if not scheduled:
+        return
+    cluster_gpus = config.getoption("--cluster-gpus")
+    groups = group_items(scheduled)
+    ordered, makespan = plan_schedule(groups, cluster_gpus)
+    items[:] = unscheduled + [item for group in ordered for item in group.items]
+    plan = config.stash[SCHEDULE_PLAN_KEY]
+    for group in ordered:
+        plan.add(group)
+    serial = sum(group.duration for group in groups)
+    LOGGER.info(f"SCHEDULED {len(scheduled)} TESTS IN {len(groups)} DEPLOYMENTS ON {cluster_gpus or 'UNLIMITED'} "
+                f"GPUS, ESTIMATED {makespan / 60:.0f} MIN (SERIAL {serial / 60:.0f} MIN)")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    item.config.stash[SCHEDULE_PLAN_KEY].finished(item.nodeid)
@@ -0,0 +1,101 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Optional
+
+import yaml
+
+from model_serving_tests.benchmark.pareto import format_table, pareto_front
+from model_serving_tests.tests.utils import YAML_LOADER
+
+LOGGER = logging.getLogger(__name__)
+
+# user_properties entry carrying one sweep result from the (possibly remote) worker to the controller
+SWEEP_PROPERTY = "engine_sweep"
+
+
+def load_sweep_grid(path: str) -> Optional[dict]:
+    """Read the engine-argument grid given with --sweep-grid.
+
+    Args:
+        path (str): The YAML file, mapping each engine argument to its candidate values. Empty for none.
+
+    Returns:
+        Optional[dict]: The grid, or None if no file was given.
+
+    Raises:
+        ValueError: If the file does not map arguments to lists of values.
+    """
+    if not path:
+        return None
+    with open(path) as file:
+        grid = yaml.load(file, Loader=YAML_LOADER)
+    if not isinstance(grid, dict) or not all(isinstance(values, list) for values in grid.values()):
+        raise ValueError(f"{path} must map each engine argument to a list of values")
+    return grid
+
+
+class SweepReport:
+    """Collect the engine-argument sweep results of every worker and rank them per model on the controller."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the SweepReport.
+
+        Args:
+            path (str): Where to write the JSON report, empty to skip it.
+        """
+        self.path = path
+        self.results = defaultdict(list)
+
+    def pytest_runtest_logreport(self, report):
+        properties = dict(report.user_properties)
+        if report.when != "call" or SWEEP_PROPERTY not in properties:
+            return
+        result = properties[SWEEP_PROPERTY]
+        self.results[result["model"]].append(result)
+
+    def as_dict(self) -> dict:
+        """Return the whole report.
+
+        Returns:
+            dict: The creation time, and for each model every result and its Pareto front.
+        """
+        return {"created": time.time(),
+                "models": {model: {"results": results, "pareto_front": pareto_front(results)}
+                           for model, results in self.results.items()}}
+
+    def pytest_sessionfinish(self, session):
+        if self.path and self.results:
+            with open(self.path, "w") as file:
+                json.dump(self.as_dict(), file, indent=2, sort_keys=True)
+            LOGGER.info(f"Engine-argument sweep written to {self.path}")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        terminalreporter.write_sep("-", "engine-argument sweep (* Pareto-optimal on throughput vs p99 latency)")
+        for model, results in sorted(self.results.items()):
+            terminalreporter.write_line(format_table(results, title=model))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--sweep-grid",
+        action="store",
+        default="",
+        help="YAML file mapping vLLM engine arguments to the values to sweep, overriding the model specs"
+    )
+    parser.addoption(
+        "--sweep-report",
+        action="store",
+        default="",
+        help="Write the engine-argument sweep results and Pareto fronts to this JSON file"
+    )
+
+
+def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        return
+    config.pluginmanager.register(SweepReport(config.getoption("--sweep-report")), "sweep_report")
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import warnings
+
+from model_serving_tests.tests.constant import BASE_DIR
+
+# Cluster and network clients that must only be imported once a test actually talks to the cluster or a model
+DEFERRED_MODULES = ["kubernetes", "ocp_resources", "aiohttp", "grpc", "requests"]
+# Collection imports may take this share of the time `import pytest` takes in the same interpreter. Wall time
+# depends on the host and its load, so going over the budget is reported as a warning, not a failure
+IMPORT_BUDGET_RATIO = float(os.environ.get("MODEL_SERVING_TESTS_IMPORT_BUDGET_RATIO", "1.0"))
+
+PROFILE_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+import pytest
+baseline_ms = (time.perf_counter() - started) * 1000
+import yaml
+modules = sys.argv[1:]
+sys.stderr.write("-- collection imports --\\n")
+started = time.perf_counter()
+for module in modules:
+    importlib.import_module(module)
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "baseline_ms": baseline_ms, "loaded": sorted(sys.modules)}))
+"""
+
+
+def collection_modules() -> list:
+    """Return the modules pytest imports to collect the suite: conftest, plugins and every test module."""
+    package_root = BASE_DIR.parent
+    test_modules = sorted(path.relative_to(package_root).with_suffix("").as_posix().replace("/", ".")
+                          for path in (BASE_DIR / "tests").glob("**/test_*.py"))
+    return ["model_serving_tests.tests.conftest", "model_serving_tests.tests.scheduler"] + test_modules
+
+
+def profile_imports(modules: list) -> tuple:
+    """Import modules in a fresh interpreter with pytest already loaded, as it is during collection.
+
+    Args:
+        modules (list): The modules to import.
+
+    Returns:
+        tuple: The import wall time in milliseconds, the wall time of `import pytest` in the same interpreter, the
+            loaded module names and the `-X importtime` report.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT, *modules],
+                            cwd=BASE_DIR.parent, capture_output=True, text=True, check=True)
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    return profile["elapsed_ms"], profile["baseline_ms"], profile["loaded"], result.stderr
+
+
+def slowest_imports(importtime_report: str, count: int = 10) -> list:
+    """Return the imports with the highest cumulative time from an `-X importtime` report.
+
+    Args:
+        importtime_report (str): The stderr of an interpreter run with `-X importtime`.
+        count (int, optional): How many imports to return. Defaults to 10.
+
+    Returns:
+        list: (cumulative microseconds, module name) pairs, slowest first.
+    """
+    entries = []
+    # Only what the collection modules pulled in, not pytest itself
+    for line in importtime_report.split("-- collection imports --")[-1].splitlines():
+        fields = line.split("|")
+        if line.startswith("import time:") and fields[1].strip().isdigit():
+            entries.append((int(fields[1]), fields[2].strip()))
+    return sorted(entries, reverse=True)[:count]
+
+
+def test_collection_import_budget() -> None:
+    """
+    Test that collecting the suite stays fast: the cluster and network clients are not imported. Importing every
+    collection module is compared with `import pytest` in the same interpreter, and a warning lists the slowest
+    imports when it takes longer than IMPORT_BUDGET_RATIO (MODEL_SERVING_TESTS_IMPORT_BUDGET_RATIO) times that.
+    """
+    elapsed_ms, baseline_ms, loaded, report = profile_imports(collection_modules())
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+    assert not eager, f"Imported at collection time, defer them to first use: {eager}"
+    budget_ms = IMPORT_BUDGET_RATIO * baseline_ms
+    if elapsed_ms > budget_ms:
+        warnings.warn(f"Collection imports took {elapsed_ms:.0f} ms, over the {budget_ms:.0f} ms budget "
+                      f"({IMPORT_BUDGET_RATIO:g}x the {baseline_ms:.0f} ms of `import pytest`). "
+                      f"Slowest: {slowest_imports(report)}")
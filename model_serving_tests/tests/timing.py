@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Generator
+
+
+class PhaseRecorder:
+    """Collect the phase timings of the running test.
+
+    Phases can be recorded from helper threads, e.g. resources created concurrently, so the recorder is shared
+    by the process rather than thread-local. Tests in one process run one at a time, so everything recorded
+    between two drains belongs to the running test. Concurrent phases overlap, their sum can exceed the wall time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty PhaseRecorder."""
+        self._lock = threading.Lock()
+        self._phases = defaultdict(float)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time to a phase of the running test.
+
+        Args:
+            name (str): The phase name.
+            seconds (float): The time spent.
+        """
+        with self._lock:
+            self._phases[name] += seconds
+
+    def drain(self) -> dict:
+        """Return the recorded phases and start over.
+
+        Returns:
+            dict: Seconds per phase name.
+        """
+        with self._lock:
+            phases, self._phases = dict(self._phases), defaultdict(float)
+        return phases
+
+
+RECORDER = PhaseRecorder()
+
+
+@contextmanager
+def timed_phase(name: str) -> Generator[None, None, None]:
+    """Time a block as a phase of the running test.
+
+    Args:
+        name (str): The phase name, e.g. "namespace" or "readiness".
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        RECORDER.add(name, time.perf_counter() - started)
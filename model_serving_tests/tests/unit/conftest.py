@@ -0,0 +1,21 @@
+from typing import Optional
+
+import pytest
+
+from model_serving_tests.benchmark.load import NS_PER_SECOND, RequestRecord
+
+
+@pytest.fixture
+def request_record():
+    """
+    Factory for the request records of a fake run, with times in seconds. A ttft of None makes a request that
+    never produced a token.
+    """
+
+    def _request_record(e2e: float = 1.0, ttft: Optional[float] = 0.1, output_tokens: int = 16, started: float = 0.0,
+                        error: Optional[str] = None) -> RequestRecord:
+        return RequestRecord(started_ns=int(started * NS_PER_SECOND),
+                             ttft_ns=int(ttft * NS_PER_SECOND) if ttft is not None else None,
+                             e2e_ns=int(e2e * NS_PER_SECOND), output_tokens=output_tokens, error=error)
+
+    return _request_record
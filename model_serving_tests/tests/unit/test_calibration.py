@@ -0,0 +1,54 @@
+import json
+import platform
+from pathlib import Path
+
+import pytest
+
+from model_serving_tests.benchmark.calibration import (HEADROOM_SHARE, calibrate, check_headroom, load_calibration,
+                                                       save_calibration)
+
+
+def _calibration(host: str) -> dict:
+    return {"host": host, "clients": {"async_http": {"requests_per_second": 1000.0, "tokens_per_second": 50000.0}}}
+
+
+@pytest.fixture
+def calibration_file(tmp_path: Path) -> Path:
+    path = tmp_path / "calibration.json"
+    save_calibration(_calibration(platform.node()), path)
+    return path
+
+
+def test_headroom_threshold(calibration_file: Path) -> None:
+    """
+    Test that a run is flagged once its request or token rate reaches HEADROOM_SHARE of the calibrated one.
+    """
+    assert HEADROOM_SHARE == 0.7
+    assert check_headroom("async_http", 690.0, 1000.0, calibration_file) is None
+    assert "70% OF ITS CALIBRATED REQUEST RATE" in check_headroom("async_http", 700.0, 1000.0, calibration_file)
+    assert "80% OF ITS TOKEN RATE" in check_headroom("async_http", 10.0, 40000.0, calibration_file)
+    assert check_headroom("grpc", 5000.0, 1e6, calibration_file) is None
+
+
+def test_other_host_calibration_is_ignored(tmp_path: Path) -> None:
+    """
+    Test that the calibration of another host, or a missing one, disables the check.
+    """
+    path = tmp_path / "calibration.json"
+    path.write_text(json.dumps(_calibration(f"not-{platform.node()}")))
+    assert load_calibration(path) is None
+    assert check_headroom("async_http", 1000.0, 50000.0, path) is None
+    assert check_headroom("async_http", 1000.0, 50000.0, tmp_path / "missing.json") is None
+
+
+def test_calibrate_skips_the_headroom_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the calibration runs do not check their own headroom, they measure the ceiling.
+    """
+    from model_serving_tests.benchmark import load
+
+    checked = []
+    monkeypatch.setattr(load, "check_headroom", lambda *args: checked.append(args))
+    calibration = calibrate(("async_http",), num_requests=8, concurrency=2, max_tokens=4)
+    assert calibration["clients"]["async_http"]["errors"] == 0
+    assert not checked
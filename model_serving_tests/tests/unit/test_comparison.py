@@ -0,0 +1,67 @@
+import random
+from typing import Callable
+
+from model_serving_tests.benchmark.comparison import compare_runs
+from model_serving_tests.benchmark.stats import block_bootstrap_change, compare_samples
+
+
+def _run(request_record: Callable, e2e: float, requests: int = 50, seed: int = 0) -> list:
+    generator = random.Random(seed)
+    records = []
+    for index in range(requests):
+        latency = e2e * (1 + generator.gauss(0, 0.02))
+        records.append(request_record(latency, ttft=latency / 10, output_tokens=32, started=index / 10))
+    return records
+
+
+def test_block_bootstrap_change() -> None:
+    """
+    Test that the block bootstrap resamples runs: one slow run widens the interval to include zero, and too few
+    runs give no interval.
+    """
+    steady = [[1.0, 1.01, 0.99]] * 4
+    low, high = block_bootstrap_change(steady, [[1.1, 1.11, 1.09]] * 4)
+    assert 0.09 < low <= high < 0.11
+    low, high = block_bootstrap_change(steady, [[0.99, 1.0, 1.01]] * 3 + [[2.0, 2.1, 2.2]])
+    assert low <= 0 < high
+    assert block_bootstrap_change(steady, [[1.1, 1.2]]) is None
+
+
+def test_compare_runs_consistent_regression(request_record) -> None:
+    """
+    Test that a latency increase seen in every round is a regression of both the per-round test and the block
+    bootstrap.
+    """
+    baseline = [_run(request_record, 1.0, seed=seed) for seed in range(6)]
+    candidate = [_run(request_record, 1.1, seed=seed + 10) for seed in range(6)]
+    comparison = compare_runs(baseline, candidate)
+    assert comparison["e2e"]["per_run_verdict"] == "regression"
+    assert comparison["e2e"]["block_ci"][0] > 0
+    assert "e2e" in comparison["regressions"] and "ttft" in comparison["regressions"]
+
+
+def test_compare_runs_slow_rounds(request_record) -> None:
+    """
+    Test that three slow rounds out of six are not a regression: the pooled requests look significantly slower,
+    but the rounds are the independent samples and three of six is within chance.
+    """
+    baseline = [_run(request_record, 1.0, seed=seed) for seed in range(6)]
+    candidate = ([_run(request_record, 1.0, seed=seed + 10) for seed in range(3)]
+                 + [_run(request_record, 1.3, seed=seed + 20) for seed in range(3)])
+    pooled = compare_samples([record.e2e for run in baseline for record in run],
+                             [record.e2e for run in candidate for record in run])
+    assert pooled["verdict"] == "regression"
+    comparison = compare_runs(baseline, candidate)
+    assert comparison["e2e"]["verdict"] == "unchanged"
+    assert not comparison["regressions"]
+
+
+def test_compare_runs_too_few_rounds(request_record) -> None:
+    """
+    Test that with three rounds per image even a large shift is reported as insufficient data, not unchanged.
+    """
+    comparison = compare_runs([_run(request_record, 1.0, seed=seed) for seed in range(3)],
+                              [_run(request_record, 2.0, seed=seed + 10) for seed in range(3)])
+    assert comparison["e2e"]["verdict"] == "insufficient data"
+    assert comparison["output_tokens_per_second"]["verdict"] == "insufficient data"
+    assert not comparison["regressions"]
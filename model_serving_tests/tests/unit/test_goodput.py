@@ -0,0 +1,81 @@
+from typing import Callable
+
+from model_serving_tests.benchmark.goodput import Slo, max_rate_for_goodput
+
+SLO = Slo(e2e=1.0)
+
+
+def _probe(threshold: float, calls: list, request_record: Callable) -> Callable[[float], list]:
+    """A server meeting the SLO for every request up to threshold requests per second and for none above."""
+    def probe(rate: float) -> list:
+        calls.append(rate)
+        e2e = 0.1 if rate <= threshold else 10.0
+        return [request_record(e2e, started=index / rate) for index in range(10)]
+    return probe
+
+
+def _bracket(result: dict) -> tuple:
+    missed = [entry["rate"] for entry in result["probes"] if entry["share"] < result["target"]]
+    return result["max_rate"], min(missed) if missed else None
+
+
+def test_rate_doubles_then_bisects(request_record) -> None:
+    """
+    Test that the rate doubles from the initial rate until a probe misses, then that bisection narrows the bracket
+    around the threshold below the precision.
+    """
+    calls = []
+    result = max_rate_for_goodput(_probe(5.3, calls, request_record), SLO, initial_rate=1.0, precision=0.05)
+    assert calls[:4] == [1.0, 2.0, 4.0, 8.0]
+    low, high = _bracket(result)
+    assert low <= 5.3 < high
+    assert high - low <= 0.05 * high
+    assert result["goodput"]["rate"] == low and result["goodput"]["share"] == 1.0
+    assert len(calls) == len(result["probes"])
+
+
+def test_rate_halves_until_met(request_record) -> None:
+    """
+    Test that the rate halves from a rate above the threshold until a probe meets the target.
+    """
+    calls = []
+    result = max_rate_for_goodput(_probe(1.3, calls, request_record), SLO, initial_rate=8.0, precision=0.01)
+    assert calls[:4] == [8.0, 4.0, 2.0, 1.0]
+    low, high = _bracket(result)
+    assert low <= 1.3 < high
+    assert high - low <= 0.01 * high
+
+
+def test_max_probes_bounds_the_search(request_record) -> None:
+    """
+    Test that the search stops after max_probes probes, keeping the highest rate met so far.
+    """
+    calls = []
+    result = max_rate_for_goodput(_probe(100.0, calls, request_record), SLO, initial_rate=1.0, max_probes=3)
+    assert calls == [1.0, 2.0, 4.0]
+    assert result["max_rate"] == 4.0
+
+
+def test_no_rate_meets_the_target(request_record) -> None:
+    """
+    Test that a server missing the SLO at every rate yields no max rate and no goodput after max_probes halvings.
+    """
+    calls = []
+    result = max_rate_for_goodput(_probe(0.0, calls, request_record), SLO, initial_rate=1.0, max_probes=4)
+    assert calls == [1.0, 0.5, 0.25, 0.125]
+    assert result["max_rate"] is None
+    assert result["goodput"] is None
+
+
+def test_slo_met(request_record) -> None:
+    """
+    Test that a request without a second token cannot miss the TPOT objective, while a missing TTFT or a failed
+    request misses the SLO.
+    """
+    slo = Slo(ttft=0.1, tpot=0.01, e2e=1.0)
+    assert slo.met(request_record(0.05, ttft=0.05, output_tokens=1))
+    assert slo.met(request_record(0.2, ttft=0.05, output_tokens=16))
+    assert not slo.met(request_record(0.9, ttft=0.05, output_tokens=16))
+    assert not slo.met(request_record(0.05, ttft=None, output_tokens=0))
+    assert not slo.met(request_record(0.05, error="timeout"))
+    assert Slo(tpot=0.01).met(request_record(0.05, ttft=None, output_tokens=0))
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import pytest
+
+
+def _pod(name: str, resource_version: str = "1") -> SimpleNamespace:
+    return SimpleNamespace(metadata=SimpleNamespace(name=name, resourceVersion=resource_version,
+                                                    deletionTimestamp=None))
+
+
+class _FlakyPods:
+    """A pod API and watch failing the first calls with a non-API error, as a reset connection does."""
+
+    def __init__(self, list_failures: int, watch_failures: int) -> None:
+        self.list_failures = list_failures
+        self.watch_failures = watch_failures
+        self.lists = 0
+        self.watches = 0
+        self.resources = SimpleNamespace(get=lambda **kwargs: self)
+
+    def get(self, **kwargs: Any) -> SimpleNamespace:
+        from urllib3.exceptions import ProtocolError
+
+        self.lists += 1
+        if self.lists <= self.list_failures:
+            raise ProtocolError("Connection broken")
+        return SimpleNamespace(items=[_pod("predictor")], metadata=SimpleNamespace(resourceVersion="1"))
+
+    def watch(self, *args: Any, **kwargs: Any) -> Iterator[dict]:
+        self.watches += 1
+        if self.watches <= self.watch_failures:
+            raise ValueError("Undecodable watch event")
+        yield {"type": "ADDED", "object": _pod("predictor-2", "2")}
+        kwargs["watcher"].stop()
+
+
+@pytest.fixture()
+def informer_factory(monkeypatch: pytest.MonkeyPatch):
+    from model_serving_tests.tests import kube_cache
+
+    monkeypatch.setattr(kube_cache, "RELIST_BACKOFF", 0.01)
+    informers = []
+
+    def _informer_factory(client: _FlakyPods) -> Any:
+        informer = kube_cache.PodInformer(client=client, namespace="ns", label_selector="app=predictor")
+        informers.append(informer)
+        return informer
+
+    yield _informer_factory
+    for informer in informers:
+        informer.stop()
+
+
+def test_informer_survives_watch_errors(informer_factory) -> None:
+    """
+    Test that list and watch failures other than API errors are retried instead of ending the informer thread.
+    """
+    client = _FlakyPods(list_failures=2, watch_failures=1)
+    informer = informer_factory(client)
+    pod = informer.wait_for(lambda pod: pod.metadata.name == "predictor-2", timeout=10)
+    assert pod is not None
+    assert informer._thread.is_alive()
+    assert client.lists >= 3
+    assert {pod.metadata.name for pod in informer.pods(timeout=10)} >= {"predictor-2"}
+
+
+def test_pods_times_out_when_never_listed(informer_factory) -> None:
+    """
+    Test that pods() raises instead of blocking forever when the initial list keeps failing.
+    """
+    informer = informer_factory(_FlakyPods(list_failures=10 ** 6, watch_failures=0))
+    with pytest.raises(TimeoutError, match="Connection broken"):
+        informer.pods(timeout=0.5)
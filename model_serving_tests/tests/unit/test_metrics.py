@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+from model_serving_tests.benchmark.metrics import (E2E_HISTOGRAM, RUNNING_REQUESTS, MetricsSample, histogram_delta,
+                                                   histogram_mean, histogram_quantile, parse_metrics)
+
+EXPOSITION = r'''# HELP vllm:e2e_request_latency_seconds Histogram of end to end request latency in seconds.
+# TYPE vllm:e2e_request_latency_seconds histogram
+vllm:e2e_request_latency_seconds_bucket{le="0.1",model_name="granite"} {bucket_0_1}
+vllm:e2e_request_latency_seconds_bucket{le="0.5",model_name="granite"} {bucket_0_5}
+vllm:e2e_request_latency_seconds_bucket{le="1.0",model_name="granite"} {bucket_1_0}
+vllm:e2e_request_latency_seconds_bucket{le="+Inf",model_name="granite"} {count}
+vllm:e2e_request_latency_seconds_sum{model_name="granite"} {total}
+vllm:e2e_request_latency_seconds_count{model_name="granite"} {count}
+vllm:num_requests_running{model_name="granite"} 4.0 1700000000000
+vllm:num_requests_running{model_name="llama"} 2.0
+vllm:num_requests_waiting{model_name="a \"quoted\" name"} 1.0
+vllm:broken{model_name="granite"} not-a-number
+# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+process_cpu_seconds_total 12.5
+'''
+
+
+def _sample(bucket_0_1: float, bucket_0_5: float, bucket_1_0: float, count: float, total: float) -> MetricsSample:
+    text = EXPOSITION
+    for name, value in (("bucket_0_1", bucket_0_1), ("bucket_0_5", bucket_0_5), ("bucket_1_0", bucket_1_0),
+                        ("count", count), ("total", total)):
+        text = text.replace(f"{{{name}}}", str(value))
+    return MetricsSample(timestamp=0.0, values=parse_metrics(text))
+
+
+def test_parse_metrics() -> None:
+    """
+    Test that labels are parsed, escaped quotes included, that timestamps, comments, malformed lines and metrics
+    outside the prefixes are skipped, and that no prefix keeps everything.
+    """
+    values = _sample(1.0, 2.0, 4.0, 5.0, 3.0).values
+    assert values[(RUNNING_REQUESTS, (("model_name", "granite"),))] == 4.0
+    assert values[("vllm:num_requests_waiting", (("model_name", r'a \"quoted\" name'),))] == 1.0
+    assert values[(f"{E2E_HISTOGRAM}_bucket", (("le", "+Inf"), ("model_name", "granite")))] == 5.0
+    assert not any(name in ("vllm:broken", "process_cpu_seconds_total") for name, _ in values)
+    assert len(values) == 9
+    assert parse_metrics(EXPOSITION, prefixes=())[("process_cpu_seconds_total", ())] == 12.5
+
+
+def test_sample_sums_matching_series() -> None:
+    """
+    Test that a value is summed over the series matching the labels, and that histogram buckets are sorted with
+    +Inf last.
+    """
+    sample = _sample(1.0, 2.0, 4.0, 5.0, 3.0)
+    assert sample.get(RUNNING_REQUESTS) == 6.0
+    assert sample.get(RUNNING_REQUESTS, model_name="llama") == 2.0
+    assert sample.get(RUNNING_REQUESTS, model_name="mistral") is None
+    assert sample.histogram(E2E_HISTOGRAM, model_name="granite") == [(0.1, 1.0), (0.5, 2.0), (1.0, 4.0),
+                                                                    (math.inf, 5.0)]
+
+
+def test_histogram_delta_and_quantiles() -> None:
+    """
+    Test that the counters of two scrapes are subtracted into the histogram of the requests in between, and that
+    its quantiles interpolate within a bucket and stop at the last finite bound in the +Inf bucket.
+    """
+    before, after = _sample(1.0, 2.0, 4.0, 5.0, 3.0), _sample(3.0, 8.0, 12.0, 15.0, 9.0)
+    buckets = histogram_delta(before.histogram(E2E_HISTOGRAM), after.histogram(E2E_HISTOGRAM))
+    assert buckets == [(0.1, 2.0), (0.5, 6.0), (1.0, 8.0), (math.inf, 10.0)]
+    # Rank 1 of 2 in [0, 0.1], rank 5 is the 3rd of 4 in (0.1, 0.5], rank 9 is past the last finite bound
+    assert histogram_quantile(buckets, 0.1) == pytest.approx(0.05)
+    assert histogram_quantile(buckets, 0.5) == pytest.approx(0.4)
+    assert histogram_quantile(buckets, 0.9) == 1.0
+    assert histogram_mean(before, after, E2E_HISTOGRAM) == pytest.approx(0.6)
+    unchanged = histogram_delta(after.histogram(E2E_HISTOGRAM), after.histogram(E2E_HISTOGRAM))
+    assert histogram_quantile(unchanged, 0.5) is None
+    assert histogram_mean(after, after, E2E_HISTOGRAM) is None
+    assert histogram_quantile([], 0.5) is None
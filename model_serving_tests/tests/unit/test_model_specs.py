@@ -0,0 +1,47 @@
+from model_serving_tests.tests.constant import BASE_DIR
+from model_serving_tests.tests.model_matrix import generate_model_cases, load_model_specs
+
+SNAPSHOT_DIR = BASE_DIR / "tests" / "matrix" / "__snapshots__" / "test_model_matrix"
+SPEC = {
+    "deployment_types": ["RawDeployment", "Serverless"],
+    "gpu_counts": [1, 2],
+    "marks": ["granite4k"],
+    "http_completion_count": 1,
+    "variants": {"default": {}, "seq-len": {"new_args": ["--max-model-len=4"], "xfail": "too short"}},
+    "exclude": [{"deployment_type": "Serverless", "gpu_count": 2}],
+    "completion_queries": [{"text": "a"}, {"text": "b"}],
+    "chat_queries": [[{"role": "user", "content": "c"}]],
+}
+
+
+def test_generate_model_cases() -> None:
+    """
+    Test that exclusions drop the matching combinations and that variant and model options reach the cases.
+    """
+    cases = {case.id: case for case in generate_model_cases({"model": SPEC})}
+    assert sorted(cases) == ["model-RawDeployment-default-1gpu", "model-RawDeployment-default-2gpu",
+                             "model-RawDeployment-seq-len-1gpu", "model-RawDeployment-seq-len-2gpu",
+                             "model-Serverless-default-1gpu", "model-Serverless-seq-len-1gpu"]
+    seq_len = cases["model-RawDeployment-seq-len-1gpu"]
+    assert seq_len.new_args == ["--max-model-len=4"]
+    assert [mark.name for mark in seq_len.validation_marks] == ["smoke", "granite4k", "xfail"]
+    assert [mark.name for mark in cases["model-RawDeployment-default-2gpu"].validation_marks] == ["granite4k"]
+    assert cases["model-RawDeployment-default-1gpu"].http_completion_queries == [{"text": "a"}]
+    assert cases["model-Serverless-default-1gpu"].http_completion_queries == [{"text": "a"}]
+
+
+def test_every_matrix_case_has_snapshots() -> None:
+    """
+    Test that every matrix case expected to pass has a snapshot for each response it compares, so a default run
+    does not need --snapshot-update.
+    """
+    missing = []
+    for case in generate_model_cases(load_model_specs()):
+        if case.xfail:
+            continue
+        # gRPC tokens, model info and stream, then HTTP completions and chats; Serverless only has the HTTP ones
+        count = 5 if case.deployment_type.lower() == "rawdeployment" else 2
+        names = [f"test_model_matrix[{case.id}].json"] + [f"test_model_matrix[{case.id}].{index}.json"
+                                                          for index in range(1, count)]
+        missing += [name for name in names if not (SNAPSHOT_DIR / name).exists()]
+    assert not missing, f"Matrix cases without snapshots, run them once with --snapshot-update: {missing}"
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from model_serving_tests.benchmark.pareto import expand_grid, format_table, pareto_front
+
+
+def _result(throughput: float, p99: Optional[float] = None, errors: int = 0, args: Optional[list] = None) -> dict:
+    return {"output_tokens_per_second": throughput, "p99_e2e": p99, "p99_ttft": None, "errors": errors,
+            "args": args or []}
+
+
+def test_expand_grid() -> None:
+    """
+    Test that every combination is expanded in grid order, True adding the bare flag and False or None leaving
+    the argument to the server default.
+    """
+    grid = {"--max-num-seqs": [64, 256], "--enable-chunked-prefill": [True, False], "--kv-cache-dtype": [None]}
+    assert expand_grid(grid) == [
+        ["--max-num-seqs=64", "--enable-chunked-prefill"],
+        ["--max-num-seqs=64"],
+        ["--max-num-seqs=256", "--enable-chunked-prefill"],
+        ["--max-num-seqs=256"],
+    ]
+    assert expand_grid({}) == [[]]
+    assert expand_grid({"--max-num-seqs": []}) == []
+
+
+def test_pareto_front() -> None:
+    """
+    Test that dominated, errored and p99-less results are left out, that ties are all kept, and that the front
+    is sorted by throughput.
+    """
+    fast = _result(200.0, 2.0)
+    tie = _result(200.0, 2.0)
+    quick = _result(100.0, 1.0)
+    dominated = _result(150.0, 2.5)
+    same_throughput_slower = _result(200.0, 3.0)
+    errored = _result(500.0, 0.5, errors=1)
+    no_p99 = _result(400.0, None)
+    front = pareto_front([quick, dominated, fast, errored, no_p99, tie, same_throughput_slower])
+    assert [id(result) for result in front] == [id(fast), id(tie), id(quick)]
+    assert pareto_front([errored, no_p99]) == []
+
+
+def test_format_table_ranks_by_throughput() -> None:
+    """
+    Test that the table ranks every result by throughput alone, starring the Pareto-optimal ones wherever they
+    rank, and prints a missing p99 as nan.
+    """
+    results = [_result(100.0, 1.0, args=["--max-num-seqs=64"]), _result(150.0, 2.5, args=["--max-num-seqs=128"]),
+               _result(200.0, 2.0), _result(400.0, None, args=["--max-num-seqs=512"])]
+    rows = format_table(results, title="model").splitlines()
+    assert rows[0] == "model"
+    ranked = [(row.split()[0], "*" in row, row.split()[-1]) for row in rows[2:]]
+    assert ranked == [("1", False, "--max-num-seqs=512"), ("2", True, "(defaults)"),
+                      ("3", False, "--max-num-seqs=128"), ("4", True, "--max-num-seqs=64")]
+    assert "nan" in rows[2]
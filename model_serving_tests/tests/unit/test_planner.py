@@ -0,0 +1,61 @@
+from typing import Optional
+
+import pytest
+
+from model_serving_tests.benchmark.planner import plan_capacity
+
+COSTS = {"A100": 4.0, "L4": 1.0}
+
+
+def _result(kind: str, model: str, accelerator: str, gpu_count: int = 1, created: float = 1.0, **values) -> dict:
+    return {"kind": kind, "model": model, "deployment_type": "RawDeployment", "accelerator": accelerator,
+            "gpu_count": gpu_count, "created": created, **values}
+
+
+RESULTS = [
+    # The capacity search of granite on A100 supersedes the older one listed after it and the serving throughput
+    _result("goodput_capacity", "granite", "A100", created=2.0, max_rate=10.0,
+            goodput_output_tokens_per_second=1000.0),
+    _result("goodput_capacity", "granite", "A100", created=1.0, max_rate=2.0, goodput_output_tokens_per_second=200.0),
+    _result("serving", "granite", "A100", output_tokens_per_second=5000.0),
+    _result("serving", "granite", "L4", gpu_count=2, goodput_output_tokens_per_second=300.0,
+            output_tokens_per_second=450.0),
+    _result("serving", "llama", "L4", goodput_output_tokens_per_second=None, output_tokens_per_second=2000.0),
+    _result("serving", "llama", "H100", output_tokens_per_second=3000.0),
+]
+
+
+def _plan(model: str, accelerator: str, gpu_count: int, tokens_per_second: float, max_rate: Optional[float] = None,
+          replicas: Optional[int] = None, hourly_cost: Optional[float] = None,
+          cost_per_million_tokens: Optional[float] = None) -> dict:
+    return {"model": model, "deployment_type": "RawDeployment", "accelerator": accelerator, "gpu_count": gpu_count,
+            "max_rate": max_rate, "output_tokens_per_second": tokens_per_second, "replicas": replicas,
+            "gpus": replicas * gpu_count if replicas else None, "hourly_cost": hourly_cost,
+            "cost_per_million_tokens": cost_per_million_tokens}
+
+
+def test_plan_capacity() -> None:
+    """
+    Test the plans, cheapest per token first: the throughput comes from the latest capacity search, else from the
+    serving goodput, else from the serving throughput, replicas are rounded up, and an accelerator without a price
+    gets no cost and goes last.
+    """
+    assert plan_capacity(RESULTS, COSTS, target_rps=25.0) == [
+        # 1 GPU at $1/hour over 2000 tokens/s
+        _plan("llama", "L4", 1, 2000.0, cost_per_million_tokens=pytest.approx(1e6 / (2000 * 3600))),
+        # ceil(25 / 10) = 3 replicas of 1 GPU at $4/hour, over 1000 tokens/s
+        _plan("granite", "A100", 1, 1000.0, max_rate=10.0, replicas=3, hourly_cost=12.0,
+              cost_per_million_tokens=pytest.approx(4e6 / (1000 * 3600))),
+        # 2 GPUs at $1/hour over 300 tokens/s
+        _plan("granite", "L4", 2, 300.0, cost_per_million_tokens=pytest.approx(2e6 / (300 * 3600))),
+        _plan("llama", "H100", 1, 3000.0),
+    ]
+
+
+@pytest.mark.parametrize("target_rps, replicas", [(20.0, 2), (20.5, 3), (0.1, 1)])
+def test_replica_ceiling(target_rps: float, replicas: int) -> None:
+    """
+    Test that the replica count is the target rate over the highest rate meeting the SLO, rounded up.
+    """
+    (plan,) = plan_capacity(RESULTS[:1], COSTS, target_rps)
+    assert (plan["replicas"], plan["gpus"], plan["hourly_cost"]) == (replicas, replicas, 4.0 * replicas)
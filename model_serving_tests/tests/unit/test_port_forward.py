@@ -0,0 +1,113 @@
+import socket
+import socketserver
+import threading
+from types import SimpleNamespace
+from typing import Callable, Iterator
+
+import pytest
+
+
+class _EchoHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while data := self.request.recv(65536):
+            self.request.sendall(data)
+
+
+class _EchoForward:
+    """Stands in for the portforward websocket: its socket is a plain connection to a local echo server."""
+
+    def __init__(self, address: tuple) -> None:
+        self.connected = True
+        self._socket = socket.create_connection(address)
+
+    def socket(self, port: int) -> socket.socket:
+        return self._socket
+
+    def close(self) -> None:
+        self.connected = False
+
+
+@pytest.fixture()
+def echo_server() -> Iterator[tuple]:
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _EchoHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def fake_portforward(monkeypatch: pytest.MonkeyPatch, echo_server: tuple) -> Callable[[int], list]:
+    """Replace the Kubernetes portforward with tunnels to the echo server, failing the first attempts."""
+    from model_serving_tests.tests import port_forward
+
+    def _fake_portforward(failures: int) -> list:
+        attempts = []
+
+        def _portforward(*args, **kwargs) -> _EchoForward:
+            attempts.append(args)
+            if len(attempts) <= failures:
+                raise OSError("tunnel refused")
+            return _EchoForward(echo_server)
+
+        monkeypatch.setattr(port_forward, "portforward", _portforward)
+        return attempts
+
+    return _fake_portforward
+
+
+def _forward(**kwargs):
+    from model_serving_tests.tests.port_forward import PortForward
+
+    return PortForward(client=SimpleNamespace(client=None), namespace="ns", pod_name="predictor", remote_port=8080,
+                       retry_delay=0, **kwargs)
+
+
+def test_relay_round_trip(fake_portforward: Callable[[int], list]) -> None:
+    """
+    Test that bytes sent to the local port come back through the tunnel and are counted in both directions.
+    """
+    fake_portforward(0)
+    payload = b"ping" * 50000
+    with _forward() as forward:
+        with socket.create_connection(("localhost", forward.local_port), timeout=10) as connection:
+            connection.sendall(payload)
+            connection.shutdown(socket.SHUT_WR)
+            received = b""
+            while data := connection.recv(65536):
+                received += data
+    stats = forward.stats()
+    assert received == payload
+    assert stats["bytes_sent"] == stats["bytes_received"] == len(payload)
+    assert stats["connections"] == 1
+    assert stats["tunnel_failures"] == stats["drops"] == 0
+
+
+def test_tunnel_failures_are_retried(fake_portforward: Callable[[int], list]) -> None:
+    """
+    Test that failed attempts to open a tunnel are retried and counted as failures, not connections.
+    """
+    attempts = fake_portforward(2)
+    with _forward(max_retries=3) as forward:
+        stats = forward.stats()
+    assert len(attempts) == 3
+    assert stats["tunnel_failures"] == 2
+    assert stats["connections"] == 0
+
+
+def test_not_ready_without_tunnel(fake_portforward: Callable[[int], list]) -> None:
+    """
+    Test that readiness fails once every attempt to open a tunnel failed.
+    """
+    from model_serving_tests.tests.port_forward import PortForwardError
+
+    fake_portforward(10)
+    forward = _forward(max_retries=2).start()
+    try:
+        with pytest.raises(PortForwardError):
+            forward.wait_ready(timeout=10)
+    finally:
+        forward.stop()
+    assert forward.tunnel_failures == 2
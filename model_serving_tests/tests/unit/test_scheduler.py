@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+CONFTEST = '''
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from model_serving_tests.tests.scheduler import SCHEDULE_PLAN_KEY
+
+pytest_plugins = ["model_serving_tests.tests.scheduler"]
+
+
+@pytest.fixture
+def deployment_pool():
+    return None
+
+
+def pytest_collection_finish(session):
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "controller")
+    plan = session.config.stash[SCHEDULE_PLAN_KEY]
+    Path(os.environ["SCHEDULE_OUT"], f"plan-{worker}.json").write_text(json.dumps(plan.remaining))
+'''
+
+TESTS = '''
+import os
+from pathlib import Path
+
+import pytest
+
+
+def _record(request):
+    name = request.node.nodeid.split("::")[-1].replace("/", "_")
+    Path(os.environ["SCHEDULE_OUT"], f"ran-{name}").write_text(os.environ["PYTEST_XDIST_WORKER"])
+
+
+@pytest.mark.parametrize("fingerprint", [
+    pytest.param(fingerprint, id=f"{fingerprint}{index}", marks=pytest.mark.schedule(fingerprint=fingerprint))
+    for fingerprint in ("first", "second") for index in range(4)
+])
+def test_deploys(deployment_pool, request, fingerprint):
+    _record(request)
+
+
+@pytest.mark.skip(reason="not planned")
+@pytest.mark.schedule(fingerprint="skipped")
+def test_skipped(deployment_pool):
+    pass
+
+
+def test_offline(request):
+    _record(request)
+'''
+
+
+def _run_project(tmp_path: Path, *args: str) -> tuple:
+    pytest.importorskip("xdist")
+    project, out = tmp_path / "project", tmp_path / "out"
+    project.mkdir()
+    out.mkdir()
+    (project / "conftest.py").write_text(CONFTEST)
+    (project / "test_grouping.py").write_text(TESTS)
+    env = {**os.environ, "SCHEDULE_OUT": str(out), "PYTHONPATH": str(REPO_ROOT)}
+    result = subprocess.run([sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "-q", *args, str(project)],
+                            cwd=project, env=env, capture_output=True, text=True, timeout=120)
+    return result, out
+
+
+def test_groups_are_assigned_before_xdist_distributes(tmp_path: Path) -> None:
+    """
+    Test that under `-n 2 --dist loadgroup` every test of a deployment group runs on one worker, and that tests
+    without a deployment and skipped tests are left out of the groups and of the plan.
+    """
+    result, out = _run_project(tmp_path, "-n", "2", "--dist", "loadgroup")
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    ran = {path.name[len("ran-"):]: path.read_text() for path in out.glob("ran-*")}
+    assert ran.keys() == {"test_offline"} | {f"test_deploys[{name}{index}]@{name}" for name in ("first", "second")
+                                            for index in range(4)}
+    for name in ("first", "second"):
+        assert len({worker for test, worker in ran.items() if test.endswith(f"@{name}")}) == 1
+
+    plans = [json.loads(path.read_text()) for path in out.glob("plan-gw*.json")]
+    assert plans and all(plan == {"first": 4, "second": 4} for plan in plans)
+
+
+def test_gpu_budget_requires_loadgroup(tmp_path: Path) -> None:
+    """
+    Test that a GPU budget under plain `-n 2`, where a group's tests spread over workers that never see it finish
+    and so never release its deployment, is rejected before any test runs.
+    """
+    result, out = _run_project(tmp_path, "-n", "2", "--cluster-gpus=2")
+    assert result.returncode == pytest.ExitCode.USAGE_ERROR, result.stdout + result.stderr
+    assert "--dist loadgroup" in result.stderr
+    assert not list(out.glob("ran-*"))
@@ -0,0 +1,36 @@
+from model_serving_tests.benchmark.shm import smallest_adequate_shm
+
+
+def _result(shm_size: str, throughput: float = 100.0, deployed: bool = True, errors: int = 0,
+            backend: str = "mp") -> dict:
+    return {"backend": backend, "shm_size": shm_size, "deployed": deployed, "errors": errors if deployed else None,
+            "output_tokens_per_second": throughput if deployed else 0.0, "load_seconds": 60.0 if deployed else None}
+
+
+def test_smallest_adequate_shm_ordering() -> None:
+    """
+    Test that sizes are ordered by quantity whatever their units and listing order, and that the scan stops at
+    the first size that is too slow or fails, even when a smaller one runs well.
+    """
+    results = [_result("256Mi", 100.0), _result("2Gi", 100.0), _result("1Gi", 97.0), _result("512Mi", 90.0),
+               _result("8Gi", 101.0, backend="ray"), _result("4Gi", 80.0, backend="ray"),
+               _result("1Gi", 100.0, backend="ray")]
+    recommendations = smallest_adequate_shm(results)
+    assert recommendations["mp"] == {"shm_size": "1Gi", "reference_output_tokens_per_second": 100.0,
+                                     "load_seconds": 60.0}
+    assert recommendations["ray"]["shm_size"] == "8Gi"
+
+
+def test_largest_size_failing_to_deploy_is_skipped() -> None:
+    """
+    Test that sizes larger than the largest clean one, e.g. too big for the node, do not hide the smaller sizes
+    that ran cleanly, and that a backend where nothing ran cleanly gets no size.
+    """
+    results = [_result("16Gi", deployed=False), _result("8Gi", errors=3), _result("2Gi", 100.0),
+               _result("1Gi", 98.0), _result("512Mi", deployed=False),
+               _result("2Gi", deployed=False, backend="ray"), _result("1Gi", errors=1, backend="ray")]
+    recommendations = smallest_adequate_shm(results)
+    assert recommendations["mp"]["shm_size"] == "1Gi"
+    assert recommendations["mp"]["reference_output_tokens_per_second"] == 100.0
+    assert recommendations["ray"] == {"shm_size": None, "reference_output_tokens_per_second": None,
+                                      "load_seconds": None}
@@ -0,0 +1,41 @@
+from pathlib import Path
+import pytest
+
+from model_serving_tests.benchmark.sink import JsonlSink, read_records, summarize_jsonl
+
+
+def test_sink_holds_only_its_own_records(tmp_path: Path, request_record) -> None:
+    """
+    Test that a sink reopened on the file of an earlier session replaces its records, so the summary only covers
+    the current run.
+    """
+    path = str(tmp_path / "soak.jsonl")
+    with JsonlSink(path) as sink:
+        for _ in range(5):
+            sink.write(request_record(output_tokens=10))
+    with JsonlSink(path) as sink:
+        sink.write(request_record(output_tokens=4))
+        sink.write(request_record(output_tokens=0, error="timeout"))
+    assert [record.output_tokens for record in read_records(path)] == [4, 0]
+    summary = summarize_jsonl(path)
+    assert (summary["requests"], summary["errors"]) == (2, 1)
+
+
+def test_run_load_counts_tokens_through_a_sink(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that run_load with a sink hands every record to it and still checks the headroom with the output tokens
+    of the run, not zero.
+    """
+    from model_serving_tests.benchmark import load
+    from model_serving_tests.benchmark.standin import StandInServer
+
+    checked = []
+    monkeypatch.setattr(load, "check_headroom", lambda client, rate, tokens: checked.append((rate, tokens)))
+    received = []
+    with StandInServer("http") as address:
+        records = load.run_load(address, "stand-in", ["prompt"], num_requests=8, concurrency=4, max_tokens=16,
+                                sink=received.append)
+    assert records == []
+    assert len(received) == 8 and all(record.ok for record in received)
+    (rate, tokens), = checked
+    assert tokens == pytest.approx(rate * 16)
@@ -0,0 +1,116 @@
+import itertools
+import json
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+from model_serving_tests.benchmark.regressions import compare_result_sets
+from model_serving_tests.benchmark.stats import (_ranks, bootstrap_change, compare_samples, mann_whitney_u,
+                                                smallest_p_value)
+
+BENCHMARK = {"kind": "serving", "model": "granite", "deployment_type": "RawDeployment", "accelerator": "A100",
+             "gpu_count": 1}
+
+
+def _samples(count: int, shift: float = 0.0, seed: int = 0) -> list:
+    generator = random.Random(seed)
+    return [100.0 + shift + generator.gauss(0, 1) for _ in range(count)]
+
+
+def _brute_force_p_value(baseline: list, candidate: list) -> float:
+    ranks = _ranks(candidate + baseline)
+    n1, n = len(candidate), len(candidate) + len(baseline)
+    mean = n1 * (n + 1) / 2
+    observed = abs(sum(ranks[:n1]) - mean)
+    extreme = sum(abs(sum(ranks[index] for index in chosen) - mean) >= observed - 1e-9
+                  for chosen in itertools.combinations(range(n), n1))
+    return extreme / math.comb(n, n1)
+
+
+def test_mann_whitney_u_exact() -> None:
+    """
+    Test that small samples get the exact p-value, equal to enumerating every assignment of the ranks, ties
+    included, and that fully separated samples reach the smallest possible p-value.
+    """
+    result = mann_whitney_u([1, 2, 3, 4], [5, 6, 7, 8])
+    assert result == {"u": 16.0, "p_value": pytest.approx(2 / 70), "exact": True}
+    assert smallest_p_value(4, 4) == pytest.approx(2 / 70)
+    baseline, candidate = [1, 2, 2, 3, 5, 5], [2, 3, 3, 6, 7]
+    assert mann_whitney_u(baseline, candidate)["p_value"] == pytest.approx(_brute_force_p_value(baseline, candidate))
+    assert mann_whitney_u([3, 3, 3], [3, 3])["p_value"] == 1.0
+    assert mann_whitney_u([], [1.0]) == {"u": None, "p_value": 1.0, "exact": False}
+
+
+def test_mann_whitney_u_normal_approximation() -> None:
+    """
+    Test that large samples use the normal approximation, which finds a clear shift and none between samples of
+    one distribution.
+    """
+    shifted = mann_whitney_u(_samples(40), _samples(40, shift=2.0, seed=1))
+    assert not shifted["exact"] and shifted["p_value"] < 1e-6
+    assert mann_whitney_u(_samples(40), _samples(40, seed=1))["p_value"] > 0.05
+
+
+def test_bootstrap_change() -> None:
+    """
+    Test that the bootstrap interval covers the true relative change, and that no interval is reported for a
+    sample of fewer than two observations or a zero baseline.
+    """
+    low, high = bootstrap_change(_samples(30), _samples(30, shift=10.0, seed=1))
+    assert low < 0.1 < high and low > 0
+    assert bootstrap_change([100.0], [110.0, 111.0]) is None
+    assert bootstrap_change([100.0, 101.0], [110.0]) is None
+    assert bootstrap_change([0.0, 0.0], [1.0, 2.0]) is None
+
+
+@pytest.mark.parametrize("count, shift, higher_is_better, verdict", [
+    (8, 5.0, False, "regression"),
+    (8, 5.0, True, "improvement"),
+    (8, 0.0, False, "unchanged"),
+    (3, 50.0, False, "insufficient data"),
+    (1, 50.0, False, "insufficient data"),
+])
+def test_compare_samples(count: int, shift: float, higher_is_better: bool, verdict: str) -> None:
+    """
+    Test the verdicts, in particular that a large shift measured over too few runs to be significant is reported
+    as insufficient data rather than unchanged.
+    """
+    result = compare_samples(_samples(count), _samples(count, shift=shift, seed=1), higher_is_better=higher_is_better)
+    assert result["verdict"] == verdict
+    assert (result["ci"] is None) == (count < 2)
+
+
+def test_compare_result_sets() -> None:
+    """
+    Test that repeated runs are compared metric by metric with regressions first, and that metrics with too few
+    runs are flagged as insufficient data.
+    """
+    baseline = [{**BENCHMARK, "output_tokens_per_second": value, "e2e_p99": 2.0 + index / 100}
+                for index, value in enumerate(_samples(8))]
+    candidate = [{**BENCHMARK, "output_tokens_per_second": value, "e2e_p99": 2.5 + index / 100}
+                 for index, value in enumerate(_samples(8, seed=1))]
+    rows = compare_result_sets(baseline, candidate)
+    assert [(row["metric"], row["verdict"]) for row in rows] == [("e2e_p99", "regression"),
+                                                                 ("output_tokens_per_second", "unchanged")]
+    assert rows[0]["model"] == "granite" and rows[0]["baseline_n"] == 8
+    rows = compare_result_sets(baseline[:3], candidate[:3])
+    assert {row["verdict"] for row in rows} == {"insufficient data"}
+
+
+def test_cli_compare_exit_codes(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """
+    Test that the compare command exits with 1 on a regression and with 2 and a warning on insufficient data.
+    """
+    from model_serving_tests.cli import main
+
+    def _write(name: str, values: list) -> str:
+        path = tmp_path / name
+        path.write_text(json.dumps({"results": [{**BENCHMARK, "e2e_p99": value} for value in values]}))
+        return str(path)
+
+    assert main(["compare", _write("base.json", _samples(8)), _write("regressed.json", _samples(8, 5.0, 1))]) == 1
+    assert main(["compare", _write("few.json", _samples(3)), _write("few-after.json", _samples(3, 5.0, 1))]) == 2
+    assert "too few runs" in capsys.readouterr().err
+    assert main(["compare", _write("same.json", _samples(8)), _write("same-after.json", _samples(8))]) == 0
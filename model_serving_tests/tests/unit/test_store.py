@@ -0,0 +1,84 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from model_serving_tests.benchmark import store
+from model_serving_tests.benchmark.store import ResultStore
+
+RUN = {"kind": "serving", "model": "granite", "deployment_type": "RawDeployment", "gpu_count": 1,
+       "accelerator": "A100", "config_hash": "abc", "image": "sha256:1"}
+
+
+def test_add_run_batches_and_stores_wall_clock_times(tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+                                                     request_record) -> None:
+    """
+    Test that every request is stored when the records span several batches, the last one partial, and that the
+    monotonic start times are stored as wall-clock times.
+    """
+    monkeypatch.setattr(store.time, "time", lambda: 1000.0)
+    monkeypatch.setattr(store.time, "monotonic", lambda: 10.0)
+    records = (request_record(1.0 + index, started=2.0 + index) for index in range(10))
+    with ResultStore(str(tmp_path / "results.db"), batch_size=3) as results:
+        run_id = results.add_run({**RUN, "output_tokens_per_second": 12.5}, records)
+        exact_id = results.add_run(RUN, [request_record() for _ in range(3)])
+        stored = list(results.requests(run_id))
+        assert [row[0] for row in stored] == [992.0 + index for index in range(10)]
+        assert [row[2] for row in stored] == [1.0 + index for index in range(10)]
+        assert len(list(results.requests(exact_id))) == 3
+        first, second = results.runs()
+    assert (first["id"], first["created"], first["model"], first["image"]) == (run_id, 1000.0, "granite", "sha256:1")
+    assert first["summary"] == {"output_tokens_per_second": 12.5}
+    assert second["summary"] == {}
+
+
+def test_aggregate(tmp_path: Path, request_record) -> None:
+    """
+    Test that a run is summarized over its successful requests, its duration spanning the first start to the
+    last end, that filters select the runs, and that a request without a first token has an end-to-end latency
+    but no TTFT.
+    """
+    with ResultStore(str(tmp_path / "results.db")) as results:
+        run_id = results.add_run(RUN, [request_record(1.0, ttft=0.1, output_tokens=10, started=0.0),
+                                       request_record(2.0, ttft=0.2, output_tokens=20, started=1.0),
+                                       request_record(0.5, output_tokens=5, started=2.0, error="timeout")])
+        results.add_run({**RUN, "model": "llama"}, [request_record(ttft=None, output_tokens=0)])
+        (summary,) = results.aggregate(model="granite")
+        assert len(results.aggregate()) == 2
+        assert results.quantile("e2e", 50, model="llama") == 1.0
+        assert results.quantile("ttft", 50, model="llama") is None
+    assert summary == {"run_id": run_id, "model": "granite", "config_hash": "abc", "requests": 3, "errors": 1,
+                       "output_tokens": 30, "mean_ttft": pytest.approx(0.15), "mean_e2e": pytest.approx(1.5),
+                       "duration_seconds": pytest.approx(3.0), "output_tokens_per_second": pytest.approx(10.0)}
+
+
+@pytest.mark.parametrize("q, expected", [(0, 1.0), (10, 1.0), (11, 2.0), (50, 5.0), (90, 9.0), (91, 10.0),
+                                         (99, 10.0), (100, 10.0)])
+def test_quantile_nearest_rank(tmp_path: Path, request_record, q: float, expected: float) -> None:
+    """
+    Test the nearest-rank percentile of ten latencies: the smallest value ranked at or above q percent of them,
+    leaving out failed requests.
+    """
+    latencies = [1.0 + index for index in range(10)]
+    random.Random(0).shuffle(latencies)
+    records = [request_record(latency, ttft=latency / 10) for latency in latencies]
+    records.append(request_record(0.5, ttft=0.05, error="timeout"))
+    with ResultStore(str(tmp_path / "results.db")) as results:
+        results.add_run(RUN, records)
+        assert results.quantile("e2e", q) == expected
+        assert results.quantile("ttft", q, model="granite") == pytest.approx(expected / 10)
+        assert results.quantile("e2e", q, model="llama") is None
+
+
+def test_unknown_columns_are_rejected(tmp_path: Path) -> None:
+    """
+    Test that filters on a column that is not a run column, and quantiles of a column that is not a latency, are
+    rejected rather than interpolated into the SQL.
+    """
+    with ResultStore(str(tmp_path / "results.db")) as results:
+        with pytest.raises(ValueError, match="Cannot filter runs on summary"):
+            results.runs(summary="{}")
+        with pytest.raises(ValueError, match="Cannot filter runs on id"):
+            results.aggregate(id=1)
+        with pytest.raises(ValueError, match="Cannot compute quantiles of output_tokens"):
+            results.quantile("output_tokens", 50)
@@ -0,0 +1,116 @@
+import math
+import random
+import statistics
+from types import SimpleNamespace
+
+import pytest
+
+from model_serving_tests.benchmark import soak
+from model_serving_tests.benchmark.soak import SoakMonitor
+from model_serving_tests.benchmark.trend import OnlineTrend
+
+WINDOW_SECONDS = 60.0
+
+
+def _trend(points: list) -> OnlineTrend:
+    trend = OnlineTrend("value")
+    for x, y in points:
+        trend.add(x, y)
+    return trend
+
+
+def _reference_fit(points: list) -> tuple:
+    """The two-pass least-squares slope and its t statistic."""
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    slope, intercept = statistics.linear_regression(xs, ys)
+    residuals = sum((y - intercept - slope * x) ** 2 for x, y in points) / (len(points) - 2)
+    mean_x = statistics.fmean(xs)
+    return slope, slope / math.sqrt(residuals / sum((x - mean_x) ** 2 for x in xs))
+
+
+class _NoMetrics:
+    def scrape(self) -> None:
+        return None
+
+
+def _soak(monkeypatch: pytest.MonkeyPatch, memory: list, e2e: list, restarts: int = 0) -> SoakMonitor:
+    """Feed one window per WINDOW_SECONDS of the given memory and median latency series to a SoakMonitor."""
+    clock = [0.0]
+    monkeypatch.setattr(soak, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    samples = iter(memory)
+    monitor = SoakMonitor(sample_pod=lambda: {"memory_bytes": next(samples), "cpu_cores": 1.0}, scraper=_NoMetrics(),
+                          sample_restarts=lambda: restarts)
+    for latency in e2e:
+        clock[0] += WINDOW_SECONDS
+        monitor.observe_window({"requests": 10, "errors": 0, "e2e": {"p50": latency, "p99": 2 * latency},
+                                "ttft": {"p50": latency / 10}})
+    return monitor
+
+
+def test_online_trend_hand_computed_fit() -> None:
+    """
+    Test the fit of three points, slope 1/2 and t statistic 1/sqrt(3), and that there is no slope before two
+    distinct times nor a t statistic before three points.
+    """
+    trend = _trend([(0.0, 1.0), (1.0, 3.0), (2.0, 2.0)])
+    assert trend.slope == pytest.approx(0.5)
+    assert trend.t_statistic == pytest.approx(1 / math.sqrt(3))
+    assert _trend([(0.0, 1.0)]).slope is None
+    assert _trend([(5.0, 1.0), (5.0, 2.0)]).slope is None
+    assert _trend([(0.0, 1.0), (1.0, 2.0)]).t_statistic is None
+
+
+def test_online_trend_flat_and_linear() -> None:
+    """
+    Test that a flat series has a zero slope and t statistic, and that an exact line has its slope and an
+    infinite t statistic.
+    """
+    flat = _trend([(x, 7.0) for x in range(10)])
+    assert (flat.slope, flat.t_statistic, flat.is_growing()) == (0.0, 0.0, False)
+    line = _trend([(x * WINDOW_SECONDS, 5.0 + 2.0 * x * WINDOW_SECONDS) for x in range(10)])
+    assert line.slope == pytest.approx(2.0)
+    assert line.t_statistic == math.inf
+    assert line.is_growing()
+
+
+@pytest.mark.parametrize("growth_per_second, growing", [(0.0, False), (1e9 * 0.2 / 3600, True)])
+def test_online_trend_matches_the_two_pass_fit(growth_per_second: float, growing: bool) -> None:
+    """
+    Test that the online fit of two hours of noisy memory samples in bytes matches the two-pass least-squares
+    fit, and that only the growing series is flagged.
+    """
+    generator = random.Random(0)
+    points = [(x * WINDOW_SECONDS, 1e9 + growth_per_second * x * WINDOW_SECONDS + generator.gauss(0, 1e6))
+              for x in range(120)]
+    trend = _trend(points)
+    slope, t_statistic = _reference_fit(points)
+    assert trend.slope == pytest.approx(slope, rel=1e-9, abs=1e-6)
+    assert trend.t_statistic == pytest.approx(t_statistic, rel=1e-6, abs=1e-6)
+    assert trend.is_growing(soak.MIN_T, soak.MEMORY_GROWTH_PER_HOUR) == growing
+
+
+def test_soak_monitor_healthy_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that flat memory and noisy flat latencies give no findings.
+    """
+    generator = random.Random(1)
+    monitor = _soak(monkeypatch, memory=[2e9] * 30, e2e=[1.0 + generator.gauss(0, 0.05) for _ in range(30)])
+    assert monitor.findings() == []
+    report = monitor.report()
+    assert (report["windows"], report["requests"], report["restarts"]) == (30, 300, 0)
+    assert report["trends"]["memory_bytes"]["slope_per_hour"] == 0.0
+
+
+def test_soak_monitor_leak_creep_and_restarts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that linear memory growth is reported as a leak with its hourly growth, rising latencies as creep, and
+    restarts as such.
+    """
+    memory = [1e9 + 1e9 * 0.2 / 3600 * WINDOW_SECONDS * (index + 1) for index in range(30)]
+    e2e = [1.0 + 0.5 / 3600 * WINDOW_SECONDS * (index + 1) for index in range(30)]
+    monitor = _soak(monkeypatch, memory=memory, e2e=e2e, restarts=3)
+    growth = 0.2 / (statistics.fmean(memory) / 1e9)
+    findings = monitor.findings()
+    assert findings[0] == f"Possible memory leak: predictor memory grows {growth:.1%} per hour"
+    assert [finding.split()[2] for finding in findings[1:-1]] == ["e2e_p50", "e2e_p99", "ttft_p50"]
+    assert findings[-1] == "The predictor container restarted 3 times"
@@ -1,21 +1,31 @@
+from __future__ import annotations
+
+import copy
+import functools
+import json
 import os
 
 import pytest
 
-from .conftest import client
 import asyncio
-import aiohttp
-from typing import Any, Generator, Optional
+from typing import TYPE_CHECKING, Any, Generator, Optional
 import yaml
-from jinja2 import BaseLoader, Environment
 from abc import ABC, abstractmethod
-from ocp_resources.pod import Pod
-from kubernetes.dynamic.client import DynamicClient
 import logging
 from model_serving_tests.tests.constant import (
     INFERE_DIR, RUNTIME_DIR, STORAGE_DIR)
+from model_serving_tests.tests.timing import timed_phase
+
+if TYPE_CHECKING:
+    # Deferred to first use so that collecting or filtering tests does not pay for the cluster clients
+    from jinja2 import Template
+    from kubernetes.dynamic.client import DynamicClient
+    from ocp_resources.pod import Pod
 
 LOGGER = logging.getLogger(__name__)
+# libyaml's loader is an order of magnitude faster than the pure Python one when it is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+GPU_RESOURCE_NAMES = ("nvidia.com/gpu", "amd.com/gpu", "habana.ai/gaudi")
 
 
 class PodNotFoundError(Exception):
@@ -41,7 +51,54 @@ class Jinja2Loader(ABC):
 
 
 class TemplateLoader(Jinja2Loader):
-    """Concrete implementation of Jinja2Loader using Jinja2's BaseLoader."""
+    """Concrete implementation of Jinja2Loader using Jinja2's BaseLoader.
+
+    All loaders share one Jinja2 environment, and compiled templates are cached by source text and by file
+    path and modification time, so rendering a template again only costs the render itself.
+    """
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def environment() -> Any:
+        """Return the shared Jinja2 environment, created on first use.
+
+        Returns:
+            Any: The jinja2 Environment.
+        """
+        from jinja2 import BaseLoader, Environment
+
+        return Environment(loader=BaseLoader())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def compile(src: str) -> Template:
+        """Compile a Jinja2 template, reusing the cached result for a source seen before.
+
+        Args:
+            src (str): The Jinja2 template as a string.
+
+        Returns:
+            Template: The compiled template.
+        """
+        return TemplateLoader.environment().from_string(src)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _load(path: str, mtime_ns: int) -> Template:
+        with open(path, 'r') as file:
+            return TemplateLoader.compile(file.read())
+
+    def load(self, template_path: Any) -> Template:
+        """Load and compile a Jinja2 template file, re-reading it only when the file has changed.
+
+        Args:
+            template_path (Any): Path to the template file.
+
+        Returns:
+            Template: The compiled template.
+        """
+        path = os.fspath(template_path)
+        return self._load(path, os.stat(path).st_mtime_ns)
 
     def from_jinja2(self, src: str, variables: dict) -> str:
         """Render the given Jinja2 template with the provided variables.
@@ -53,48 +110,113 @@ class TemplateLoader(Jinja2Loader):
         Returns:
             str: The rendered template.
         """
-        template = Environment(loader=BaseLoader()).from_string(src)
-        return template.render(variables)
+        return self.compile(src).render(variables)
 
 
-def parse_resource_template(yaml_file_path: Any,
-                            context: Any,
-                            output_file_path: Any) -> None:
-    """Read a YAML file with placeholders, replace them, and write the modified YAML to a new file.
+def render_resource_template(yaml_file_path: Any, context: Any) -> dict:
+    """Render a YAML template with the given context and return the resulting manifest.
 
     Args:
-        yaml_file_path (Any): Path to the input YAML file.
-        context (Any): Context dictionary to render the YAML file.
-        output_file_path (Any): Path to the output YAML file.
+        yaml_file_path (Any): Path to the YAML template.
+        context (Any): Context dictionary to render the template.
+
+    Returns:
+        dict: The rendered manifest.
     """
-    # Read the YAML file
-    with open(yaml_file_path, 'r') as file:
-        yaml_content = file.read()
+    template = TemplateLoader().load(yaml_file_path)
+    cache_key = json.dumps(context, sort_keys=True, default=str)
+    return copy.deepcopy(_render_manifest(template, cache_key))
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_manifest(template: Template, context_json: str) -> dict:
+    # Results are shared between callers, render_resource_template hands out copies
+    return yaml.load(template.render(json.loads(context_json)), Loader=YAML_LOADER)
+
 
-    # Create TemplateLoader instance
-    loader = TemplateLoader()
+def resource_from_manifest(resource_cls: Any, client: DynamicClient, namespace: str, manifest: dict) -> Any:
+    """Build a namespaced resource object straight from a rendered manifest, without a YAML file.
 
-    # Render the YAML content with the given context
-    rendered_content = loader.from_jinja2(yaml_content, context)
+    Args:
+        resource_cls (Any): The openshift-python-wrapper resource class, e.g. InferenceService.
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace to create the resource in.
+        manifest (dict): The rendered manifest.
+
+    Returns:
+        Any: The resource object, ready to be created.
+    """
+    resource = resource_cls(client=client, name=manifest["metadata"]["name"], namespace=namespace)
+    # The wrapper posts `res` as is when it is already set, so the manifest skips the yaml_file round trip
+    resource.res = copy.deepcopy(manifest)
+    resource.res["metadata"]["namespace"] = namespace
+    return resource
 
-    # Convert the rendered content back to YAML
-    try:
-        # Load the rendered content to validate and format it as YAML
-        yaml_data = yaml.safe_load(rendered_content)
-        with open(output_file_path, 'w') as file:
-            yaml.dump(yaml_data, file, default_flow_style=False)
-        print(f"Processed YAML has been written to {output_file_path}")
-    except yaml.YAMLError as e:
-        print(f"Error processing YAML: {e}")
+
+def isvc_gpu_count(manifest: dict) -> int:
+    """Return the number of accelerators an InferenceService manifest requests.
+
+    Args:
+        manifest (dict): The rendered InferenceService manifest.
+
+    Returns:
+        int: The accelerator limit of the predictor, 0 if it requests none.
+    """
+    limits = manifest["spec"]["predictor"]["model"].get("resources", {}).get("limits", {})
+    return sum(int(value) for key, value in limits.items() if key in GPU_RESOURCE_NAMES)
+
+
+def get_worker_id() -> str:
+    """Return the pytest-xdist worker id of the current process.
+
+    Returns:
+        str: The worker id (e.g. "gw0"), or "master" when tests are not distributed.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def worker_namespace_name(name: str) -> str:
+    """Make a namespace name unique to the current pytest-xdist worker.
+
+    Args:
+        name (str): The base namespace name.
+
+    Returns:
+        str: The name suffixed with the worker id, truncated to the 63 character namespace limit.
+    """
+    worker_id = get_worker_id()
+    if worker_id == "master":
+        return name
+    suffix = f"-{worker_id}"
+    return name[:63 - len(suffix)].rstrip("-") + suffix
+
+
+def predictor_label_selector(is_name: str) -> str:
+    """Return the label selector KServe puts on the predictor pods of an InferenceService.
+
+    Args:
+        is_name (str): The InferenceService name.
+
+    Returns:
+        str: The label selector.
+    """
+    return f"serving.kserve.io/inferenceservice={is_name},component=predictor"
+
+
+def _is_running_and_ready(pod: Any) -> bool:
+    if pod.metadata.deletionTimestamp or pod.status.phase != "Running":
+        return False
+    return any(condition.type == "Ready" and condition.status == "True"
+               for condition in (pod.status.conditions or []))
 
 
 def get_predictor_pod(client: DynamicClient, namespace: str, is_name: str) -> Pod:
-    """Retrieve a predictor pod from a Kubernetes namespace.
+    """Retrieve a predictor pod of an InferenceService.
 
     Args:
         client (DynamicClient): The Kubernetes dynamic client.
         namespace (str): The namespace to search for the pod.
-        is_name (str): The base name of the pod to search for.
+        is_name (str): The InferenceService name.
 
     Returns:
         Pod: The found pod object.
@@ -102,14 +224,47 @@ def get_predictor_pod(client: DynamicClient, namespace: str, is_name: str) -> Po
     Raises:
         PodNotFoundError: If no predictor pod is found in the namespace.
     """
-    for pod in Pod.get(dyn_client=client, namespace=namespace):
-        if is_name + "-predictor" in pod.name:
-            LOGGER.info(f"Pod name {pod.name}")
-            return pod
+    from ocp_resources.pod import Pod
+    from model_serving_tests.tests.kube_cache import get_pod_informer
+
+    informer = get_pod_informer(client, namespace=namespace, label_selector=predictor_label_selector(is_name))
+    for pod in informer.pods():
+        if not pod.metadata.deletionTimestamp:
+            LOGGER.info(f"Pod name {pod.metadata.name}")
+            return Pod(client=client, name=pod.metadata.name, namespace=namespace)
 
     raise PodNotFoundError(f"No predictor pod found in namespace {namespace}")
 
 
+def wait_for_predictor_pod(client: DynamicClient, namespace: str, is_name: str, timeout: int = 600) -> Pod:
+    """Wait for a predictor pod of an InferenceService to be Running and Ready.
+
+    The pod states come from the namespace's pod watch, so waiting does not poll the API server.
+
+    Args:
+        client (DynamicClient): The Kubernetes dynamic client.
+        namespace (str): The namespace of the InferenceService.
+        is_name (str): The InferenceService name.
+        timeout (int, optional): Seconds to wait. Defaults to 600.
+
+    Returns:
+        Pod: The ready pod object.
+
+    Raises:
+        PodNotFoundError: If no predictor pod became ready in time.
+    """
+    from ocp_resources.pod import Pod
+    from model_serving_tests.tests.kube_cache import get_pod_informer
+
+    informer = get_pod_informer(client, namespace=namespace, label_selector=predictor_label_selector(is_name))
+    with timed_phase("readiness"):
+        pod = informer.wait_for(_is_running_and_ready, timeout=timeout)
+    if pod is None:
+        raise PodNotFoundError(f"No ready predictor pod for {is_name} in namespace {namespace} after {timeout}s")
+    LOGGER.info(f"Pod name {pod.metadata.name}")
+    return Pod(client=client, name=pod.metadata.name, namespace=namespace)
+
+
 async def _send_chat_completion(messages, url):
     """Send a chat completion request to a specified URL.
 
@@ -120,6 +275,8 @@ async def _send_chat_completion(messages, url):
     Returns:
         dict: The JSON response from the server, or an error message.
     """
+    import aiohttp
+
     # Make sure to define your URL here
     print('Starting OpenAI request')
     async with aiohttp.ClientSession() as session:
@@ -159,14 +316,22 @@ async def _send_async_requests(prompts_messages, url=None):
 
 def create_runtime_manifest_from_template(deployment_type: str, runtime_image: str,
                                           runtime_name: str,
-                                          raw_port: int = 8033) -> None:
-    """Create a runtime manifest from a template and save it to a file.
+                                          raw_port: int = 8033,
+                                          runtime: str = "vLLM",
+                                          executor_backend: str = None) -> dict:
+    """Render a runtime manifest from a template.
 
     Args:
         runtime_image(str): runtime image
         deployment_type (str): The type of deployment (e.g., 'rawdeployment').
         runtime_name (str, optional): The name of the runtime. Defaults to "serving_runtime".
         raw_port (int, optional): The raw port to use. Defaults to 8033.
+        runtime (str, optional): The runtime folder holding the template. Defaults to "vLLM".
+        executor_backend (str, optional): The vLLM distributed executor backend, "mp" or "ray".
+            Defaults to None, keeping the template's.
+
+    Returns:
+        dict: The rendered ServingRuntime manifest.
     """
     data = {
         "entrypoint": "vllm_tgis_adapter",
@@ -178,12 +343,14 @@ def create_runtime_manifest_from_template(deployment_type: str, runtime_image: s
         }
     }
 
+    if executor_backend is not None:
+        data["executor_backend"] = executor_backend
+
     if deployment_type.lower() != "rawdeployment":
         del data["tgi_raw_port"]
         del data["entrypoint"]
         data["deployment_mode"] = deployment_type
-    parse_resource_template(yaml_file_path=RUNTIME_DIR / 'vLLM' / f'{runtime_name}.yaml', context=data,
-                            output_file_path=RUNTIME_DIR / 'vLLM' / f'{runtime_name}_updated.yaml')
+    return render_resource_template(yaml_file_path=RUNTIME_DIR / runtime / f'{runtime_name}.yaml', context=data)
 
 
 def create_isvc_manifest_from_template(deployment_mode: Any,
@@ -194,8 +361,9 @@ def create_isvc_manifest_from_template(deployment_mode: Any,
                                        storage_uri: Any = None,
                                        gpu_count: Any = None,
                                        new_args: Any = None,
-                                       env_vars: Any = None) -> Any:
-    """Create an ISVC manifest from a template and save it to a file.
+                                       env_vars: Any = None,
+                                       shm_size: Any = None) -> dict:
+    """Render an ISVC manifest from a template.
 
     Args:
         accelerator_type(Any): Accelerator type on which test will run like Nvidia,AMD,Gaudi
@@ -207,6 +375,11 @@ def create_isvc_manifest_from_template(deployment_mode: Any,
         gpu_count (Any, optional): The number of GPUs to use. Defaults to None.
         new_args (Any, optional): Additional arguments. Must be a list if provided. Defaults to None.
         env_vars (Any, optional): Environment variables. Must be a list of dictionaries with 'name' and 'value' keys if provided. Defaults to None.
+        shm_size (Any, optional): The sizeLimit of the /dev/shm volume of multi-GPU predictors, e.g. "4Gi".
+            Defaults to None, keeping the template's.
+
+    Returns:
+        dict: The rendered InferenceService manifest.
 
     Raises:
         ValueError: If new_args or env_vars are not of the expected types or formats.
@@ -255,14 +428,24 @@ def create_isvc_manifest_from_template(deployment_mode: Any,
             raise ValueError("env_vars must be a list or None")
         if not all(isinstance(item, dict) and 'name' in item and 'value' in item for item in env_vars):
             raise ValueError("Each item in env_vars must be a dictionary")
-    parse_resource_template(yaml_file_path=INFERE_DIR / model_name / f'{model_name}.yaml', context=data,
-                            output_file_path=INFERE_DIR / model_name / f'{model_name}_updated.yaml')
+        data["env_vars"] = env_vars
+
+    if shm_size is not None:
+        data["shm_size"] = shm_size
+    return render_resource_template(yaml_file_path=INFERE_DIR / model_name / f'{model_name}.yaml', context=data)
 
 
-def create_s3_secret_manifest(name="s3_seceret"):
+def create_s3_secret_manifest(name="s3_seceret") -> dict:
+    """Render the S3 secret manifest with the AWS credentials from the environment.
+
+    Args:
+        name (str, optional): The secret template name. Defaults to "s3_seceret".
+
+    Returns:
+        dict: The rendered Secret manifest.
+    """
     data = {
         "aws_access_key_id": os.getenv('AWS_ACCESS_KEY_ID'),
         "aws_secret_access_key": os.getenv('AWS_SECRET_ACCESS_KEY')
     }
-    parse_resource_template(yaml_file_path=STORAGE_DIR / f'{name}.yaml', context=data,
-                            output_file_path=STORAGE_DIR / f'{name}.yaml')
+    return render_resource_template(yaml_file_path=STORAGE_DIR / f'{name}.yaml', context=data)